@@ -0,0 +1,110 @@
+from functools import lru_cache
+from typing import FrozenSet
+import orjson
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import Response
+from app.core.config import settings
+from app.core.http_cache import cache_control, response_encoder
+from app.models.categories import (
+    CategoryExpansionResponse,
+    CategoryListResponse,
+)
+from app.models.yelp_categories import (
+    CategoryIndex,
+    get_category_index,
+    get_yelp_categories,
+)
+from app.services.ranking import split_list
+
+router = APIRouter()
+
+
+def cached_response(request: Request, content: bytes) -> Response:
+    """Answer with the body, or ``304``, cacheable for ``CATEGORIES_CACHE_MAX_AGE``."""
+    return response_encoder.respond(
+        request, content, cache_control(settings.CATEGORIES_CACHE_MAX_AGE)
+    )
+
+
+def _detail(index: CategoryIndex, alias: str) -> dict:
+    info = index.categories[alias]
+    return {"alias": info.alias, "title": info.title, "parents": list(info.parents)}
+
+
+@lru_cache(maxsize=1)
+def _category_list() -> bytes:
+    index = get_category_index()
+    return orjson.dumps(
+        {"categories": [_detail(index, alias) for alias in get_yelp_categories()]}
+    )
+
+
+@lru_cache(maxsize=1024)
+def _autocomplete(prefix: str, limit: int) -> bytes:
+    index = get_category_index()
+    return orjson.dumps(
+        {
+            "categories": [
+                _detail(index, alias) for alias in index.autocomplete(prefix, limit)
+            ]
+        }
+    )
+
+
+@lru_cache(maxsize=1024)
+def _expansion(aliases: FrozenSet[str]) -> bytes:
+    index = get_category_index()
+    known = sorted(alias for alias in aliases if alias in index.categories)
+    return orjson.dumps(
+        {
+            "categories": known,
+            "expanded": sorted(index.expand(known)),
+            "unknown": sorted(aliases.difference(known)),
+        }
+    )
+
+
+@router.get("/categories", response_model=CategoryListResponse)
+async def list_categories(request: Request) -> CategoryListResponse:
+    """
+    List the restaurant categories that can be used as search filters.
+
+    The "restaurants" category and its direct sub-categories, sorted by
+    title. The response is built once per process and carries an ETag for
+    conditional requests.
+    """
+    return cached_response(request, _category_list())
+
+
+@router.get("/categories/autocomplete", response_model=CategoryListResponse)
+async def autocomplete_categories(
+    request: Request,
+    q: str = Query(
+        ..., min_length=1, description="Prefix of a category title or alias"
+    ),
+    limit: int = Query(10, description="Maximum number of categories", ge=1, le=50),
+) -> CategoryListResponse:
+    """
+    Complete a prefix to restaurant categories.
+
+    Matches the start of the title, of any word in the title ("food" finds
+    "Fast Food") or of the alias; titles starting with the prefix come first.
+    """
+    return cached_response(request, _autocomplete(q.strip().lower(), limit))
+
+
+@router.get("/categories/expand", response_model=CategoryExpansionResponse)
+async def expand_categories(
+    request: Request,
+    categories: str = Query(
+        ...,
+        description="Comma-separated list of category aliases (e.g., 'italian,japanese')",
+    ),
+) -> CategoryExpansionResponse:
+    """
+    Expand category aliases to themselves and all of their sub-categories.
+
+    This is the set of business categories Yelp's ``categories`` filter
+    matches.
+    """
+    return cached_response(request, _expansion(split_list(categories)))
@@ -1,9 +1,23 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.api.restaurants import search_result_events, upstream_unavailable_error
+from app.api.streaming import StreamFormat, stream_events
+from app.core.config import settings
 from app.models.client_profile import (
+    ClientProfileBatchParams,
     ClientProfileParams,
     ClientProfileRestaurantSearchParams,
 )
+from app.services.cache import make_cache_key
 from app.services.profile_query import generate_restaurant_search_params
+from app.services.resilience import UpstreamUnavailable
+from app.services.yelp import yelp_service
+
+# Set up logging
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -11,13 +25,170 @@ router = APIRouter()
 @router.post("/client_profile", response_model=ClientProfileRestaurantSearchParams)
 async def create_client_profile(
     client_profile_params: ClientProfileParams,
+    stream: Optional[StreamFormat] = Query(
+        None,
+        description="Stream progress, the generated params and the matching restaurants (ndjson or sse)",
+    ),
+    limit: int = Query(20, description="Number of restaurants to stream", ge=1, le=50),
 ) -> ClientProfileRestaurantSearchParams:
     """
     Generate a client persona based on the provided client and meeting details.
+
+    When ``stream`` is set, the response is a stream of ``progress``,
+    ``params``, ``search``, ``restaurant`` and ``done`` events covering both
+    the generated search parameters and the restaurant search they produce.
     """
+    if stream is not None:
+        return stream_events(
+            _profile_search_events(client_profile_params, limit), stream
+        )
+
     try:
-        response = generate_restaurant_search_params(client_profile_params)
+        response = await generate_restaurant_search_params(client_profile_params)
 
         return response
+    except UpstreamUnavailable as e:
+        raise upstream_unavailable_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _error_event(stage: str, error: Exception) -> Dict[str, Any]:
+    """The ``error`` event for a profile that failed at ``stage``."""
+    event: Dict[str, Any] = {"type": "error", "stage": stage, "detail": str(error)}
+    if isinstance(error, UpstreamUnavailable):
+        event["retry_after"] = error.retry_after
+    else:
+        logger.error(f"Client profile failed while {stage}: {str(error)}")
+    return event
+
+
+async def _profile_search_events(
+    client_profile_params: ClientProfileParams, limit: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the events for a streamed client profile search."""
+    yield {"type": "progress", "stage": "generating_params"}
+
+    try:
+        params = await generate_restaurant_search_params(client_profile_params)
+    except Exception as e:
+        yield _error_event("generating_params", e)
+        return
+
+    yield {"type": "params", "params": params.model_dump(mode="json", warnings=False)}
+    yield {"type": "progress", "stage": "searching"}
+
+    try:
+        search_params = params.to_search_params(limit=limit)
+        data = await yelp_service.search_restaurants(search_params)
+    except Exception as e:
+        yield _error_event("searching", e)
+        return
+
+    async for event in search_result_events(data, search_params):
+        yield event
+
+
+@router.post("/client_profile/batch")
+async def batch_client_profiles(
+    batch_params: ClientProfileBatchParams,
+    stream: StreamFormat = Query(
+        StreamFormat.NDJSON, description="Stream format (ndjson or sse)"
+    ),
+    limit: int = Query(
+        20, description="Number of restaurants to return per profile", ge=1, le=50
+    ),
+) -> StreamingResponse:
+    """
+    Generate search parameters and find restaurants for several client profiles.
+
+    Identical profiles are generated once. Up to
+    ``CLIENT_PROFILE_BATCH_MAX_CONCURRENCY`` generations run at a time, and
+    each profile's restaurant search starts as soon as its parameters are
+    ready. Events are streamed as each profile progresses, tagged with the
+    profile's ``index`` in the request: ``params``, then ``result`` with the
+    restaurants, or ``error`` for a profile that failed; a final ``summary``
+    closes the stream.
+    """
+    return stream_events(_batch_profile_events(batch_params.profiles, limit), stream)
+
+
+async def _batch_profile_events(
+    profiles: List[ClientProfileParams], limit: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the events for a batch of client profiles as each one progresses."""
+    # Identical profiles share one generation and search
+    indexes: Dict[str, List[int]] = {}
+    unique: Dict[str, ClientProfileParams] = {}
+    for index, profile in enumerate(profiles):
+        key = make_cache_key("client_profile", profile.model_dump())
+        indexes.setdefault(key, []).append(index)
+        unique.setdefault(key, profile)
+
+    semaphore = asyncio.Semaphore(settings.CLIENT_PROFILE_BATCH_MAX_CONCURRENCY)
+    events: "asyncio.Queue[Tuple[str, Optional[Dict[str, Any]]]]" = asyncio.Queue()
+
+    async def run(key: str, profile: ClientProfileParams) -> None:
+        try:
+            try:
+                async with semaphore:
+                    params = await generate_restaurant_search_params(profile)
+            except Exception as e:
+                events.put_nowait((key, _error_event("generating_params", e)))
+                return
+
+            events.put_nowait(
+                (
+                    key,
+                    {
+                        "type": "params",
+                        "params": params.model_dump(mode="json", warnings=False),
+                    },
+                )
+            )
+
+            try:
+                search_params = params.to_search_params(limit=limit)
+                data = await yelp_service.search_restaurants(search_params)
+                result = {
+                    "type": "result",
+                    "total": data.get("total", 0),
+                    "region": data.get("region"),
+                    "location": search_params.location,
+                    "restaurants": [
+                        yelp_service.serialize_business(business)
+                        for business in data.get("businesses", [])
+                    ],
+                }
+            except Exception as e:
+                events.put_nowait((key, _error_event("searching", e)))
+                return
+
+            events.put_nowait((key, result))
+        finally:
+            events.put_nowait((key, None))
+
+    tasks = [asyncio.create_task(run(key, profile)) for key, profile in unique.items()]
+    errors = 0
+    try:
+        pending = len(tasks)
+        while pending:
+            key, event = await events.get()
+            if event is None:
+                pending -= 1
+                continue
+            for index in indexes[key]:
+                if event["type"] == "error":
+                    errors += 1
+                yield {"type": event["type"], "index": index, **event}
+    finally:
+        # Stop outstanding work if the client goes away
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "type": "summary",
+        "profiles": len(profiles),
+        "unique": len(unique),
+        "errors": errors,
+    }
@@ -0,0 +1,54 @@
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.api.restaurants import upstream_unavailable_error
+from app.core.http_cache import response_encoder
+from app.core.tracing import span
+from app.models.client_profile import ClientProfileParams
+from app.models.recommendations import RecommendationResponse
+from app.services.recommendations import recommendation_pipeline
+from app.services.resilience import UpstreamUnavailable
+
+router = APIRouter()
+
+
+@router.post("/recommendations", response_model=RecommendationResponse)
+async def recommend_restaurants(
+    request: Request,
+    client_profile_params: ClientProfileParams,
+    limit: int = Query(20, description="Number of restaurants to return", ge=1, le=50),
+) -> RecommendationResponse:
+    """
+    Turn client and meeting details into ranked restaurant recommendations.
+
+    Equivalent to ``POST /client_profile`` followed by ``GET /restaurants``
+    with the generated parameters, in one round-trip. A speculative search
+    for the meeting location runs while the parameters are generated and
+    answers the request when it covers them.
+    """
+    try:
+        params, data, prefetch = await recommendation_pipeline.recommend(
+            client_profile_params, limit
+        )
+    except UpstreamUnavailable as e:
+        raise upstream_unavailable_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    yelp = recommendation_pipeline.yelp
+    center = (data.get("region") or {}).get("center")
+    with span("serialize_response"):
+        content = orjson.dumps(
+            {
+                "params": params.model_dump(mode="json", warnings=False),
+                "restaurants": [
+                    yelp.serialize_business(business)
+                    for business in data.get("businesses", [])
+                ],
+                "total": data.get("total", 0),
+                "region": {"center": center} if center else None,
+                "limit": limit,
+                "location": params.location,
+                "prefetch": prefetch,
+            }
+        )
+    return response_encoder.respond(request, content, etag=False)
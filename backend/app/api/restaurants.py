@@ -1,17 +1,33 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+import logging
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from app.api.streaming import StreamFormat, stream_events
+from app.core.config import settings
+from app.core.http_cache import cache_control, response_encoder
+from app.core.tracing import span
 from app.models.restaurants import (
+    RestaurantBatchSearchParams,
+    RestaurantDetailsResponse,
     RestaurantSearchParams,
     RestaurantResponse,
     SortBy,
 )
-from app.services.yelp import yelp_service
+from app.services.prefetch import prefetch_scheduler
+from app.services.ranking import ranker
+from app.services.resilience import UpstreamUnavailable
+from app.services.yelp import BusinessNotFound, paginate, yelp_service
+
+# Set up logging
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
 @router.get("/restaurants", response_model=RestaurantResponse)
 async def search_restaurants(
+    request: Request,
     # Location parameters (at least one is required)
     location: Optional[str] = Query(
         None, description="Location to search (e.g., 'Toronto', '123 Main St')"
@@ -66,6 +82,15 @@ async def search_restaurants(
     reservation_covers: Optional[int] = Query(
         None, description="Number of people for reservation", ge=1, le=10
     ),
+    # Ranking and response format
+    rank: bool = Query(
+        False,
+        description="Re-rank a larger candidate pool for meeting suitability before paginating",
+    ),
+    stream: Optional[StreamFormat] = Query(
+        None,
+        description="Stream progress, then the restaurants once Yelp answers (ndjson or sse)",
+    ),
 ) -> RestaurantResponse:
     """
     Search for restaurants based on location and various filters.
@@ -73,7 +98,18 @@ async def search_restaurants(
     This endpoint provides a flexible search interface with many optional parameters for filtering and sorting
     restaurant results. It requires either a location string or latitude/longitude coordinates.
 
-    Returns a detailed list of restaurants
+    Returns a detailed list of restaurants. When ``stream`` is set, the
+    response starts at once with a ``progress`` event; once the Yelp page is
+    parsed, ``search`` and one ``restaurant`` event per business follow, then
+    ``done``, or an ``error`` event if the search failed.
+
+    With ``rank``, the first ``RANKING_POOL_SIZE`` results are fetched,
+    ordered by rating, reviews, distance, price and category fit and
+    reservation availability, and ``offset``/``limit`` page through that order.
+
+    Non-streamed responses carry an ETag computed from the body, so a
+    repeat request with ``If-None-Match`` gets an empty ``304``, and are
+    compressed when the client accepts gzip or brotli.
     """
     # Validate that we have either location or lat/long
     if not location and (latitude is None or longitude is None):
@@ -103,10 +139,259 @@ async def search_restaurants(
         reservation_covers=reservation_covers,
     )
 
+    if stream is not None:
+        return stream_events(_search_events(search_params, rank), stream)
+
     try:
-        # Use the Yelp service to search for restaurants
-        data = yelp_service.search_restaurants(search_params)
+        data = await _search(search_params, rank)
 
-        return yelp_service.format_response(data, search_params)
+        if settings.YELP_STRICT_VALIDATION:
+            with span("format_response"):
+                response = yelp_service.format_response(data, search_params)
+                content = response.model_dump_json().encode()
+        else:
+            # Trusted fast path: serialize the Yelp payload once, without re-validation
+            with span("serialize_response"):
+                content = yelp_service.format_response_json(data, search_params)
+
+        with span("encode_response"):
+            return response_encoder.respond(
+                request, content, search_cache_control(search_params)
+            )
+    except UpstreamUnavailable as e:
+        raise upstream_unavailable_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _search(params: RestaurantSearchParams, rank: bool) -> Dict[str, Any]:
+    """Run a search, ranked or in Yelp's order, and learn from it for prefetching."""
+    if rank:
+        return await _ranked_search(params)
+    data = await yelp_service.search_restaurants(params)
+    prefetch_scheduler.observe(params, data)
+    return data
+
+
+async def _search_events(
+    params: RestaurantSearchParams, rank: bool
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the events for a streamed search, starting before Yelp answers."""
+    yield {"type": "progress", "stage": "searching"}
+
+    try:
+        data = await _search(params, rank)
+    except Exception as e:
+        event = {"type": "error", "stage": "searching", "detail": str(e)}
+        if isinstance(e, UpstreamUnavailable):
+            event["retry_after"] = e.retry_after
+        yield event
+        return
+
+    async for event in search_result_events(data, params):
+        yield event
+
+
+async def _ranked_search(params: RestaurantSearchParams) -> Dict[str, Any]:
+    """Fetch the ranking pool for a search, rank it and cut out the requested page."""
+    offset, limit = params.offset or 0, params.limit or 20
+    pool_size = max(settings.RANKING_POOL_SIZE, offset + limit)
+    pool_params = params.model_copy(
+        update={"offset": 0, "limit": min(pool_size, settings.YELP_PAGE_SIZE)}
+    )
+    data = await yelp_service.search_pool(pool_params, pool_size)
+
+    with span("rank"):
+        ranked = ranker.rank(data.get("businesses", []), params)
+    return {**data, "businesses": ranked[offset : offset + limit]}
+
+
+def search_cache_control(params: RestaurantSearchParams) -> str:
+    """
+    ``Cache-Control`` for a search response.
+
+    Results may be reused by browsers and CDNs for a short while, then
+    served stale while they are revalidated; ``open_now`` results depend on
+    the time of the request and are always revalidated.
+    """
+    if params.open_now:
+        return cache_control(0)
+    return cache_control(
+        settings.RESTAURANTS_CACHE_MAX_AGE,
+        settings.RESTAURANTS_CACHE_STALE_WHILE_REVALIDATE,
+    )
+
+
+def upstream_unavailable_error(error: UpstreamUnavailable) -> HTTPException:
+    """503 with a ``Retry-After`` header for an upstream that is rate limited or down."""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, round(error.retry_after)))},
+    )
+
+
+async def search_result_events(
+    data: Dict[str, Any], params: RestaurantSearchParams
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Turn a raw Yelp search response into stream events.
+
+    Emits a ``search`` event with the response metadata, one ``restaurant``
+    event per business as it is serialized, then ``done``.
+    """
+    yield {
+        "type": "search",
+        "total": data.get("total", 0),
+        "region": data.get("region"),
+        "offset": params.offset or 0,
+        "limit": params.limit or 20,
+        "location": params.location or f"{params.latitude},{params.longitude}",
+    }
+
+    count = 0
+    for business in data.get("businesses", []):
+        restaurant = yelp_service.serialize_business(business)
+        count += 1
+        yield {"type": "restaurant", "restaurant": restaurant}
+
+    yield {"type": "done", "count": count}
+
+
+@router.get("/restaurants/details", response_model=RestaurantDetailsResponse)
+async def get_restaurant_details(
+    request: Request,
+    ids: str = Query(
+        ...,
+        description="Comma-separated list of Yelp business IDs (e.g., the top results)",
+    ),
+    reviews: bool = Query(True, description="Also fetch review excerpts"),
+) -> RestaurantDetailsResponse:
+    """
+    Fetch the full details (hours, photos) and review excerpts of several restaurants.
+
+    Businesses are fetched concurrently and cached individually, so a results
+    page can warm the details of its top restaurants in one call. Businesses
+    that cannot be fetched are listed under ``errors``; the others are
+    returned in request order.
+    """
+    business_ids = [item.strip() for item in ids.split(",") if item.strip()]
+    if not business_ids:
+        raise HTTPException(
+            status_code=400, detail="'ids' must list at least one business ID"
+        )
+    if len(set(business_ids)) > settings.YELP_DETAILS_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.YELP_DETAILS_MAX_IDS} business IDs can be requested at once",
+        )
+
+    results = await yelp_service.get_details_many(business_ids, reviews=reviews)
+
+    restaurants: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    unavailable: Optional[UpstreamUnavailable] = None
+    for business_id, result in results:
+        if isinstance(result, Exception):
+            error: Dict[str, Any] = {"id": business_id, "detail": str(result)}
+            if isinstance(result, UpstreamUnavailable):
+                error["retry_after"] = result.retry_after
+                unavailable = result
+            elif not isinstance(result, BusinessNotFound):
+                logger.error(f"Details for {business_id} failed: {str(result)}")
+            errors.append(error)
+            continue
+        restaurants.append(yelp_service.serialize_details(result))
+
+    if not restaurants and unavailable is not None:
+        raise upstream_unavailable_error(unavailable)
+
+    with span("serialize_response"):
+        content = orjson.dumps({"restaurants": restaurants, "errors": errors})
+    # Partial results are not worth caching downstream
+    max_age = 0 if errors else settings.RESTAURANT_DETAILS_CACHE_MAX_AGE
+    return response_encoder.respond(request, content, cache_control(max_age))
+
+
+@router.post("/restaurants/batch")
+async def batch_search_restaurants(
+    batch_params: RestaurantBatchSearchParams,
+    stream: StreamFormat = Query(
+        StreamFormat.NDJSON, description="Stream format (ndjson or sse)"
+    ),
+) -> StreamingResponse:
+    """
+    Run several searches, or several pages of one search, concurrently.
+
+    Results are de-duplicated by business ID, merged in request order (then
+    page order) and streamed back as events: ``{"type": "restaurant",
+    "restaurant": {...}}`` for every unique business, ``{"type": "error",
+    ...}`` for a page that failed, and a final ``{"type": "summary", ...}``.
+    """
+    if batch_params.search is not None:
+        if batch_params.searches:
+            raise HTTPException(
+                status_code=400,
+                detail="Provide either 'searches' or 'search', not both",
+            )
+        searches = paginate(
+            batch_params.search,
+            batch_params.target_count or batch_params.search.limit or 20,
+        )
+    elif batch_params.searches:
+        searches = batch_params.searches
+    else:
+        raise HTTPException(
+            status_code=400, detail="Either 'searches' or 'search' must be provided"
+        )
+
+    for params in searches:
+        if not params.location and (
+            params.latitude is None or params.longitude is None
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail="Either 'location' or both 'latitude' and 'longitude' must be provided",
+            )
+
+    return stream_events(_batch_events(searches), stream)
+
+
+async def _batch_events(
+    searches: List[RestaurantSearchParams],
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the events for a batch search."""
+    seen: Set[str] = set()
+    errors = 0
+
+    index = 0
+    async for params, result in yelp_service.search_many(
+        searches, settings.YELP_BATCH_MAX_CONCURRENCY
+    ):
+        index += 1
+        if isinstance(result, Exception):
+            errors += 1
+            event = {
+                "type": "error",
+                "search": index - 1,
+                "offset": params.offset,
+                "detail": str(result),
+            }
+            if isinstance(result, UpstreamUnavailable):
+                event["retry_after"] = result.retry_after
+            yield event
+            continue
+
+        for business in result.get("businesses", []):
+            if business.get("id") in seen:
+                continue
+            seen.add(business.get("id"))
+            restaurant = yelp_service.serialize_business(business)
+            yield {"type": "restaurant", "restaurant": restaurant}
+
+    yield {
+        "type": "summary",
+        "count": len(seen),
+        "searches": len(searches),
+        "errors": errors,
+    }
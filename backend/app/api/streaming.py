@@ -0,0 +1,39 @@
+import orjson
+from enum import Enum
+from typing import Any, AsyncIterator, Dict
+from fastapi.responses import StreamingResponse
+
+
+class StreamFormat(str, Enum):
+    NDJSON = "ndjson"
+    SSE = "sse"
+
+
+def encode_event(event: Dict[str, Any], stream_format: StreamFormat) -> str:
+    """Encode one event as an NDJSON line or a Server-Sent Events message."""
+    data = orjson.dumps(event).decode()
+    if stream_format == StreamFormat.SSE:
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def stream_events(
+    events: AsyncIterator[Dict[str, Any]], stream_format: StreamFormat
+) -> StreamingResponse:
+    """Stream events to the client in the requested format as they are produced."""
+
+    async def body() -> AsyncIterator[str]:
+        async for event in events:
+            yield encode_event(event, stream_format)
+
+    media_type = (
+        "text/event-stream"
+        if stream_format == StreamFormat.SSE
+        else "application/x-ndjson"
+    )
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
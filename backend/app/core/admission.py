@@ -0,0 +1,359 @@
+import asyncio
+import math
+import re
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import orjson
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.rate_limit import MemoryTokenBucket
+
+ADMISSION_REJECTIONS = registry.counter(
+    "admission_rejections_total",
+    "Requests refused by admission control, by route group and reason",
+    ("route", "reason"),
+)
+
+
+class Overloaded(Exception):
+    """A request cannot be admitted; answer it with ``status`` and ``Retry-After``."""
+
+    def __init__(self, status: int, reason: str, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimit:
+    """
+    At most ``limit`` requests of a route group in progress, the rest queued.
+
+    Waiting requests are admitted in arrival order as others finish. A
+    request is refused at once when ``queue_size`` requests are already
+    waiting, and after ``queue_timeout`` seconds in the queue, so an
+    overloaded route answers quickly instead of letting latency grow without
+    bound.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot.
+
+        Raises:
+            Overloaded: If the queue is full or the wait times out.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self.rejected_full += 1
+            raise Overloaded(
+                503, "queue_full", f"Too many {self.name} requests in progress", 1.0
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # The slot may have been handed over just as the wait ended
+            if future.done() and not future.cancelled():
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_timeout += 1
+                raise Overloaded(
+                    503,
+                    "queue_timeout",
+                    f"Too many {self.name} requests in progress",
+                    1.0,
+                )
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the next waiting request."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the slot usage, queue depth and rejection counters."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+class ClientBuckets:
+    """
+    One token bucket per client, so no single client can take more than its share.
+
+    Buckets are kept in an LRU of ``max_clients`` entries; a client whose
+    bucket was evicted starts again with a full burst, so clients must be
+    identities a caller cannot make up at will.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, MemoryTokenBucket]" = OrderedDict()
+
+        self.limited = 0
+
+    def check(self, client: str) -> None:
+        """
+        Take one token from the client's bucket.
+
+        Raises:
+            Overloaded: If the client has used up its tokens.
+        """
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = MemoryTokenBucket(self.rate, self.burst)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+
+        wait = bucket.try_acquire()
+        if wait > 0:
+            self.limited += 1
+            raise Overloaded(
+                429, "client_rate", "Too many requests from this client", wait
+            )
+
+    def refund(self, client: str) -> None:
+        """Give back the token of a request that was turned away later on."""
+        bucket = self._buckets.get(client)
+        if bucket is not None:
+            bucket.refund()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of tracked clients and of rate-limited requests."""
+        return {"clients": len(self._buckets), "limited": self.limited}
+
+
+def parse_route_limits(value: str) -> List[Tuple[str, int, int]]:
+    """Parse ``"/api/a=8:16,/api/b=4:8"`` into (path prefix, limit, queue size) triples."""
+    limits = []
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        prefix, _, sizes = item.strip().partition("=")
+        limit, _, queue_size = sizes.partition(":")
+        limits.append((prefix.strip(), int(limit), int(queue_size or limit)))
+    return limits
+
+
+def route_name(prefix: str) -> str:
+    """Metric-safe name of a route group: ``/api/client_profile`` -> ``client_profile``."""
+    name = prefix.removeprefix(settings.API_PREFIX)
+    return re.sub(r"[^a-zA-Z0-9]+", "_", name).strip("_") or "root"
+
+
+class AdmissionController:
+    """
+    Decides which requests a worker takes on, and which it turns away.
+
+    Requests to a path under a configured prefix wait for one of the route
+    group's concurrency slots; a full queue or a wait past the timeout gets
+    ``503``. With a client rate set, every request to a non-exempt path from
+    an identified client also takes a token from the client's bucket, and a
+    client over its rate gets ``429``; the token is given back if the
+    request is then refused a slot. Both carry ``Retry-After``.
+
+    A client is identified by an API key header holding one of ``api_keys``,
+    or, behind a trusted proxy, by the address the proxy appended to
+    ``X-Forwarded-For``. Anything else a caller can make up, and the socket
+    address is the proxy's for every user behind it, so other requests are
+    not rate limited per client. Limits apply per worker process.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        route_limits: Optional[List[Tuple[str, int, int]]] = None,
+        queue_timeout: float = 2.0,
+        client_rate: float = 0,
+        client_burst: float = 0,
+        max_clients: int = 10000,
+        api_key_header: str = "x-api-key",
+        api_keys: Tuple[str, ...] = (),
+        trust_forwarded: bool = False,
+        exempt_paths: Tuple[str, ...] = (),
+    ):
+        self.enabled = enabled
+        # Longest prefix first, so nested routes can have their own limits
+        self.routes = [
+            (
+                prefix,
+                ConcurrencyLimit(route_name(prefix), limit, queue_size, queue_timeout),
+            )
+            for prefix, limit, queue_size in sorted(
+                route_limits or [], key=lambda item: len(item[0]), reverse=True
+            )
+        ]
+        self.clients: Optional[ClientBuckets] = None
+        if client_rate > 0:
+            self.clients = ClientBuckets(
+                client_rate, max(client_burst, 1.0), max_clients
+            )
+        self.api_key_header = api_key_header.lower().encode()
+        self.api_keys = frozenset(key.encode("latin-1") for key in api_keys)
+        self.trust_forwarded = trust_forwarded
+        self.exempt_paths = exempt_paths
+
+    def route_for(self, path: str) -> Optional[ConcurrencyLimit]:
+        """The concurrency limit of the route group a path belongs to, if any."""
+        for prefix, limit in self.routes:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return limit
+        return None
+
+    def client_key(self, scope: dict) -> Optional[str]:
+        """
+        Identify the client: a known API key, else the address seen by a trusted proxy.
+
+        Returns:
+            The client's bucket key, or None if the client cannot be identified.
+        """
+        forwarded = None
+        for key, value in scope["headers"]:
+            if key == self.api_key_header and value in self.api_keys:
+                return "key:" + value.decode("latin-1")
+            if self.trust_forwarded and key == b"x-forwarded-for":
+                # The last address is the one the proxy saw; earlier ones are
+                # whatever the caller sent
+                forwarded = value.decode("latin-1").rsplit(",", 1)[-1].strip()
+        return "ip:" + forwarded if forwarded else None
+
+    def is_exempt(self, path: str) -> bool:
+        return any(path.startswith(prefix) for prefix in self.exempt_paths)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-route slot usage and queue depth, and client rate limiting counters."""
+        stats: Dict[str, Any] = {
+            "routes": {limit.name: limit.stats() for _, limit in self.routes},
+        }
+        if self.clients is not None:
+            stats["clients"] = self.clients.stats()
+        return stats
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an ``AdmissionController`` to HTTP requests."""
+
+    def __init__(self, app: Any, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        controller = self.controller
+        if (
+            scope["type"] != "http"
+            or not controller.enabled
+            or scope["method"] == "OPTIONS"
+            or controller.is_exempt(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route = controller.route_for(scope["path"])
+        route_label = route.name if route is not None else "other"
+        client = None
+        if controller.clients is not None:
+            client = controller.client_key(scope)
+        try:
+            if client is not None:
+                controller.clients.check(client)
+            if route is not None:
+                try:
+                    await route.acquire()
+                except BaseException:
+                    if client is not None:
+                        controller.clients.refund(client)
+                    raise
+        except Overloaded as e:
+            ADMISSION_REJECTIONS.inc(route=route_label, reason=e.reason)
+            await self._reject(send, e)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if route is not None:
+                route.release()
+
+    @staticmethod
+    async def _reject(send: Any, error: Overloaded) -> None:
+        """Answer with a JSON error and ``Retry-After``, without running the app."""
+        body = orjson.dumps({"detail": str(error)})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": error.status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (
+                        b"retry-after",
+                        str(max(1, math.ceil(error.retry_after))).encode(),
+                    ),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+# Create a singleton instance
+admission_controller = AdmissionController(
+    enabled=settings.ADMISSION_ENABLED,
+    route_limits=parse_route_limits(settings.ADMISSION_ROUTE_LIMITS),
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    client_rate=settings.ADMISSION_CLIENT_RATE,
+    client_burst=settings.ADMISSION_CLIENT_BURST,
+    max_clients=settings.ADMISSION_MAX_CLIENTS,
+    api_key_header=settings.ADMISSION_API_KEY_HEADER,
+    api_keys=tuple(
+        key.strip() for key in settings.ADMISSION_API_KEYS.split(",") if key.strip()
+    ),
+    trust_forwarded=settings.ADMISSION_TRUST_FORWARDED,
+    exempt_paths=tuple(
+        path.strip()
+        for path in settings.ADMISSION_EXEMPT_PATHS.split(",")
+        if path.strip()
+    ),
+)
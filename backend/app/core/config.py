@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from typing import Optional, List
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -7,6 +8,26 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# The backend directory, so data files are the same whatever directory the app starts from
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def _env_path(name: str, default: str) -> str:
+    """Read a file path from the environment, resolving relative paths against ``BASE_DIR``."""
+    value = os.getenv(name, default)
+    if not value:
+        return value
+    return str(BASE_DIR / value)
+
+
 class Settings(BaseModel):
     """Application settings."""
 
@@ -18,6 +39,12 @@ class Settings(BaseModel):
     # API configuration
     API_PREFIX: str = "/api"
 
+    # Server (python main.py): reload for development, workers for production
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_RELOAD: bool = _env_bool("SERVER_RELOAD", False)
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "1"))
+
     # CORS configuration
     CORS_ORIGINS: List[str] = [
         origin.strip()
@@ -28,10 +55,244 @@ class Settings(BaseModel):
     # Yelp API configuration
     YELP_API_KEY: str = os.getenv("YELP_API_KEY", "")
     YELP_CLIENT_ID: Optional[str] = os.getenv("YELP_CLIENT_ID")
-    YELP_API_URL: str = "https://api.yelp.com/v3"
+    YELP_API_URL: str = os.getenv("YELP_API_URL", "https://api.yelp.com/v3")
+
+    # Yelp HTTP connection pool configuration
+    YELP_MAX_CONNECTIONS: int = int(os.getenv("YELP_MAX_CONNECTIONS", "20"))
+    YELP_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("YELP_MAX_KEEPALIVE_CONNECTIONS", "10")
+    )
+    YELP_KEEPALIVE_EXPIRY: float = float(os.getenv("YELP_KEEPALIVE_EXPIRY", "30"))
+    YELP_CONNECT_TIMEOUT: float = float(os.getenv("YELP_CONNECT_TIMEOUT", "5"))
+    YELP_READ_TIMEOUT: float = float(os.getenv("YELP_READ_TIMEOUT", "10"))
+    YELP_POOL_TIMEOUT: float = float(os.getenv("YELP_POOL_TIMEOUT", "5"))
+    YELP_HTTP2: bool = _env_bool("YELP_HTTP2", True)
+
+    # Yelp latency budget, retries, circuit breaker and hedging
+    YELP_LATENCY_BUDGET: float = float(os.getenv("YELP_LATENCY_BUDGET", "8"))
+    YELP_RETRY_ATTEMPTS: int = int(os.getenv("YELP_RETRY_ATTEMPTS", "3"))
+    YELP_RETRY_BASE_DELAY: float = float(os.getenv("YELP_RETRY_BASE_DELAY", "0.1"))
+    YELP_RETRY_MAX_DELAY: float = float(os.getenv("YELP_RETRY_MAX_DELAY", "2"))
+    YELP_CIRCUIT_FAILURE_THRESHOLD: int = int(
+        os.getenv("YELP_CIRCUIT_FAILURE_THRESHOLD", "5")
+    )
+    YELP_CIRCUIT_RESET_TIMEOUT: float = float(
+        os.getenv("YELP_CIRCUIT_RESET_TIMEOUT", "30")
+    )
+    YELP_HEDGE_ENABLED: bool = _env_bool("YELP_HEDGE_ENABLED", False)
+
+    # Validate every business with Pydantic instead of the trusted fast path (debugging)
+    YELP_STRICT_VALIDATION: bool = _env_bool("YELP_STRICT_VALIDATION", False)
+
+    # Yelp pagination limits and batch search fan-out
+    YELP_PAGE_SIZE: int = 50
+    YELP_MAX_RESULTS: int = 240
+    YELP_BATCH_MAX_CONCURRENCY: int = int(os.getenv("YELP_BATCH_MAX_CONCURRENCY", "5"))
+
+    # Yelp search response cache ("memory" per worker, "disk" shared via SQLite)
+    YELP_CACHE_ENABLED: bool = _env_bool("YELP_CACHE_ENABLED", True)
+    YELP_CACHE_BACKEND: str = os.getenv("YELP_CACHE_BACKEND", "memory")
+    YELP_CACHE_TTL: float = float(os.getenv("YELP_CACHE_TTL", "300"))
+    YELP_CACHE_STALE_TTL: float = float(os.getenv("YELP_CACHE_STALE_TTL", "600"))
+    YELP_CACHE_MAX_ENTRIES: int = int(os.getenv("YELP_CACHE_MAX_ENTRIES", "1024"))
+    YELP_CACHE_PATH: str = _env_path("YELP_CACHE_PATH", "data/cache.sqlite3")
+    YELP_CACHE_GEO_GRID: float = float(os.getenv("YELP_CACHE_GEO_GRID", "0.001"))
+    YELP_CACHE_GRACE_TTL: float = float(os.getenv("YELP_CACHE_GRACE_TTL", "86400"))
+
+    # Business details (businesses/{id}) and reviews, cached per business in
+    # the search cache backend; details change rarely, reviews a little more
+    YELP_DETAILS_CACHE_TTL: float = float(os.getenv("YELP_DETAILS_CACHE_TTL", "86400"))
+    YELP_DETAILS_CACHE_STALE_TTL: float = float(
+        os.getenv("YELP_DETAILS_CACHE_STALE_TTL", "604800")
+    )
+    YELP_REVIEWS_CACHE_TTL: float = float(os.getenv("YELP_REVIEWS_CACHE_TTL", "21600"))
+    YELP_REVIEWS_CACHE_STALE_TTL: float = float(
+        os.getenv("YELP_REVIEWS_CACHE_STALE_TTL", "86400")
+    )
+    YELP_DETAILS_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("YELP_DETAILS_CACHE_MAX_ENTRIES", "4096")
+    )
+    YELP_DETAILS_MAX_CONCURRENCY: int = int(
+        os.getenv("YELP_DETAILS_MAX_CONCURRENCY", "5")
+    )
+    YELP_DETAILS_MAX_IDS: int = int(os.getenv("YELP_DETAILS_MAX_IDS", "20"))
+    YELP_REVIEWS_LIMIT: int = int(os.getenv("YELP_REVIEWS_LIMIT", "3"))
+
+    # Yelp rate limiting ("memory" per worker, "disk" shared via SQLite)
+    YELP_RATE_LIMIT_ENABLED: bool = _env_bool("YELP_RATE_LIMIT_ENABLED", True)
+    YELP_RATE_LIMIT_BACKEND: str = os.getenv("YELP_RATE_LIMIT_BACKEND", "disk")
+    YELP_RATE_LIMIT_PATH: str = _env_path(
+        "YELP_RATE_LIMIT_PATH", "data/ratelimit.sqlite3"
+    )
+    YELP_RATE_LIMIT_PER_SECOND: float = float(
+        os.getenv("YELP_RATE_LIMIT_PER_SECOND", "10")
+    )
+    YELP_RATE_LIMIT_BURST: float = float(os.getenv("YELP_RATE_LIMIT_BURST", "10"))
+    YELP_RATE_LIMIT_MAX_WAIT: float = float(os.getenv("YELP_RATE_LIMIT_MAX_WAIT", "2"))
+    YELP_RATE_LIMIT_BACKGROUND_MAX_WAIT: float = float(
+        os.getenv("YELP_RATE_LIMIT_BACKGROUND_MAX_WAIT", "30")
+    )
+    YELP_QUOTA_RESERVE: float = float(os.getenv("YELP_QUOTA_RESERVE", "0.1"))
+    # Assumed daily call limit until Yelp reports one in its response headers
+    YELP_DAILY_LIMIT: int = int(os.getenv("YELP_DAILY_LIMIT", "5000"))
+
+    # Free-text location -> coordinates cache learned from Yelp responses
+    GEOCODE_CACHE_ENABLED: bool = _env_bool("GEOCODE_CACHE_ENABLED", True)
+    GEOCODE_CACHE_PATH: str = _env_path("GEOCODE_CACHE_PATH", "data/locations.sqlite3")
+    GEOCODE_REGION_PRECISION: int = int(os.getenv("GEOCODE_REGION_PRECISION", "6"))
+
+    # Local restaurant store answering searches over fresh areas while Yelp is unavailable
+    RESTAURANT_STORE_ENABLED: bool = _env_bool("RESTAURANT_STORE_ENABLED", False)
+    RESTAURANT_STORE_PATH: str = _env_path(
+        "RESTAURANT_STORE_PATH", "data/restaurants.sqlite3"
+    )
+    RESTAURANT_STORE_MAX_AGE: float = float(
+        os.getenv("RESTAURANT_STORE_MAX_AGE", "86400")
+    )
+    RESTAURANT_STORE_MAX_RADIUS: int = int(
+        os.getenv("RESTAURANT_STORE_MAX_RADIUS", "5000")
+    )
+    RESTAURANT_STORE_DEFAULT_RADIUS: int = int(
+        os.getenv("RESTAURANT_STORE_DEFAULT_RADIUS", "1000")
+    )
+    RESTAURANT_STORE_REFRESH_INTERVAL: float = float(
+        os.getenv("RESTAURANT_STORE_REFRESH_INTERVAL", "3600")
+    )
+    RESTAURANT_STORE_ACTIVE_WINDOW: float = float(
+        os.getenv("RESTAURANT_STORE_ACTIVE_WINDOW", "604800")
+    )
+
+    # Admission control: per-route concurrency limits with bounded queues
+    # ("path prefix=limit:queue size"), and an opt-in token bucket per known
+    # API key or trusted forwarded address
+    ADMISSION_ENABLED: bool = _env_bool("ADMISSION_ENABLED", True)
+    ADMISSION_ROUTE_LIMITS: str = os.getenv(
+        "ADMISSION_ROUTE_LIMITS",
+        "/api/client_profile=20:40,/api/recommendations=20:40,/api/restaurants=64:128",
+    )
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+    ADMISSION_CLIENT_RATE: float = float(os.getenv("ADMISSION_CLIENT_RATE", "0"))
+    ADMISSION_CLIENT_BURST: float = float(os.getenv("ADMISSION_CLIENT_BURST", "30"))
+    ADMISSION_MAX_CLIENTS: int = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+    ADMISSION_API_KEY_HEADER: str = os.getenv("ADMISSION_API_KEY_HEADER", "X-API-Key")
+    ADMISSION_API_KEYS: str = os.getenv("ADMISSION_API_KEYS", "")
+    ADMISSION_TRUST_FORWARDED: bool = _env_bool("ADMISSION_TRUST_FORWARDED", False)
+    ADMISSION_EXEMPT_PATHS: str = os.getenv(
+        "ADMISSION_EXEMPT_PATHS", "/api/health,/api/metrics"
+    )
+
+    # Predictive cache warming: likely follow-up searches and popular searches
+    PREFETCH_ENABLED: bool = _env_bool("PREFETCH_ENABLED", True)
+    PREFETCH_QUOTA_SHARE: float = float(os.getenv("PREFETCH_QUOTA_SHARE", "0.1"))
+    PREFETCH_NEXT_PAGE: bool = _env_bool("PREFETCH_NEXT_PAGE", True)
+    PREFETCH_SORTS: str = os.getenv("PREFETCH_SORTS", "best_match,rating,distance")
+    PREFETCH_QUEUE_SIZE: int = int(os.getenv("PREFETCH_QUEUE_SIZE", "200"))
+    PREFETCH_CALL_INTERVAL: float = float(os.getenv("PREFETCH_CALL_INTERVAL", "0.2"))
+    PREFETCH_MAX_FOREGROUND_REQUESTS: int = int(
+        os.getenv("PREFETCH_MAX_FOREGROUND_REQUESTS", "8")
+    )
+    PREFETCH_PAUSE_INTERVAL: float = float(os.getenv("PREFETCH_PAUSE_INTERVAL", "1"))
+    PREFETCH_MAX_HOT_KEYS: int = int(os.getenv("PREFETCH_MAX_HOT_KEYS", "1000"))
+    PREFETCH_HOT_HALF_LIFE: float = float(os.getenv("PREFETCH_HOT_HALF_LIFE", "259200"))
+    PREFETCH_POPULAR_INTERVAL: float = float(
+        os.getenv("PREFETCH_POPULAR_INTERVAL", "900")
+    )
+    PREFETCH_POPULAR_KEYS: int = int(os.getenv("PREFETCH_POPULAR_KEYS", "20"))
+    PREFETCH_POPULAR_MIN_SCORE: float = float(
+        os.getenv("PREFETCH_POPULAR_MIN_SCORE", "2")
+    )
+    PREFETCH_STATE_PATH: str = _env_path("PREFETCH_STATE_PATH", "data/prefetch.json")
+
+    # Sampled capture of Yelp responses for replay (off by default)
+    YELP_CAPTURE_ENABLED: bool = _env_bool("YELP_CAPTURE_ENABLED", False)
+    YELP_CAPTURE_SAMPLE_RATE: float = float(
+        os.getenv("YELP_CAPTURE_SAMPLE_RATE", "0.01")
+    )
+    YELP_CAPTURE_DIR: str = _env_path("YELP_CAPTURE_DIR", "data/captures")
+    YELP_CAPTURE_MAX_FILES: int = int(os.getenv("YELP_CAPTURE_MAX_FILES", "500"))
 
     # OpenAI API configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL")
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10")
+    )
+
+    # OpenAI per-request timeout, latency budget, retries, circuit breaker and hedging
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "20"))
+    OPENAI_LATENCY_BUDGET: float = float(os.getenv("OPENAI_LATENCY_BUDGET", "45"))
+    OPENAI_RETRY_ATTEMPTS: int = int(os.getenv("OPENAI_RETRY_ATTEMPTS", "2"))
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD: int = int(
+        os.getenv("OPENAI_CIRCUIT_FAILURE_THRESHOLD", "5")
+    )
+    OPENAI_CIRCUIT_RESET_TIMEOUT: float = float(
+        os.getenv("OPENAI_CIRCUIT_RESET_TIMEOUT", "30")
+    )
+    OPENAI_HEDGE_ENABLED: bool = _env_bool("OPENAI_HEDGE_ENABLED", False)
+
+    # Number of candidate categories offered to the LLM per profile
+    CATEGORY_SHORTLIST_SIZE: int = int(os.getenv("CATEGORY_SHORTLIST_SIZE", "25"))
+
+    # /api/categories: seconds clients may cache responses
+    CATEGORIES_CACHE_MAX_AGE: int = int(os.getenv("CATEGORIES_CACHE_MAX_AGE", "86400"))
+
+    # Client profile -> search params cache (exact and similarity tiers)
+    PROFILE_CACHE_ENABLED: bool = _env_bool("PROFILE_CACHE_ENABLED", True)
+    PROFILE_CACHE_TTL: float = float(os.getenv("PROFILE_CACHE_TTL", "3600"))
+    PROFILE_CACHE_MAX_ENTRIES: int = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "512"))
+    PROFILE_CACHE_SIMILARITY_ENABLED: bool = _env_bool(
+        "PROFILE_CACHE_SIMILARITY_ENABLED", False
+    )
+    PROFILE_CACHE_SIMILARITY_THRESHOLD: float = float(
+        os.getenv("PROFILE_CACHE_SIMILARITY_THRESHOLD", "0.9")
+    )
+
+    # /api/client_profile/batch: concurrent LLM generations per batch
+    CLIENT_PROFILE_BATCH_MAX_CONCURRENCY: int = int(
+        os.getenv("CLIENT_PROFILE_BATCH_MAX_CONCURRENCY", "4")
+    )
+
+    # Meeting-suitability ranking: feature weights and candidate pool for ?rank=true
+    RANKING_WEIGHT_RATING: float = float(os.getenv("RANKING_WEIGHT_RATING", "1.0"))
+    RANKING_WEIGHT_REVIEWS: float = float(os.getenv("RANKING_WEIGHT_REVIEWS", "0.3"))
+    RANKING_WEIGHT_DISTANCE: float = float(os.getenv("RANKING_WEIGHT_DISTANCE", "0.3"))
+    RANKING_WEIGHT_PRICE: float = float(os.getenv("RANKING_WEIGHT_PRICE", "0.5"))
+    RANKING_WEIGHT_CATEGORY: float = float(os.getenv("RANKING_WEIGHT_CATEGORY", "1.0"))
+    RANKING_WEIGHT_RESERVATION: float = float(
+        os.getenv("RANKING_WEIGHT_RESERVATION", "0.5")
+    )
+    RANKING_POOL_SIZE: int = int(os.getenv("RANKING_POOL_SIZE", "50"))
+
+    # One-shot recommendations: speculative Yelp search while the LLM runs
+    RECOMMEND_PREFETCH_ENABLED: bool = _env_bool("RECOMMEND_PREFETCH_ENABLED", True)
+    RECOMMEND_CANDIDATE_LIMIT: int = int(os.getenv("RECOMMEND_CANDIDATE_LIMIT", "50"))
+
+    # HTTP response caching: ETags on GET responses, and gzip (or brotli, if
+    # installed) for bodies of at least HTTP_COMPRESSION_MIN_SIZE bytes
+    HTTP_COMPRESSION_ENABLED: bool = _env_bool("HTTP_COMPRESSION_ENABLED", True)
+    HTTP_COMPRESSION_MIN_SIZE: int = int(os.getenv("HTTP_COMPRESSION_MIN_SIZE", "1024"))
+    HTTP_GZIP_LEVEL: int = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+    HTTP_BROTLI_QUALITY: int = int(os.getenv("HTTP_BROTLI_QUALITY", "5"))
+    HTTP_COMPRESSION_CACHE_ENTRIES: int = int(
+        os.getenv("HTTP_COMPRESSION_CACHE_ENTRIES", "256")
+    )
+    # /api/restaurants: seconds a search result may be reused by browsers and
+    # CDNs, then served stale while it is revalidated; open_now searches
+    # are always revalidated
+    RESTAURANTS_CACHE_MAX_AGE: int = int(os.getenv("RESTAURANTS_CACHE_MAX_AGE", "60"))
+    RESTAURANTS_CACHE_STALE_WHILE_REVALIDATE: int = int(
+        os.getenv("RESTAURANTS_CACHE_STALE_WHILE_REVALIDATE", "300")
+    )
+    # /api/restaurants/details: seconds a complete details response may be reused
+    RESTAURANT_DETAILS_CACHE_MAX_AGE: int = int(
+        os.getenv("RESTAURANT_DETAILS_CACHE_MAX_AGE", "3600")
+    )
+
+    # Observability: /api/metrics endpoint and optional OpenTelemetry spans
+    METRICS_ENABLED: bool = _env_bool("METRICS_ENABLED", True)
+    TRACING_ENABLED: bool = _env_bool("TRACING_ENABLED", False)
 
     # Default search parameters
     DEFAULT_LOCATION: str = "Toronto"
@@ -39,12 +300,26 @@ class Settings(BaseModel):
     DEFAULT_LIMIT: int = 20
     DEFAULT_SORT_BY: str = "best_match"
 
-# Create settings instance
-settings = Settings()
+    def check_required(self) -> None:
+        """
+        Check the settings the app cannot serve requests without.
 
-# Validation
-if not settings.YELP_API_KEY:
-    raise ValueError("YELP_API_KEY environment variable must be set")
+        Called from the app lifespan rather than at import, so tools and
+        workers can import the app without a full environment.
 
-if not settings.OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable must be set")
+        Raises:
+            ValueError: If a required environment variable is not set.
+        """
+        missing = [
+            name
+            for name in ("YELP_API_KEY", "OPENAI_API_KEY")
+            if not getattr(self, name)
+        ]
+        if missing:
+            raise ValueError(
+                f"{', '.join(missing)} environment variable(s) must be set"
+            )
+
+
+# Create settings instance
+settings = Settings()
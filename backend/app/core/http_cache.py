@@ -0,0 +1,205 @@
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+from app.core.config import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+brotli: Optional[Any] = None
+try:
+    import brotli
+except ImportError:
+    logger.info("brotli is not installed, responses are only gzip-compressed")
+
+
+def _gzip(content: bytes) -> bytes:
+    return gzip.compress(content, compresslevel=settings.HTTP_GZIP_LEVEL, mtime=0)
+
+
+def _brotli(content: bytes) -> bytes:
+    return brotli.compress(content, quality=settings.HTTP_BROTLI_QUALITY)
+
+
+# Supported content codings, most preferred first when the client ranks them equally
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    COMPRESSORS["br"] = _brotli
+COMPRESSORS["gzip"] = _gzip
+
+
+def content_etag(content: bytes) -> str:
+    """
+    Weak ETag for a response body, from a hash of its uncompressed bytes.
+
+    Weak, so every content coding of the same body shares one validator.
+    """
+    return f'W/"{hashlib.blake2b(content, digest_size=12).hexdigest()}"'
+
+
+def cache_control(max_age: int, stale_while_revalidate: int = 0) -> str:
+    """``Cache-Control`` for public data: fresh for ``max_age`` seconds, ``no-cache`` if 0."""
+    if max_age <= 0:
+        return "public, no-cache"
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate > 0:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` names ``etag`` (compared weakly) or is ``*``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def negotiate_encoding(request: Request) -> Optional[str]:
+    """
+    Pick the content coding for a response from ``Accept-Encoding``.
+
+    Returns the supported coding with the highest q-value, preferring
+    brotli over gzip on ties, or None for the identity coding.
+    """
+    header = request.headers.get("accept-encoding")
+    if not header:
+        return None
+
+    weights: Dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best: Optional[str] = None
+    best_weight = 0.0
+    for coding in COMPRESSORS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class ResponseEncoder:
+    """
+    Conditional requests and negotiated compression for JSON responses.
+
+    Every response gets an ETag from a hash of its body; a request whose
+    ``If-None-Match`` names it is answered with ``304`` and no body. Bodies
+    above a size threshold are compressed with the best coding the client
+    accepts. Compressed bodies are kept in an LRU keyed by ETag and coding,
+    so a body served repeatedly, as cached searches are, is compressed once.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        min_size: int = 1024,
+        max_entries: int = 256,
+    ):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.max_entries = max_entries
+        self._compressed: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+        self.responses = 0
+        self.not_modified = 0
+        self.compressed = 0
+        self.compression_hits = 0
+        self.bytes_uncompressed = 0
+        self.bytes_sent = 0
+
+    def _compress(self, content: bytes, etag: Optional[str], coding: str) -> bytes:
+        if etag is None:
+            return COMPRESSORS[coding](content)
+
+        key = (etag, coding)
+        body = self._compressed.get(key)
+        if body is not None:
+            self._compressed.move_to_end(key)
+            self.compression_hits += 1
+            return body
+
+        body = COMPRESSORS[coding](content)
+        self._compressed[key] = body
+        while len(self._compressed) > self.max_entries:
+            self._compressed.popitem(last=False)
+        return body
+
+    def respond(
+        self,
+        request: Request,
+        content: bytes,
+        cache_control: Optional[str] = None,
+        etag: bool = True,
+    ) -> Response:
+        """
+        Build the response for a serialized JSON body.
+
+        Args:
+            request: The request being answered, for its conditional and
+                ``Accept-Encoding`` headers.
+            content: The uncompressed JSON body.
+            cache_control: ``Cache-Control`` header value, if any.
+            etag: Whether to tag the body and answer conditional requests;
+                off for responses that are not cacheable, such as POSTs,
+                whose compressed bodies are not kept either.
+
+        Returns:
+            A ``304``, or a ``200`` with the body in the negotiated coding.
+        """
+        self.responses += 1
+        headers = {"Vary": "Accept-Encoding"}
+        if cache_control is not None:
+            headers["Cache-Control"] = cache_control
+
+        tag: Optional[str] = None
+        if etag:
+            tag = content_etag(content)
+            headers["ETag"] = tag
+            if etag_matches(request, tag):
+                self.not_modified += 1
+                return Response(status_code=304, headers=headers)
+
+        self.bytes_uncompressed += len(content)
+        if self.enabled and len(content) >= self.min_size:
+            coding = negotiate_encoding(request)
+            if coding is not None:
+                content = self._compress(content, tag, coding)
+                headers["Content-Encoding"] = coding
+                self.compressed += 1
+        self.bytes_sent += len(content)
+        return Response(content=content, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return conditional request and compression counters."""
+        return {
+            "responses": self.responses,
+            "not_modified": self.not_modified,
+            "compressed": self.compressed,
+            "compression_hits": self.compression_hits,
+            "compression_entries": len(self._compressed),
+            "bytes_uncompressed": self.bytes_uncompressed,
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+# Create a singleton instance
+response_encoder = ResponseEncoder(
+    enabled=settings.HTTP_COMPRESSION_ENABLED,
+    min_size=settings.HTTP_COMPRESSION_MIN_SIZE,
+    max_entries=settings.HTTP_COMPRESSION_CACHE_ENTRIES,
+)
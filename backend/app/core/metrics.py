@@ -0,0 +1,203 @@
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond serialization to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry rendered in the Prometheus text exposition format.
+
+    Besides counters and histograms, components can register a ``stats()``
+    callable; its numeric values are exported as gauges when scraped, so the
+    existing counters need no extra bookkeeping on the hot path.
+    """
+
+    def __init__(self, namespace: str = "app"):
+        self.namespace = namespace
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Tuple[str, Callable[[], Dict[str, Any]]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create (or return the existing) counter ``<namespace>_<name>``."""
+        return self._register(Counter(f"{self.namespace}_{name}", help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create (or return the existing) histogram ``<namespace>_<name>``."""
+        return self._register(
+            Histogram(f"{self.namespace}_{name}", help, labelnames, buckets)
+        )
+
+    def _register(self, metric: Any) -> Any:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def register_stats(
+        self, prefix: str, collect: Callable[[], Dict[str, Any]]
+    ) -> None:
+        """
+        Export a component's ``stats()`` as gauges named ``<namespace>_<prefix>_<key>``.
+
+        Nested dictionaries are flattened into the name; non-numeric values are skipped.
+        """
+        self._collectors = [c for c in self._collectors if c[0] != prefix]
+        self._collectors.append((prefix, collect))
+
+    def _flatten(
+        self, prefix: str, stats: Dict[str, Any]
+    ) -> Iterator[Tuple[str, float]]:
+        for key, value in stats.items():
+            name = f"{prefix}_{key}"
+            if isinstance(value, dict):
+                yield from self._flatten(name, value)
+            elif isinstance(value, bool):
+                yield name, int(value)
+            elif isinstance(value, (int, float)):
+                yield name, value
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for prefix, collect in self._collectors:
+            for name, value in self._flatten(f"{self.namespace}_{prefix}", collect()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Create a singleton instance
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "request_duration_seconds",
+    "HTTP request latency by route, method and status",
+    ("route", "method", "status"),
+)
+STAGE_DURATION = registry.histogram(
+    "stage_duration_seconds",
+    "Time spent in each stage of request handling",
+    ("stage",),
+)
+UPSTREAM_REQUESTS = registry.counter(
+    "upstream_requests_total",
+    "Upstream HTTP calls by upstream and response status",
+    ("upstream", "status"),
+)
@@ -0,0 +1,130 @@
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from app.core.config import settings
+from app.core.metrics import REQUEST_DURATION, STAGE_DURATION
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Client IDs end up in file names, log lines and response headers
+_REQUEST_ID_RE = re.compile(rb"[A-Za-z0-9._-]{1,64}")
+
+# ID of the request being handled, inherited by tasks it starts
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# HTTP requests currently being handled by this worker
+_in_flight = 0
+
+_tracer: Optional[Any] = None
+if settings.TRACING_ENABLED:
+    try:
+        from opentelemetry import trace
+
+        _tracer = trace.get_tracer("restaurant-recommender")
+    except ImportError:
+        logger.warning("opentelemetry is not installed, tracing spans are disabled")
+
+
+def get_request_id() -> str:
+    """Return the ID of the request being handled, or "-" outside a request."""
+    return request_id_var.get()
+
+
+def in_flight_requests() -> int:
+    """Return the number of HTTP requests this worker is handling right now."""
+    return _in_flight
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds ``request_id`` to every log record so formats can include it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Time a stage of request handling.
+
+    The duration is recorded in ``app_stage_duration_seconds{stage=name}``.
+    When ``TRACING_ENABLED`` is set and OpenTelemetry is installed, the stage
+    is also recorded as a span carrying the request ID and ``attributes``.
+    """
+    start = time.perf_counter()
+    try:
+        if _tracer is None:
+            yield
+        else:
+            with _tracer.start_as_current_span(name) as current:
+                current.set_attribute("request.id", request_id_var.get())
+                for key, value in attributes.items():
+                    current.set_attribute(key, value)
+                yield
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=name)
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware assigning a request ID and recording request latency.
+
+    The ID is taken from the ``X-Request-ID`` header when it is 1-64 letters,
+    digits, dots, underscores or hyphens, and generated otherwise. It is
+    exposed to logs through ``request_id_var`` and echoed in the response.
+    Latency is recorded per route template, so path parameters do not create
+    new series. Requests in progress are counted for ``in_flight_requests``.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        global _in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope["headers"]:
+            if key == REQUEST_ID_HEADER.encode():
+                if _REQUEST_ID_RE.fullmatch(value):
+                    request_id = value.decode("ascii")
+                break
+        token = request_id_var.set(request_id or uuid.uuid4().hex)
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (REQUEST_ID_HEADER.encode(), request_id_var.get().encode())
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _in_flight -= 1
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                route=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=str(status),
+            )
+            request_id_var.reset(token)
@@ -0,0 +1,28 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class CategoryDetail(BaseModel):
+    """A Yelp restaurant category."""
+
+    alias: str
+    title: str
+    parents: List[str] = Field(description="Aliases of the direct parent categories")
+
+
+class CategoryListResponse(BaseModel):
+    """API response for a list of categories."""
+
+    categories: List[CategoryDetail]
+
+
+class CategoryExpansionResponse(BaseModel):
+    """API response for a category filter expanded to its sub-categories."""
+
+    categories: List[str] = Field(description="The requested aliases that are known")
+    expanded: List[str] = Field(
+        description="The known aliases and all of their sub-categories, sorted"
+    )
+    unknown: List[str] = Field(
+        description="The requested aliases that are not categories"
+    )
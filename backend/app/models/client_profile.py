@@ -1,7 +1,6 @@
-from textwrap import dedent
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel, Field
-from app.models.yelp_categories import get_yelp_categories
+from app.models.restaurants import RestaurantSearchParams
 
 
 class ClientProfileParams(BaseModel):
@@ -30,6 +29,30 @@ class ClientProfileParams(BaseModel):
         None, description="Preferred cuisine types"
     )
 
+    def category_text(self) -> str:
+        """Free text used to shortlist candidate categories for the prompt."""
+        return " ".join(
+            value
+            for value in (
+                self.cuisinePreferences,
+                self.dietaryRestrictions,
+                self.otherPurpose,
+                self.additionalNotes,
+            )
+            if value
+        )
+
+
+class ClientProfileBatchParams(BaseModel):
+    """Batch client profile request, e.g. a week of client meetings."""
+
+    profiles: List[ClientProfileParams] = Field(
+        ...,
+        description="Client profiles to generate search parameters and restaurants for",
+        min_length=1,
+        max_length=50,
+    )
+
 
 class ClientProfileRestaurantSearchParams(BaseModel):
     """
@@ -46,14 +69,24 @@ class ClientProfileRestaurantSearchParams(BaseModel):
 
     # Categories
     categories: Optional[List[str]] = Field(
-        description=dedent(
-            f"""List of category aliases. If no information can be inferred, return an empty list. 
-            
-Here are the list of categories that can be chosen from: {get_yelp_categories()}"""
-        )
+        description="List of category aliases, chosen from the candidate categories provided with the client profile. If no information can be inferred, return an empty list."
     )
 
     # Price
     price: Optional[str] = Field(
         description="Comma-separated list of price levels (1, 2, 3, 4). A higher number indicates a more expensive restaurant. Multiple prices can be provided.",
-    )
\ No newline at end of file
+    )
+
+    def to_search_params(self, **overrides: Any) -> RestaurantSearchParams:
+        """Convert the generated parameters into a restaurant search."""
+        categories = self.categories
+        if isinstance(categories, list):
+            categories = ",".join(categories)
+
+        return RestaurantSearchParams(
+            location=self.location,
+            term=self.term,
+            categories=categories or None,
+            price=self.price or None,
+            **overrides,
+        )
@@ -0,0 +1,18 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from app.models.client_profile import ClientProfileRestaurantSearchParams
+from app.models.restaurants import Region, Restaurant
+
+
+class RecommendationResponse(BaseModel):
+    """API response for a client profile turned into ranked restaurants."""
+
+    params: ClientProfileRestaurantSearchParams
+    restaurants: List[Restaurant]
+    total: int
+    region: Optional[Region] = None
+    limit: int
+    location: str
+    prefetch: str = Field(
+        description="Whether the speculative search answered the request: 'hit', 'miss' or 'skipped'"
+    )
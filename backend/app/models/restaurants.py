@@ -10,6 +10,7 @@ class SortBy(str, Enum):
     REVIEW_COUNT = "review_count"
     DISTANCE = "distance"
 
+
 # Request models
 class RestaurantSearchParams(BaseModel):
     """Restaurant search query parameters."""
@@ -78,6 +79,29 @@ class RestaurantSearchParams(BaseModel):
     )
 
 
+class RestaurantBatchSearchParams(BaseModel):
+    """Batch restaurant search request.
+
+    Provide either a list of ``searches`` to run as-is, or a single ``search``
+    plus a ``target_count`` to page through concurrently.
+    """
+
+    searches: List[RestaurantSearchParams] = Field(
+        default_factory=list,
+        description="Searches to run concurrently; results are merged in this order",
+        max_length=10,
+    )
+    search: Optional[RestaurantSearchParams] = Field(
+        None, description="Single search to page through up to `target_count` results"
+    )
+    target_count: Optional[int] = Field(
+        None,
+        description="Number of results to fetch for `search` (max 240)",
+        ge=1,
+        le=240,
+    )
+
+
 # Response models
 class Coordinates(BaseModel):
     """Geographic coordinates."""
@@ -110,9 +134,9 @@ class Location(BaseModel):
 class BusinessHours(BaseModel):
     """Business hours."""
 
-    hour_type: str
+    hours_type: Optional[str] = None
     open: List[Dict[str, Any]]
-    is_open_now: bool
+    is_open_now: Optional[bool] = None
 
 
 class Restaurant(BaseModel):
@@ -141,6 +165,47 @@ class Restaurant(BaseModel):
     attributes: Optional[Dict[str, Any]] = None
 
 
+class ReviewUser(BaseModel):
+    """Author of a review."""
+
+    id: Optional[str] = None
+    profile_url: Optional[str] = None
+    image_url: Optional[str] = None
+    name: str
+
+
+class Review(BaseModel):
+    """Review excerpt."""
+
+    id: str
+    url: Optional[str] = None
+    text: str
+    rating: float
+    time_created: str
+    user: ReviewUser
+
+
+class RestaurantDetails(Restaurant):
+    """Restaurant with its full details and, if requested, review excerpts."""
+
+    reviews: Optional[List[Review]] = None
+
+
+class RestaurantDetailsError(BaseModel):
+    """A business whose details could not be fetched."""
+
+    id: str
+    detail: str
+    retry_after: Optional[float] = None
+
+
+class RestaurantDetailsResponse(BaseModel):
+    """API response for a batch of business details."""
+
+    restaurants: List[RestaurantDetails]
+    errors: List[RestaurantDetailsError] = []
+
+
 class Region(BaseModel):
     """Region information."""
 
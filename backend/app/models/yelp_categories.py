@@ -1,23 +1,371 @@
-import json
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
-def get_yelp_categories():
-    with open("app/constants/categories.json", "r") as f:
-        categories = json.load(f)
+import orjson
 
-        categories = categories["categories"]
+# Resolved relative to the package so the app can start from any directory
+CATEGORIES_PATH = (
+    Path(__file__).resolve().parent.parent / "constants" / "categories.json"
+)
 
-        # Filter categories related to restaurants
-        restaurant_categories = [
-            category
-            for category in categories
-            if "restaurants" in category["parent_aliases"]
-            or category["alias"] == "restaurants"
+# Root of the categories that can be used for restaurant searches
+RESTAURANTS_ALIAS = "restaurants"
+
+# Extra phrases that should map to a category, beyond its alias and title
+CATEGORY_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "bbq": ("barbecue", "bbq", "smokehouse"),
+    "breakfast_brunch": ("breakfast", "brunch"),
+    "cafes": ("coffee", "cafe"),
+    "gluten_free": ("gluten", "celiac", "coeliac"),
+    "halal": ("no pork",),
+    "hotdogs": ("fast food",),
+    "indpak": ("indian", "curry"),
+    "latin": ("south american",),
+    "mideastern": ("middle eastern", "levantine"),
+    "modern_european": ("european", "contemporary", "fine dining"),
+    "newamerican": ("contemporary", "modern american", "fine dining"),
+    "seafood": ("fish", "oysters", "oyster"),
+    "steak": ("steak", "steakhouse", "chophouse"),
+    "sushi": ("sushi", "omakase"),
+    "tapasmallplates": ("small plates", "sharing plates"),
+    "tradamerican": ("american",),
+    "vegan": ("plant based", "plant-based"),
+    "vegetarian": ("veggie", "plant based", "plant-based", "meatless"),
+}
+
+# Business-appropriate categories always offered to the LLM as candidates
+DEFAULT_SHORTLIST = (
+    "newamerican",
+    "modern_european",
+    "french",
+    "italian",
+    "steak",
+    "seafood",
+    "japanese",
+    "mediterranean",
+    "tapasmallplates",
+    "brasseries",
+)
+
+# Single words that appear in category names but are too ambiguous to match on
+AMBIGUOUS_WORDS = {"chips", "live", "raw", "reunion", "southern"}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _adjacency(lists: Iterable[Iterable[int]]) -> Tuple[array, array]:
+    """Pack per-node neighbour lists into CSR offsets and targets arrays."""
+    offsets, targets = array("I", [0]), array("I")
+    for items in lists:
+        targets.extend(items)
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+class PrefixTrie:
+    """
+    Character trie mapping normalized keys to integer values, for completion.
+
+    Entries are inserted in sorted order, so the entries under any node are
+    a contiguous run of ``values``; each node stores that run as two ints
+    rather than a list of matches, and a lookup costs one step per prefix
+    character.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, int]]):
+        entries = sorted(set(entries))
+        self.values = array("I", (value for _, value in entries))
+        self._edges: List[Dict[str, int]] = [{}]
+        self._start = array("I", [0])
+        self._end = array("I", [len(entries)])
+
+        for position, (key, _) in enumerate(entries):
+            node = 0
+            for char in key:
+                child = self._edges[node].get(char)
+                if child is None:
+                    child = len(self._edges)
+                    self._edges[node][char] = child
+                    self._edges.append({})
+                    self._start.append(position)
+                    self._end.append(position)
+                self._end[child] = position + 1
+                node = child
+
+    def find(self, prefix: str) -> Sequence[int]:
+        """Values of every key starting with ``prefix``, in key order."""
+        node = 0
+        for char in prefix:
+            node = self._edges[node].get(char)
+            if node is None:
+                return ()
+        return self.values[self._start[node] : self._end[node]]
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryInfo:
+    """A Yelp category with its precomputed metadata."""
+
+    alias: str
+    title: str
+    parents: Tuple[str, ...]
+    parent_chain: Tuple[str, ...]
+    synonyms: Tuple[str, ...]
+
+
+class CategoryIndex:
+    """
+    In-memory index over the Yelp category list.
+
+    Built once from ``categories.json``; lookups by alias, title and phrase
+    are dictionary reads. Aliases are interned and numbered in title order,
+    the hierarchy is stored as CSR adjacency arrays over those numbers, and
+    restaurant titles are in a prefix trie for autocomplete. Descendant sets
+    are computed once per alias, on first use.
+    """
+
+    def __init__(self, categories: Iterable[Dict]):
+        raw = {sys.intern(category["alias"]): category for category in categories}
+
+        self.aliases: Tuple[str, ...] = tuple(
+            sorted(raw, key=lambda alias: (raw[alias]["title"].lower(), alias))
+        )
+        self.ids: Dict[str, int] = {alias: i for i, alias in enumerate(self.aliases)}
+
+        parent_ids = [
+            sorted(self.ids[p] for p in raw[alias]["parent_aliases"] if p in self.ids)
+            for alias in self.aliases
         ]
+        child_ids: List[List[int]] = [[] for _ in self.aliases]
+        for child, parents in enumerate(parent_ids):
+            for parent in parents:
+                child_ids[parent].append(child)
+        self._parent_offsets, self._parent_targets = _adjacency(parent_ids)
+        self._child_offsets, self._child_targets = _adjacency(child_ids)
+        self._descendants: Dict[int, FrozenSet[str]] = {}
+
+        self.categories: Dict[str, CategoryInfo] = {}
+        for alias in self.aliases:
+            category = raw[alias]
+            self.categories[alias] = CategoryInfo(
+                alias=alias,
+                title=category["title"],
+                parents=self.parents(alias),
+                parent_chain=tuple(self._parent_chain(alias, raw)),
+                synonyms=CATEGORY_SYNONYMS.get(alias, ()),
+            )
+
+        self.restaurant_aliases: Set[str] = {
+            alias
+            for alias, info in self.categories.items()
+            if alias == RESTAURANTS_ALIAS or RESTAURANTS_ALIAS in info.parent_chain
+        }
+
+        self._by_title: Dict[str, str] = {
+            info.title.lower(): alias for alias, info in self.categories.items()
+        }
+
+        # Normalized title, alias and every title word suffix ("food" for
+        # "Fast Food") -> id, over the searchable restaurant categories
+        self._title_keys: Dict[int, str] = {}
+        entries: List[Tuple[str, int]] = []
+        for alias in self.restaurant_aliases - {RESTAURANTS_ALIAS}:
+            category_id = self.ids[alias]
+            words = _words(self.categories[alias].title)
+            self._title_keys[category_id] = " ".join(words)
+            entries.append((" ".join(_words(alias.replace("_", " "))), category_id))
+            entries.extend(
+                (" ".join(words[i:]), category_id) for i in range(len(words))
+            )
+        self._trie = PrefixTrie(entries)
+
+        # Phrase (1-3 words) -> restaurant aliases it refers to
+        self._phrases: Dict[str, Set[str]] = {}
+        for alias in self.restaurant_aliases:
+            if alias == RESTAURANTS_ALIAS:
+                continue
+            info = self.categories[alias]
+            for phrase in self._phrases_for(info):
+                self._phrases.setdefault(phrase, set()).add(alias)
+
+    @staticmethod
+    def _parent_chain(alias: str, raw: Dict[str, Dict]) -> List[str]:
+        """All ancestors of a category, nearest first."""
+        chain: List[str] = []
+        queue = list(raw.get(alias, {}).get("parent_aliases", []))
+        while queue:
+            parent = queue.pop(0)
+            if parent in chain:
+                continue
+            chain.append(parent)
+            queue.extend(raw.get(parent, {}).get("parent_aliases", []))
+        return chain
+
+    @staticmethod
+    def _phrases_for(info: CategoryInfo) -> Set[str]:
+        """Phrases that identify a category: alias, title, title parts and synonyms."""
+        title = re.sub(r"\(.*?\)", "", info.title)
+        candidates = [info.alias.replace("_", " "), title, *info.synonyms]
+        candidates += re.split(r"[/&]", title)
+        phrases = {" ".join(_words(text)) for text in candidates if _words(text)}
+        return phrases - AMBIGUOUS_WORDS
+
+    def get(self, alias: str) -> Optional[CategoryInfo]:
+        """Return the metadata for an alias, if it exists."""
+        return self.categories.get(alias)
+
+    def _neighbours(
+        self, offsets: array, targets: array, alias: str
+    ) -> Tuple[str, ...]:
+        index = self.ids.get(alias)
+        if index is None:
+            return ()
+        return tuple(
+            self.aliases[i] for i in targets[offsets[index] : offsets[index + 1]]
+        )
+
+    def parents(self, alias: str) -> Tuple[str, ...]:
+        """Direct parents of a category, in title order."""
+        return self._neighbours(self._parent_offsets, self._parent_targets, alias)
+
+    def children(self, alias: str) -> Tuple[str, ...]:
+        """Direct sub-categories of a category, in title order."""
+        return self._neighbours(self._child_offsets, self._child_targets, alias)
+
+    def descendants(self, alias: str) -> FrozenSet[str]:
+        """All sub-categories of a category, at any depth; empty if unknown."""
+        index = self.ids.get(alias)
+        if index is None:
+            return frozenset()
+        cached = self._descendants.get(index)
+        if cached is not None:
+            return cached
+
+        offsets, targets = self._child_offsets, self._child_targets
+        seen: Set[int] = set()
+        queue = [index]
+        while queue:
+            node = queue.pop()
+            for child in targets[offsets[node] : offsets[node + 1]]:
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+        descendants = frozenset(self.aliases[i] for i in seen)
+        self._descendants[index] = descendants
+        return descendants
+
+    def expand(self, aliases: Iterable[str]) -> FrozenSet[str]:
+        """
+        Aliases together with all of their sub-categories.
+
+        Yelp's category filter matches sub-categories too, so a business
+        matches a requested category when one of its aliases is in this set.
+        Unknown aliases are kept as they are.
+        """
+        expanded: Set[str] = set()
+        for alias in aliases:
+            expanded.add(alias)
+            expanded |= self.descendants(alias)
+        return frozenset(expanded)
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Restaurant categories whose title, a word of the title or alias starts with ``prefix``.
+
+        Titles that start with the prefix come first; ties are in title order.
+        """
+        key = " ".join(_words(prefix))
+        if not key:
+            return []
+        matches = set(self._trie.find(key))
+        ranked = sorted(
+            matches, key=lambda i: (not self._title_keys[i].startswith(key), i)
+        )
+        return [self.aliases[i] for i in ranked[:limit]]
+
+    def resolve(self, value: str) -> Optional[str]:
+        """
+        Map an alias or title to a restaurant category alias.
+
+        Returns:
+            The canonical alias, or None if it is not a restaurant category.
+        """
+        value = value.strip().lower()
+        alias = value if value in self.categories else self._by_title.get(value)
+        if alias in self.restaurant_aliases and alias != RESTAURANTS_ALIAS:
+            return alias
+        return None
+
+    def validate(self, values: Iterable[str]) -> List[str]:
+        """Resolve a list of aliases or titles, dropping unknown ones and duplicates."""
+        aliases: List[str] = []
+        for value in values:
+            alias = self.resolve(value)
+            if alias is not None and alias not in aliases:
+                aliases.append(alias)
+        return aliases
+
+    def match(self, text: str) -> List[str]:
+        """Restaurant aliases mentioned in free text, in order of appearance."""
+        words = _words(text)
+        matches: List[str] = []
+        for start in range(len(words)):
+            for size in (3, 2, 1):
+                phrase = " ".join(words[start : start + size])
+                for alias in sorted(self._phrases.get(phrase, ())):
+                    if alias not in matches:
+                        matches.append(alias)
+        return matches
+
+    def shortlist(self, text: str, size: int = 25) -> List[str]:
+        """
+        Pick the candidate categories to offer the LLM for a piece of text.
+
+        Categories mentioned in the text come first, followed by their
+        sub-categories and then the business-appropriate defaults.
+        """
+        matches = self.match(text)
+        candidates = list(matches)
+        for alias in matches:
+            candidates.extend(sorted(self.children(alias)))
+        candidates.extend(DEFAULT_SHORTLIST)
+
+        shortlist: List[str] = []
+        for alias in candidates:
+            if alias in self.restaurant_aliases and alias not in shortlist:
+                shortlist.append(alias)
+        return shortlist[:size]
+
+    def describe(self, aliases: Iterable[str]) -> str:
+        """Render aliases with their titles for use in a prompt."""
+        return ", ".join(
+            f"{alias} ({self.categories[alias].title})" for alias in aliases
+        )
+
 
-        # Sort categories alphabetically by title
-        sorted_categories = sorted(restaurant_categories, key=lambda x: x["title"])
+@lru_cache(maxsize=1)
+def get_category_index() -> CategoryIndex:
+    """Load and index the Yelp categories on first use, once per process."""
+    with open(CATEGORIES_PATH, "rb") as f:
+        return CategoryIndex(orjson.loads(f.read())["categories"])
 
-        # List of categories
-        categories_list = [category["alias"] for category in sorted_categories]
 
-        return categories_list
+@lru_cache(maxsize=1)
+def get_yelp_categories() -> Tuple[str, ...]:
+    """The "restaurants" category and its direct sub-categories, sorted by title."""
+    index = get_category_index()
+    return tuple(
+        sorted(
+            (RESTAURANTS_ALIAS, *index.children(RESTAURANTS_ALIAS)),
+            key=lambda alias: index.categories[alias].title,
+        )
+    )
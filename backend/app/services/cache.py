@@ -0,0 +1,349 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Type
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached value and the time it was stored."""
+
+    value: Any
+    stored_at: float
+
+
+class CacheBackend(ABC):
+    """Storage backend for ``ResponseCache``."""
+
+    # Whether calls do blocking I/O and should run off the event loop
+    blocking: bool = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for a key, or None if it is not stored."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used ones if full."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU backend bounded by entry count."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    SQLite-backed LRU backend shared by every worker on the host.
+
+    Values must be JSON-serializable.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 10000):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (time.time(), self.namespace, key),
+            )
+        return CacheEntry(value=json.loads(row[0]), stored_at=row[1])
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        value = json.dumps(entry.value, separators=(",", ":"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, value, entry.stored_at, time.time()),
+            )
+            evicted = self._conn.execute(
+                """
+                DELETE FROM cache WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.namespace, self.namespace, self.max_entries),
+            ).rowcount
+        self.evictions += max(evicted, 0)
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ?", (self.namespace,)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Async TTL cache with stale-while-revalidate on top of a ``CacheBackend``.
+
+    Entries younger than ``ttl`` are fresh. Entries older than ``ttl`` but
+    younger than ``ttl + stale_ttl`` are served immediately while a single
+    background refresh replaces them. Anything older is a miss, but is kept
+    for another ``grace_ttl`` seconds as a fallback for when fetching fails
+    with one of the errors passed to ``get_or_fetch``.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float,
+        stale_ttl: float = 0,
+        name: str = "cache",
+        grace_ttl: float = 0,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.grace_ttl = grace_ttl
+        self.name = name
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+    async def _call(self, method: Callable, *args: Any) -> Any:
+        """Run a backend method, off the event loop if it blocks."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def get_entry(self, key: str, grace: bool = False) -> Optional[CacheEntry]:
+        """
+        Return the raw entry (fresh or stale) without touching the counters.
+
+        Args:
+            key: The cache key.
+            grace: Also return entries past the stale window but within the
+                grace period.
+        """
+        entry = await self._call(self.backend.get, key)
+        if entry is None:
+            return None
+        age = time.time() - entry.stored_at
+        if age > self.ttl + self.stale_ttl + self.grace_ttl:
+            await self._call(self.backend.delete, key)
+            return None
+        if age > self.ttl + self.stale_ttl and not grace:
+            return None
+        return entry
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value as fresh."""
+        await self._call(self.backend.set, key, CacheEntry(value, time.time()))
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+        fallback_errors: Tuple[Type[Exception], ...] = (),
+    ) -> Any:
+        """
+        Return the cached value for a key, fetching and storing it on a miss.
+
+        Args:
+            key: The cache key.
+            fetch: Coroutine factory that produces a fresh value.
+            refresh: Coroutine factory used for background refreshes of stale
+                entries (defaults to ``fetch``).
+            fallback_errors: Errors from ``fetch`` for which an expired entry
+                still within the grace period is served instead.
+
+        Returns:
+            The cached or freshly fetched value.
+        """
+        entry = await self.get_entry(key, grace=bool(fallback_errors))
+
+        if entry is not None:
+            age = time.time() - entry.stored_at
+            if age <= self.ttl:
+                self.hits += 1
+                return entry.value
+
+            if age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._schedule_refresh(key, refresh or fetch)
+                return entry.value
+
+        self.misses += 1
+        try:
+            value = await fetch()
+        except fallback_errors as e:
+            if entry is None:
+                raise
+            self.fallbacks += 1
+            logger.warning(f"Serving expired {self.name} entry: {str(e)}")
+            return entry.value
+        await self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Refresh a stale entry in the background, once per key."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                value = await fetch()
+                await self.set(key, value)
+                self.refreshes += 1
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning(f"Background refresh failed for {self.name}: {str(e)}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def close(self) -> None:
+        """Cancel pending background refreshes."""
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        if self._refresh_tasks:
+            await asyncio.gather(*self._refresh_tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this cache."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+
+def build_cache_backend(
+    backend: str, namespace: str, max_entries: int, path: str
+) -> CacheBackend:
+    """Create a cache backend from its configured name ("memory" or "disk")."""
+    if backend == "memory":
+        return MemoryCacheBackend(max_entries=max_entries)
+    if backend == "disk":
+        return DiskCacheBackend(path=path, namespace=namespace, max_entries=max_entries)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+def make_cache_key(namespace: str, payload: Dict[str, Any]) -> str:
+    """Hash a canonical payload into a compact cache key."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha256(encoded.encode()).hexdigest()}"
@@ -0,0 +1,146 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class ResponseCapture:
+    """
+    Sampled capture of upstream payloads for offline replay.
+
+    ``submit`` never blocks: captures are queued and written by a background
+    task as gzip-compressed JSON files, one per capture, named after the
+    request ID with a random suffix so captures of one request in the same
+    second do not overwrite each other. Once the directory holds more than
+    ``max_files`` captures the oldest are removed.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        sample_rate: float,
+        directory: str,
+        max_files: int,
+        queue_size: int = 100,
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_files = max_files
+        self.queue_size = queue_size
+
+        self.captured = 0
+        self.dropped = 0
+        self.errors = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background writer if capture is enabled."""
+        if not self.enabled or self._worker is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Response capture enabled (sample_rate={self.sample_rate}, directory={self.directory})"
+        )
+
+    async def stop(self) -> None:
+        """Flush queued captures and stop the background writer."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out flushing response captures")
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        self._queue = None
+
+    def submit(
+        self, name: str, payload: Dict[str, Any], request_id: Optional[str] = None
+    ) -> bool:
+        """
+        Queue a payload for capture if it is sampled.
+
+        Args:
+            name: Short label for the payload, used as the file name prefix.
+            payload: JSON-serializable data to write.
+            request_id: ID of the originating request; generated if omitted.
+
+        Returns:
+            True if the payload was queued.
+        """
+        if self._queue is None or random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((name, request_id or uuid.uuid4().hex, payload))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def _run(self) -> None:
+        """Write queued captures off the event loop."""
+        while True:
+            name, request_id, payload = await self._queue.get()
+            try:
+                await asyncio.to_thread(self._write, name, request_id, payload)
+                self.captured += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to write response capture: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name: str, request_id: str, payload: Dict[str, Any]) -> None:
+        """Write one compressed capture file and rotate old ones."""
+        timestamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        suffix = uuid.uuid4().hex[:8]
+        path = os.path.join(
+            self.directory, f"{name}-{timestamp}-{request_id}-{suffix}.json.gz"
+        )
+        tmp_path = f"{path}.tmp"
+
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+        self._rotate()
+
+    def _rotate(self) -> None:
+        """Delete the oldest captures beyond ``max_files``."""
+        with os.scandir(self.directory) as entries:
+            files = [
+                entry
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(".json.gz")
+            ]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[: len(files) - self.max_files]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return capture counters."""
+        return {
+            "enabled": self.enabled,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
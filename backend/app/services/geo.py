@@ -0,0 +1,107 @@
+import math
+from typing import List, Set, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = 9) -> str:
+    """Encode a coordinate as a geohash of the given length."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lng_range[0] = mid
+            else:
+                value <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_range[0] = mid
+            else:
+                value <<= 1
+                lat_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def decode_geohash(geohash: str) -> Tuple[float, float]:
+    """Return the center coordinate of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell at the given precision."""
+    bits = precision * 5
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (2**lat_bits), 360.0 / (2**lng_bits)
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two coordinates in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def cover_circle(
+    latitude: float, longitude: float, radius_m: float, precision: int
+) -> List[str]:
+    """Geohash cells at ``precision`` that cover a circle's bounding box."""
+    d_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+    d_lng = d_lat / max(math.cos(math.radians(latitude)), 1e-6)
+    cell_lat, cell_lng = cell_size_degrees(precision)
+
+    cells: Set[str] = set()
+    lat = latitude - d_lat
+    while True:
+        lng = longitude - d_lng
+        while True:
+            cells.add(encode_geohash(lat, lng, precision))
+            if lng >= longitude + d_lng:
+                break
+            lng = min(lng + cell_lng, longitude + d_lng)
+        if lat >= latitude + d_lat:
+            break
+        lat = min(lat + cell_lat, latitude + d_lat)
+
+    return sorted(cells)
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+from app.services.geo import encode_geohash
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Word-level rewrites so common spellings of the same place compare equal
+LOCATION_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "boulevard": "blvd",
+    "drive": "dr",
+    "east": "e",
+    "west": "w",
+    "north": "n",
+    "south": "s",
+    "ontario": "on",
+}
+
+# Words that carry no location information
+LOCATION_FILLER_WORDS = {"the", "of", "in", "near", "area", "around"}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_location(location: str) -> str:
+    """
+    Normalize a free-text location so trivial variations share one key.
+
+    Lowercases, drops punctuation and filler words and abbreviates common
+    address words, so "Downtown Toronto, Ontario" and "downtown toronto on"
+    normalize to the same string. Word order is kept: "100 1st Ave" and
+    "1 100th Ave" are different places.
+    """
+    return " ".join(
+        LOCATION_ABBREVIATIONS.get(word, word)
+        for word in _WORD_RE.findall(location.lower())
+        if word not in LOCATION_FILLER_WORDS
+    )
+
+
+@dataclass(frozen=True)
+class ResolvedLocation:
+    """Coordinates and region key for a free-text location."""
+
+    latitude: float
+    longitude: float
+    region_key: str
+
+
+class LocationResolver:
+    """
+    Memoizes free-text locations to coordinates and a geohash region key.
+
+    Resolutions are learned from the ``region.center`` Yelp returns for
+    location searches and persisted in SQLite, with an in-process LRU in
+    front of the table.
+    """
+
+    def __init__(
+        self, path: str, region_precision: int, max_memory_entries: int = 4096
+    ):
+        self.path = path
+        self.region_precision = region_precision
+        self.max_memory_entries = max_memory_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, Optional[ResolvedLocation]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the locations table on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS locations (
+                        normalized TEXT PRIMARY KEY,
+                        latitude REAL NOT NULL,
+                        longitude REAL NOT NULL,
+                        region_key TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                    """
+                )
+        return self._conn
+
+    def _remember(self, normalized: str, resolved: Optional[ResolvedLocation]) -> None:
+        self._memory[normalized] = resolved
+        self._memory.move_to_end(normalized)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, normalized: str) -> Optional[ResolvedLocation]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT latitude, longitude, region_key FROM locations WHERE normalized = ?",
+                    (normalized,),
+                )
+                .fetchone()
+            )
+        return ResolvedLocation(*row) if row else None
+
+    def _save(self, normalized: str, resolved: ResolvedLocation) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO locations VALUES (?, ?, ?, ?, ?)",
+                    (
+                        normalized,
+                        resolved.latitude,
+                        resolved.longitude,
+                        resolved.region_key,
+                        time.time(),
+                    ),
+                )
+
+    async def resolve(self, location: Optional[str]) -> Optional[ResolvedLocation]:
+        """
+        Return the known coordinates for a free-text location.
+
+        Returns:
+            The resolved location, or None if it has not been learned yet.
+        """
+        if not location:
+            return None
+        normalized = normalize_location(location)
+
+        if normalized in self._memory:
+            self._memory.move_to_end(normalized)
+            resolved = self._memory[normalized]
+        else:
+            resolved = await asyncio.to_thread(self._load, normalized)
+            self._remember(normalized, resolved)
+
+        if resolved is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return resolved
+
+    def learn(self, location: str, center: Dict[str, Any]) -> None:
+        """
+        Record the coordinates Yelp resolved a location to, off the request path.
+
+        Args:
+            location: The free-text location that was searched.
+            center: The ``region.center`` from the Yelp response.
+        """
+        normalized = normalize_location(location)
+        if not normalized:
+            return
+
+        latitude, longitude = center["latitude"], center["longitude"]
+        resolved = ResolvedLocation(
+            latitude=latitude,
+            longitude=longitude,
+            region_key=encode_geohash(latitude, longitude, self.region_precision),
+        )
+        if self._memory.get(normalized) == resolved:
+            return
+        self._remember(normalized, resolved)
+
+        async def save() -> None:
+            try:
+                await asyncio.to_thread(self._save, normalized, resolved)
+            except Exception as e:
+                logger.error(f"Failed to save location: {str(e)}")
+
+        task = asyncio.create_task(save())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        """Wait for pending writes."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return resolution counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+        }
@@ -0,0 +1,424 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+import orjson
+from app.core.config import settings
+from app.core.tracing import in_flight_requests
+from app.models.restaurants import RestaurantSearchParams, SortBy
+from app.services.rate_limit import Priority
+from app.services.yelp import YelpService, search_cache_key, yelp_service
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves from concurrent workers may overwrite each other
+    fcntl = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DAY = 86400.0
+
+
+@dataclass
+class HotSearch:
+    """A first-page search with its decayed request count per hour of the day."""
+
+    params: RestaurantSearchParams
+    hours: List[float] = field(default_factory=lambda: [0.0] * 24)
+    updated_at: float = 0.0
+
+    def decay(self, now: float, half_life: float) -> None:
+        """Age the counts to ``now``."""
+        factor = 0.5 ** ((now - self.updated_at) / half_life)
+        self.hours = [count * factor for count in self.hours]
+        self.updated_at = now
+
+    def total(self, now: float, half_life: float) -> float:
+        """Decayed request count over the whole day, without updating the counts."""
+        return sum(self.hours) * 0.5 ** ((now - self.updated_at) / half_life)
+
+    def score(self, hours: Tuple[int, ...]) -> float:
+        """Decayed request count over the given hours of the day."""
+        return sum(self.hours[hour] for hour in hours)
+
+    def copy(self) -> "HotSearch":
+        """An independent copy of the counts."""
+        return HotSearch(self.params, list(self.hours), self.updated_at)
+
+
+def is_prefetchable(params: RestaurantSearchParams) -> bool:
+    """Whether a search is worth warming: its results do not depend on the time."""
+    return not (params.open_now or params.open_at or params.reservation_date)
+
+
+class PrefetchScheduler:
+    """
+    Warms the search cache with the searches clients are likely to make next.
+
+    After a search is served, its next page and the same search under the
+    other ``PREFETCH_SORTS`` orders are queued. Every first-page search is
+    also counted per hour of the day with exponential decay, and every
+    ``popular_interval`` the most requested searches for the current and
+    next hour are queued, so the morning's usual locations and categories
+    are fresh before the morning's traffic asks for them.
+
+    One worker drains the queue at background priority, one call every
+    ``call_interval`` seconds, skipping searches that are already fresh. It
+    pauses, and follow-ups are not queued, while the worker handles
+    ``max_foreground`` or more requests, calls are waiting for rate limiter
+    tokens or the remaining Yelp quota is reserved for interactive calls. It
+    spends at most ``quota_share`` of the daily limit per rolling day.
+
+    Every worker process keeps its own counts. On shutdown each adds the
+    requests it counted to the saved state, under a file lock, so workers
+    do not overwrite each other's counts.
+    """
+
+    def __init__(
+        self,
+        yelp: YelpService,
+        enabled: bool = True,
+        quota_share: float = 0.1,
+        next_page: bool = True,
+        sorts: Tuple[SortBy, ...] = (),
+        queue_size: int = 200,
+        call_interval: float = 0.2,
+        max_foreground: int = 8,
+        pause_interval: float = 1.0,
+        max_hot_keys: int = 1000,
+        half_life: float = 3 * DAY,
+        popular_interval: float = 900,
+        popular_keys: int = 20,
+        popular_min_score: float = 2.0,
+        state_path: Optional[str] = None,
+    ):
+        self.yelp = yelp
+        self.enabled = enabled
+        self.quota_share = quota_share
+        self.next_page = next_page
+        self.sorts = sorts
+        self.queue_size = queue_size
+        self.call_interval = call_interval
+        self.max_foreground = max_foreground
+        self.pause_interval = pause_interval
+        self.max_hot_keys = max_hot_keys
+        self.half_life = half_life
+        self.popular_interval = popular_interval
+        self.popular_keys = popular_keys
+        self.popular_min_score = popular_min_score
+        self.state_path = state_path
+
+        self.hot: Dict[str, HotSearch] = {}
+        # The counts as loaded or last saved, so only new requests are added
+        self._saved: Dict[str, HotSearch] = {}
+        self._queue: Deque[Tuple[str, RestaurantSearchParams]] = deque()
+        self._queued: Set[str] = set()
+        self._wake = asyncio.Event()
+        self._calls: Deque[float] = deque()
+        self._tasks: List[asyncio.Task] = []
+
+        self.observed = 0
+        self.warmed = 0
+        self.fresh = 0
+        self.errors = 0
+        self.paused = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def _enqueue(self, params: RestaurantSearchParams) -> None:
+        """Queue a search unless it is already queued; the oldest is dropped when full."""
+        key = search_cache_key(params)
+        if key in self._queued:
+            return
+        if len(self._queue) >= self.queue_size:
+            old_key, _ = self._queue.popleft()
+            self._queued.discard(old_key)
+            self.dropped += 1
+        self._queue.append((key, params))
+        self._queued.add(key)
+        self._wake.set()
+
+    def _record(self, params: RestaurantSearchParams, now: float) -> None:
+        """Count a request for the first page of a search."""
+        first_page = params.model_copy(update={"offset": 0})
+        key = search_cache_key(first_page)
+        hot = self.hot.get(key)
+        if hot is None:
+            if len(self.hot) >= self.max_hot_keys:
+                coldest = min(
+                    self.hot, key=lambda k: self.hot[k].total(now, self.half_life)
+                )
+                del self.hot[coldest]
+                self._saved.pop(coldest, None)
+            hot = self.hot[key] = HotSearch(first_page, updated_at=now)
+        hot.decay(now, self.half_life)
+        hot.hours[time.localtime(now).tm_hour] += 1
+
+    def observe(self, params: RestaurantSearchParams, data: Dict[str, Any]) -> None:
+        """
+        Learn from a served search and queue its likely follow-ups.
+
+        Args:
+            params: The search as the client made it.
+            data: The raw Yelp response, for the total number of results.
+        """
+        if not self.enabled or not is_prefetchable(params):
+            return
+        self.observed += 1
+        self._record(params, time.time())
+        if self._busy():
+            self.skipped += 1
+            return
+
+        # The next page as a client would ask for it: same size, within Yelp's cap
+        offset = (params.offset or 0) + (params.limit or 20)
+        if self.next_page and offset < min(
+            data.get("total") or 0, settings.YELP_MAX_RESULTS
+        ):
+            limit = min(params.limit or 20, settings.YELP_MAX_RESULTS - offset)
+            self._enqueue(params.model_copy(update={"offset": offset, "limit": limit}))
+        if not params.offset:
+            for sort_by in self.sorts:
+                if sort_by != params.sort_by:
+                    self._enqueue(params.model_copy(update={"sort_by": sort_by}))
+
+    def popular(self, now: Optional[float] = None) -> List[RestaurantSearchParams]:
+        """The most requested first-page searches for the current and next hour."""
+        now = time.time() if now is None else now
+        hour = time.localtime(now).tm_hour
+        hours = (hour, (hour + 1) % 24)
+        scored = []
+        for hot in self.hot.values():
+            hot.decay(now, self.half_life)
+            score = hot.score(hours)
+            if score >= self.popular_min_score:
+                scored.append((score, hot.params))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [params for _, params in scored[: self.popular_keys]]
+
+    def budget(self) -> int:
+        """
+        Prefetch calls this worker may make per rolling day.
+
+        A ``quota_share`` of Yelp's daily limit, split between the workers.
+        """
+        daily_limit = settings.YELP_DAILY_LIMIT
+        if self.yelp.limiter is not None and self.yelp.limiter.quota.daily_limit:
+            daily_limit = self.yelp.limiter.quota.daily_limit
+        return int(daily_limit * self.quota_share / max(settings.SERVER_WORKERS, 1))
+
+    def _calls_today(self, now: float) -> int:
+        while self._calls and self._calls[0] <= now - DAY:
+            self._calls.popleft()
+        return len(self._calls)
+
+    def _busy(self) -> bool:
+        """Whether foreground traffic, the rate limit or the quota reserve should pause prefetching."""
+        if in_flight_requests() >= self.max_foreground:
+            return True
+        limiter = self.yelp.limiter
+        return limiter is not None and (
+            limiter.saturated() or not limiter.quota.allows(Priority.BACKGROUND)
+        )
+
+    async def _run(self) -> None:
+        """Drain the queue, one background call at a time."""
+        while True:
+            await self._wake.wait()
+            while self._queue:
+                if self._calls_today(time.time()) >= self.budget():
+                    self.dropped += len(self._queue)
+                    self._queue.clear()
+                    self._queued.clear()
+                    break
+                if self._busy():
+                    self.paused += 1
+                    await asyncio.sleep(self.pause_interval)
+                    continue
+
+                key, params = self._queue.popleft()
+                self._queued.discard(key)
+                try:
+                    called = await self.yelp.warm(params)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Prefetch failed: {str(e)}")
+                    called = True
+                if not called:
+                    self.fresh += 1
+                    continue
+                self._calls.append(time.time())
+                self.warmed += 1
+                await asyncio.sleep(self.call_interval)
+            self._wake.clear()
+
+    async def _warm_popular(self) -> None:
+        """Queue the popular searches for the coming hour, every ``popular_interval``."""
+        while True:
+            searches = self.popular()
+            for params in searches:
+                self._enqueue(params)
+            if searches:
+                logger.info(f"Queued {len(searches)} popular searches for warming")
+            await asyncio.sleep(self.popular_interval)
+
+    def _read_state(self) -> Dict[str, HotSearch]:
+        """The hot searches in the state file, most requested first."""
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "rb") as f:
+            saved = orjson.loads(f.read())
+        state = {}
+        for item in saved:
+            params = RestaurantSearchParams(**item["params"])
+            state[search_cache_key(params)] = HotSearch(
+                params, item["hours"], item["updated_at"]
+            )
+        return state
+
+    @contextmanager
+    def _state_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the state file across processes."""
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.state_path}.lock", "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _load(self) -> None:
+        """Read the hot searches saved by previous processes."""
+        if not self.state_path:
+            return
+        try:
+            state = self._read_state()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not load prefetch state: {str(e)}")
+            return
+        for key in list(state)[: self.max_hot_keys]:
+            self.hot[key] = state[key]
+            self._saved[key] = state[key].copy()
+
+    def _save(self) -> None:
+        """Add the requests counted since loading to the saved hot searches."""
+        if not self.state_path:
+            return
+        now = time.time()
+        with self._state_lock():
+            try:
+                state = self._read_state()
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Replacing unreadable prefetch state: {str(e)}")
+                state = {}
+
+            for key, hot in self.hot.items():
+                hot.decay(now, self.half_life)
+                counted = hot.hours
+                saved = self._saved.get(key)
+                if saved is not None:
+                    saved.decay(now, self.half_life)
+                    counted = [
+                        max(count - before, 0.0)
+                        for count, before in zip(hot.hours, saved.hours)
+                    ]
+                current = state.get(key)
+                if current is None:
+                    state[key] = HotSearch(hot.params, list(counted), now)
+                else:
+                    current.decay(now, self.half_life)
+                    current.hours = [
+                        count + added for count, added in zip(current.hours, counted)
+                    ]
+
+            ranked = sorted(
+                state.values(),
+                key=lambda hot: hot.total(now, self.half_life),
+                reverse=True,
+            )
+            saved = [
+                {
+                    "params": hot.params.model_dump(mode="json", exclude_none=True),
+                    "hours": hot.hours,
+                    "updated_at": hot.updated_at,
+                }
+                for hot in ranked[: self.max_hot_keys]
+            ]
+            # Per process, so workers never write the same temporary file
+            tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(saved))
+            os.replace(tmp_path, self.state_path)
+        self._saved = {key: hot.copy() for key, hot in self.hot.items()}
+
+    async def start(self) -> None:
+        """Load the saved hot searches and start warming."""
+        if not self.enabled or self._tasks:
+            return
+        await asyncio.to_thread(self._load)
+        self._tasks = [
+            asyncio.create_task(self._run()),
+            asyncio.create_task(self._warm_popular()),
+        ]
+        logger.info(
+            f"Prefetch started ({len(self.hot)} hot searches, budget {self.budget()} calls/day)"
+        )
+
+    async def shutdown(self) -> None:
+        """Stop warming and save the hot searches."""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await asyncio.to_thread(self._save)
+        except OSError as e:
+            logger.warning(f"Could not save prefetch state: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return prefetch counters and the state of the queue and budget."""
+        return {
+            "enabled": self.enabled,
+            "observed": self.observed,
+            "warmed": self.warmed,
+            "fresh": self.fresh,
+            "errors": self.errors,
+            "paused": self.paused,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "queued": len(self._queue),
+            "hot_searches": len(self.hot),
+            "calls_today": self._calls_today(time.time()),
+            "budget": self.budget(),
+        }
+
+
+# Create a singleton instance
+prefetch_scheduler = PrefetchScheduler(
+    yelp_service,
+    enabled=settings.PREFETCH_ENABLED and settings.YELP_CACHE_ENABLED,
+    quota_share=settings.PREFETCH_QUOTA_SHARE,
+    next_page=settings.PREFETCH_NEXT_PAGE,
+    sorts=tuple(
+        SortBy(sort.strip())
+        for sort in settings.PREFETCH_SORTS.split(",")
+        if sort.strip()
+    ),
+    queue_size=settings.PREFETCH_QUEUE_SIZE,
+    call_interval=settings.PREFETCH_CALL_INTERVAL,
+    max_foreground=settings.PREFETCH_MAX_FOREGROUND_REQUESTS,
+    pause_interval=settings.PREFETCH_PAUSE_INTERVAL,
+    max_hot_keys=settings.PREFETCH_MAX_HOT_KEYS,
+    half_life=settings.PREFETCH_HOT_HALF_LIFE,
+    popular_interval=settings.PREFETCH_POPULAR_INTERVAL,
+    popular_keys=settings.PREFETCH_POPULAR_KEYS,
+    popular_min_score=settings.PREFETCH_POPULAR_MIN_SCORE,
+    state_path=settings.PREFETCH_STATE_PATH or None,
+)
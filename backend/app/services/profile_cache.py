@@ -0,0 +1,252 @@
+import hashlib
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.models.client_profile import (
+    ClientProfileParams,
+    ClientProfileRestaurantSearchParams,
+)
+from app.services.cache import CacheEntry, MemoryCacheBackend, make_cache_key
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Free-text fields compared by similarity; every other field must match exactly
+FREE_TEXT_FIELDS = ("otherPurpose", "additionalNotes")
+
+EMBEDDING_DIMENSIONS = 512
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CLAUSE_TOKEN_RE = re.compile(r"[a-z0-9]+|[,.;:!?()]")
+_CONTRACTION_RE = re.compile(r"n['\u2019]t\b")
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace so trivial edits compare equal."""
+    return " ".join((value or "").lower().split())
+
+
+def _normalized_profile(client_profile_params: ClientProfileParams) -> Dict[str, str]:
+    return {
+        key: _normalize_text(value)
+        for key, value in client_profile_params.model_dump().items()
+    }
+
+
+# Words that flip or assign the meaning of the words after them. Two notes
+# that differ in these, or in what follows them, ask for different things
+# however similar their words are ("not vegetarian", "avoid sushi").
+POLARITY_WORDS = frozenset(
+    (
+        "not no never nor none without except avoid avoids avoiding hate hates "
+        "dislike dislikes allergic against instead rather than "
+        "love loves like likes prefer prefers enjoy enjoys want wants favorite only"
+    ).split()
+)
+_CLAUSE_BREAKS = frozenset(",.;:!?()") | {"but"}
+
+
+def _tokens(text: str, pattern: re.Pattern = _TOKEN_RE) -> List[str]:
+    """Lowercase tokens, with contractions such as "don't" spelled out."""
+    return pattern.findall(_CONTRACTION_RE.sub(" not", text.lower()))
+
+
+def polarity_clauses(text: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """
+    Each polarity word of the text with the words it applies to.
+
+    A polarity word applies to the words after it up to the end of the clause
+    or the next polarity word: "loves sushi, avoid steakhouses" gives
+    ``(("avoid", ("steakhouses",)), ("loves", ("sushi",)))``.
+    """
+    clauses = []
+    current: Optional[Tuple[str, List[str]]] = None
+    for token in _tokens(text, _CLAUSE_TOKEN_RE):
+        if token in POLARITY_WORDS:
+            current = (token, [])
+            clauses.append(current)
+        elif token in _CLAUSE_BREAKS:
+            current = None
+        elif current is not None:
+            current[1].append(token)
+    return tuple(sorted((word, tuple(sorted(scope))) for word, scope in clauses))
+
+
+def embed_text(text: str) -> Dict[int, float]:
+    """
+    Embed text as a sparse, L2-normalized hashed bag of words, word bigrams and character trigrams.
+
+    This is a small CPU-only embedding that is robust to rewording and typos,
+    which is what near-duplicate profile notes differ by. Bigrams keep some
+    of the word order, which can change the meaning.
+    """
+    features: Dict[int, float] = {}
+    tokens = _tokens(text)
+    grams = (
+        tokens
+        + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        + [token[i : i + 3] for token in tokens for i in range(max(len(token) - 2, 1))]
+    )
+    for gram in grams:
+        digest = hashlib.blake2b(gram.encode(), digest_size=4).digest()
+        index = int.from_bytes(digest, "little") % EMBEDDING_DIMENSIONS
+        features[index] = features.get(index, 0.0) + 1.0
+
+    norm = math.sqrt(sum(value * value for value in features.values()))
+    if norm == 0:
+        return {}
+    return {index: value / norm for index, value in features.items()}
+
+
+def cosine_similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Cosine similarity between two normalized sparse embeddings."""
+    if not a or not b:
+        return 1.0 if not a and not b else 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+
+class ProfileCache:
+    """
+    Two-tier cache of generated search parameters keyed on client profiles.
+
+    The exact tier matches the normalized profile JSON. The optional
+    similarity tier matches profiles whose structured fields are identical,
+    whose free-text fields embed within ``threshold`` cosine similarity and
+    whose free text negates and prefers the same things (see
+    ``polarity_clauses``).
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        similarity_enabled: bool = False,
+        threshold: float = 0.9,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_enabled = similarity_enabled
+        self.threshold = threshold
+
+        self._exact = MemoryCacheBackend(max_entries=max_entries)
+        # Bucket key (structured fields) -> (embedding, polarity clauses, entry), in LRU order
+        self._similar: "OrderedDict[str, List[Tuple[Dict[int, float], Tuple, CacheEntry]]]" = OrderedDict()
+        self._similar_size = 0
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def exact_key(self, client_profile_params: ClientProfileParams) -> str:
+        """Key identifying profiles that are identical after normalization."""
+        return make_cache_key(
+            "client_profile", _normalized_profile(client_profile_params)
+        )
+
+    def _bucket_and_embedding(
+        self, client_profile_params: ClientProfileParams
+    ) -> Tuple[str, Dict[int, float], Tuple]:
+        profile = _normalized_profile(client_profile_params)
+        # Fields are kept apart so a clause cannot run from one into the next
+        free_text = " . ".join(profile.pop(field) for field in FREE_TEXT_FIELDS)
+        return (
+            make_cache_key("client_profile_bucket", profile),
+            embed_text(free_text),
+            polarity_clauses(free_text),
+        )
+
+    def get(
+        self, client_profile_params: ClientProfileParams
+    ) -> Optional[ClientProfileRestaurantSearchParams]:
+        """Return cached search parameters for a profile, or None on a miss."""
+        now = time.time()
+
+        entry = self._exact.get(self.exact_key(client_profile_params))
+        if entry is not None and now - entry.stored_at <= self.ttl:
+            self.exact_hits += 1
+            return entry.value.model_copy()
+
+        if self.similarity_enabled:
+            bucket, embedding, clauses = self._bucket_and_embedding(
+                client_profile_params
+            )
+            best: Optional[CacheEntry] = None
+            best_score = self.threshold
+            for candidate, candidate_clauses, candidate_entry in self._similar.get(
+                bucket, []
+            ):
+                if (
+                    now - candidate_entry.stored_at > self.ttl
+                    or candidate_clauses != clauses
+                ):
+                    continue
+                score = cosine_similarity(embedding, candidate)
+                if score >= best_score:
+                    best, best_score = candidate_entry, score
+            if best is not None:
+                self.similar_hits += 1
+                self._similar.move_to_end(bucket)
+                logger.debug(f"Similar profile cache hit (score={best_score:.3f})")
+                return best.value.model_copy()
+
+        self.misses += 1
+        return None
+
+    def set(
+        self,
+        client_profile_params: ClientProfileParams,
+        value: ClientProfileRestaurantSearchParams,
+    ) -> None:
+        """Store generated search parameters for a profile in both tiers."""
+        entry = CacheEntry(value=value.model_copy(), stored_at=time.time())
+        self._exact.set(self.exact_key(client_profile_params), entry)
+
+        if not self.similarity_enabled:
+            return
+
+        bucket, embedding, clauses = self._bucket_and_embedding(client_profile_params)
+        now = entry.stored_at
+        entries = [
+            item
+            for item in self._similar.pop(bucket, [])
+            if now - item[2].stored_at <= self.ttl
+        ]
+        entries.append((embedding, clauses, entry))
+        self._similar[bucket] = entries[-self.max_entries :]
+        self._similar_size = sum(len(items) for items in self._similar.values())
+
+        # Evict least recently used buckets once the tier is over its size limit
+        while self._similar_size > self.max_entries and len(self._similar) > 1:
+            _, evicted = self._similar.popitem(last=False)
+            self._similar_size -= len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for both tiers."""
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "exact_entries": len(self._exact),
+            "similar_entries": self._similar_size,
+            "hit_rate": (self.exact_hits + self.similar_hits) / lookups
+            if lookups
+            else 0.0,
+        }
+
+
+# Create a singleton instance
+profile_cache: Optional[ProfileCache] = None
+if settings.PROFILE_CACHE_ENABLED:
+    profile_cache = ProfileCache(
+        ttl=settings.PROFILE_CACHE_TTL,
+        max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+        similarity_enabled=settings.PROFILE_CACHE_SIMILARITY_ENABLED,
+        threshold=settings.PROFILE_CACHE_SIMILARITY_THRESHOLD,
+    )
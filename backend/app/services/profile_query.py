@@ -1,44 +1,282 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+import httpx
 from textwrap import dedent
 from app.core.config import settings
+from app.core.metrics import UPSTREAM_REQUESTS
+from app.core.tracing import span
 from app.models.client_profile import (
     ClientProfileParams,
     ClientProfileRestaurantSearchParams,
 )
+from app.models.yelp_categories import get_category_index
+from app.services.cache import make_cache_key
+from app.services.profile_cache import profile_cache
+from app.services.resilience import UpstreamGuard
+from app.services.singleflight import SingleFlight
 
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
 
-def generate_restaurant_search_params(
-    client_profile_params: ClientProfileParams,
-) -> ClientProfileRestaurantSearchParams:
-    model = ChatOpenAI(
-        model="gpt-4o-mini",
-        openai_api_key=settings.OPENAI_API_KEY,
-    )
+# Set up logging
+logger = logging.getLogger(__name__)
 
-    prompts = [
-        SystemMessage(
-            dedent("""
+SYSTEM_PROMPT = dedent("""
     You are an AI assistant for a restaurant recommendation tool used by consulting firm partners to find restaurants for client meetings. Your task is to synthesize a search query for restaurants based on the following input data provided by a partner. Ensure the query is specific, concise, and suitable for a business context in a major city. The query should be formatted to interface with the Yelp Fusion API.
-                    
+
     For clients in positions of seniority or for clients with a longer engagement period, consider a more upscale or expensive restaurant by increasing the price level.
-                    
+
     Based on the purpose of the meeting, the search term should be tuned accordingly to ensure that the ambiance is appropriate for the meeting. Please keep the additional notes in mind when generating the search term.
-                    
+
     The category filter is extremely exclusive, so please select more categories than necessary to ensure that the search is not too narrow. If the client profile already contains categories, only add similar categories.
     """)
-        ),
-        HumanMessage(
-            dedent(f"""
-            {client_profile_params.model_dump_json(indent=4)}
-            """)
-        ),
-    ]
-
-    response = model.with_structured_output(ClientProfileRestaurantSearchParams).invoke(
-        prompts
+
+HUMAN_PROMPT = "{profile}\n\nCandidate categories: {categories}"
+
+
+def _build_chain(http_client: httpx.AsyncClient, model: str) -> "Runnable":
+    """
+    Build the structured-output chain.
+
+    LangChain and the OpenAI SDK take over a second to import, so they are
+    imported here, off the event loop, rather than when the app is imported.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    prompt = ChatPromptTemplate.from_messages(
+        [("system", SYSTEM_PROMPT), ("human", HUMAN_PROMPT)]
     )
+    # Retries are handled by the guard, within the latency budget
+    llm = ChatOpenAI(
+        model=model,
+        openai_api_key=settings.OPENAI_API_KEY,
+        openai_api_base=settings.OPENAI_BASE_URL,
+        http_async_client=http_client,
+        timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=5),
+        max_retries=0,
+    )
+    return prompt | llm.with_structured_output(ClientProfileRestaurantSearchParams)
+
+
+def is_transient_openai_error(error: Exception) -> bool:
+    """Whether an OpenAI error is worth retrying: connection faults, timeouts and 5xx."""
+    import openai
+
+    return isinstance(error, (openai.APIConnectionError, openai.InternalServerError))
+
+
+class ProfileQueryRunner:
+    """
+    Long-lived LLM runner for generating search parameters from client profiles.
+
+    The OpenAI client, its pooled HTTP connections and the structured-output
+    chain are built once at startup and reused for every request.
+    """
+
+    def __init__(self, model: str = settings.OPENAI_MODEL):
+        self.model = model
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._chain: Optional["Runnable"] = None
+        self._starting: Optional[asyncio.Future] = None
+        self.guard = UpstreamGuard(
+            "OpenAI",
+            budget=settings.OPENAI_LATENCY_BUDGET,
+            attempts=settings.OPENAI_RETRY_ATTEMPTS,
+            base_delay=0.5,
+            max_delay=4.0,
+            failure_threshold=settings.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.OPENAI_CIRCUIT_RESET_TIMEOUT,
+            hedge=settings.OPENAI_HEDGE_ENABLED,
+            is_transient=is_transient_openai_error,
+        )
+
+    async def startup(self) -> None:
+        """
+        Create the pooled HTTP client and compile the structured-output chain.
+
+        Concurrent callers share one startup; if it fails, the next call retries.
+        """
+        if self._chain is not None:
+            return
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._start())
+        try:
+            await asyncio.shield(self._starting)
+        except Exception:
+            self._starting = None
+            raise
+
+    def start_in_background(self) -> None:
+        """
+        Start building the chain without waiting for it.
+
+        Lets the app serve health checks and searches while LangChain loads;
+        the first profile request waits for the build to finish.
+        """
+
+        def log_failure(future: asyncio.Future) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(f"LLM runner startup failed: {str(future.exception())}")
+
+        asyncio.ensure_future(self.startup()).add_done_callback(log_failure)
+
+    async def _start(self) -> None:
+        start = time.perf_counter()
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=5),
+        )
+        try:
+            chain = await asyncio.to_thread(_build_chain, http_client, self.model)
+        except BaseException:
+            await http_client.aclose()
+            raise
+
+        self._http_client = http_client
+        self._chain = chain
+        logger.info(
+            f"LLM runner ready (model={self.model}) in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+    async def shutdown(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._starting is not None and not self._starting.done():
+            self._starting.cancel()
+        self._starting = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._chain = None
 
-    response.categories = ",".join(response.categories) if response.categories else ""
+    async def _invoke(
+        self, inputs: Dict[str, str]
+    ) -> ClientProfileRestaurantSearchParams:
+        """One LLM call, counted by outcome."""
+        import openai
+
+        try:
+            response = await self._chain.ainvoke(inputs)
+        except openai.APIStatusError as e:
+            UPSTREAM_REQUESTS.inc(upstream="openai", status=str(e.status_code))
+            raise
+        except openai.APIConnectionError:
+            UPSTREAM_REQUESTS.inc(upstream="openai", status="error")
+            raise
+        UPSTREAM_REQUESTS.inc(upstream="openai", status="200")
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters of the LLM client and the profile caches."""
+        stats: Dict[str, Any] = {
+            "ready": self._chain is not None,
+            "upstream": self.guard.stats(),
+            "singleflight": profile_singleflight.stats(),
+        }
+        if profile_cache is not None:
+            stats["cache"] = profile_cache.stats()
+        return stats
+
+    async def ainvoke(
+        self, client_profile_params: ClientProfileParams
+    ) -> ClientProfileRestaurantSearchParams:
+        """
+        Generate search parameters for a client profile without blocking the event loop.
+
+        Args:
+            client_profile_params: The client and meeting details.
+
+        Returns:
+            The generated search parameters, with categories joined into a
+            comma-separated string.
+
+        Raises:
+            UpstreamUnavailable: If the OpenAI circuit is open or the latency
+                budget runs out.
+        """
+        if self._chain is None:
+            await self.startup()
+
+        category_index = get_category_index()
+        shortlist = category_index.shortlist(
+            client_profile_params.category_text(),
+            size=settings.CATEGORY_SHORTLIST_SIZE,
+        )
+
+        inputs = {
+            "profile": client_profile_params.model_dump_json(indent=4),
+            "categories": category_index.describe(shortlist),
+        }
+
+        start = time.perf_counter()
+        with span("llm.generate", model=self.model):
+            response = await self.guard.call(lambda: self._invoke(inputs))
+        logger.info(
+            f"LLM search params generated in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+        # Drop anything the model returned that is not a real restaurant category
+        categories = category_index.validate(response.categories or [])
+        response.categories = ",".join(categories)
+
+        return response
+
+
+# Create a singleton instance
+profile_query_runner = ProfileQueryRunner()
+
+# Collapses identical profiles submitted at the same time into one LLM call
+profile_singleflight = SingleFlight("client_profile")
+
+
+def cached_restaurant_search_params(
+    client_profile_params: ClientProfileParams,
+) -> Optional[ClientProfileRestaurantSearchParams]:
+    """Return the profile cache's search parameters for a profile, if it has them."""
+    if profile_cache is None:
+        return None
+    return profile_cache.get(client_profile_params)
+
+
+async def generate_uncached_restaurant_search_params(
+    client_profile_params: ClientProfileParams,
+) -> ClientProfileRestaurantSearchParams:
+    """
+    Generate search parameters with the LLM, without looking in the profile cache.
+
+    Identical profiles generated at the same time share one LLM call, and the
+    result is added to the profile cache.
+    """
+    if profile_cache is None:
+        return await profile_singleflight.do(
+            make_cache_key("client_profile", client_profile_params.model_dump()),
+            lambda: profile_query_runner.ainvoke(client_profile_params),
+        )
+
+    async def generate() -> ClientProfileRestaurantSearchParams:
+        response = await profile_query_runner.ainvoke(client_profile_params)
+        profile_cache.set(client_profile_params, response)
+        return response
+
+    return await profile_singleflight.do(
+        profile_cache.exact_key(client_profile_params), generate
+    )
+
+
+async def generate_restaurant_search_params(
+    client_profile_params: ClientProfileParams,
+) -> ClientProfileRestaurantSearchParams:
+    """
+    Generate Yelp search parameters for a client profile using the LLM.
 
-    return response
+    Repeat and near-duplicate profiles are answered from the profile cache.
+    """
+    cached = cached_restaurant_search_params(client_profile_params)
+    if cached is not None:
+        return cached
+    return await generate_uncached_restaurant_search_params(client_profile_params)
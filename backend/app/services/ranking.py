@@ -0,0 +1,239 @@
+import math
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from itertools import chain, repeat
+from operator import contains
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.restaurants import RestaurantSearchParams
+from app.models.yelp_categories import get_category_index
+
+# Columns of the feature matrix, in weight order
+FEATURES = ("rating", "reviews", "distance", "price", "category", "reservation")
+
+# Review counts at or above this score the full review feature
+REVIEW_SCALE = math.log1p(1000)
+
+# Distance beyond which the distance feature is 0, when the search has no radius
+DEFAULT_MAX_DISTANCE = 5000.0
+
+RESERVATION_TRANSACTION = "restaurant_reservation"
+
+
+@dataclass(frozen=True)
+class RankingWeights:
+    """Weight of each ranking feature; every feature is scaled to [-1, 1]."""
+
+    rating: float = 1.0
+    reviews: float = 0.3
+    distance: float = 0.3
+    price: float = 0.5
+    category: float = 1.0
+    reservation: float = 0.5
+
+    def vector(self) -> np.ndarray:
+        return np.array([getattr(self, name) for name in FEATURES], dtype=np.float64)
+
+
+@lru_cache(maxsize=1024)
+def expand_categories(aliases: FrozenSet[str]) -> FrozenSet[str]:
+    """Aliases together with all of their sub-categories (see ``CategoryIndex.expand``)."""
+    return get_category_index().expand(aliases)
+
+
+def split_list(value: Optional[str]) -> FrozenSet[str]:
+    """Parse a comma-separated filter into a set of lowercase items."""
+    return frozenset(
+        item.strip().lower() for item in (value or "").split(",") if item.strip()
+    )
+
+
+def _column(
+    businesses: List[Dict[str, Any]],
+    key: str,
+    default: Any,
+    transform: Optional[Callable[[Any], float]] = None,
+) -> np.ndarray:
+    """One field of every business as a float array, extracted without a Python-level loop."""
+    values = map(dict.get, businesses, repeat(key), repeat(default))
+    if transform is not None:
+        values = map(transform, values)
+    try:
+        return np.fromiter(values, np.float64, len(businesses))
+    except TypeError:
+        # Explicit nulls: replace them one by one
+        values = (default if b.get(key) is None else b[key] for b in businesses)
+        if transform is not None:
+            values = map(transform, values)
+        return np.fromiter(values, np.float64, len(businesses))
+
+
+def _reservation_slot(
+    params: RestaurantSearchParams,
+) -> Optional[Tuple[Optional[int], int]]:
+    """Yelp weekday (0 = Monday, if a date is given) and HHMM of the reservation."""
+    if not params.reservation_time:
+        return None
+    try:
+        hours, minutes = params.reservation_time.split(":")
+        hhmm = int(hours) * 100 + int(minutes)
+        day = (
+            date.fromisoformat(params.reservation_date).weekday()
+            if params.reservation_date
+            else None
+        )
+    except ValueError:
+        return None
+    return day, hhmm
+
+
+def _list_column(businesses: List[Dict[str, Any]], key: str) -> List[Any]:
+    """One list-valued field of every business, with missing and null values as ``()``."""
+    values = list(map(dict.get, businesses, repeat(key), repeat(())))
+    if None in values:
+        values = [value or () for value in values]
+    return values
+
+
+def _open_at(hours: List[Dict[str, Any]], day: Optional[int], hhmm: int) -> int:
+    """1 if Yelp ``hours`` say the business is open at the slot, -1 if closed."""
+    for period in hours[0].get("open") or []:
+        if day is not None and period.get("day") != day:
+            continue
+        start, end = int(period.get("start", 0)), int(period.get("end", 0))
+        if period.get("is_overnight") or end <= start:
+            if hhmm >= start or hhmm < end:
+                return 1
+        elif start <= hhmm < end:
+            return 1
+    return -1
+
+
+class Ranker:
+    """
+    Scores search results for meeting suitability.
+
+    Each business becomes one row of a feature matrix (see ``FEATURES``) and
+    the score is the matrix times the weight vector, so ranking a few hundred
+    over-fetched candidates costs one pass to extract features and a handful
+    of vector operations. Ties keep Yelp's order.
+    """
+
+    def __init__(self, weights: RankingWeights):
+        self.weights = weights
+        self._weights = weights.vector()
+
+    def features(
+        self, businesses: List[Dict[str, Any]], params: RestaurantSearchParams
+    ) -> np.ndarray:
+        """
+        Build the feature matrix for a list of raw Yelp businesses.
+
+        Args:
+            businesses: Raw businesses, as returned by Yelp.
+            params: The search the businesses are ranked for.
+
+        Returns:
+            An ``(len(businesses), len(FEATURES))`` array.
+        """
+        count = len(businesses)
+        matrix = np.zeros((count, len(FEATURES)), dtype=np.float64)
+        if not count:
+            return matrix
+
+        rating = _column(businesses, "rating", 0.0)
+        reviews = _column(businesses, "review_count", 0.0)
+        distance = _column(businesses, "distance", np.nan)
+        price = _column(businesses, "price", "", transform=len)
+
+        # Ratings centred on 3 stars; log review counts saturating at REVIEW_SCALE
+        matrix[:, 0] = (rating - 3.0) / 2.0
+        matrix[:, 1] = np.minimum(np.log1p(reviews) / REVIEW_SCALE, 1.0)
+
+        # Closer is better; unknown distance is neutral
+        max_distance = float(params.radius or DEFAULT_MAX_DISTANCE)
+        matrix[:, 2] = np.nan_to_num(
+            1.0 - np.minimum(distance / max_distance, 1.0), nan=0.0
+        )
+
+        # 1 at a requested price level down to -1 three levels away; unknown is neutral
+        requested = split_list(params.price)
+        levels = np.array(
+            sorted(int(p) for p in requested if p.isdigit()), dtype=np.float64
+        )
+        if levels.size:
+            gap = np.abs(price[:, None] - levels[None, :]).min(axis=1)
+            matrix[:, 3] = np.where(price > 0, 1.0 - gap / 1.5, 0.0)
+
+        # Share of the business's categories covered by the requested ones,
+        # computed over one flat array of every business's category aliases
+        wanted = split_list(params.categories)
+        if wanted:
+            expanded = expand_categories(wanted)
+            categories = _list_column(businesses, "categories")
+            sizes = np.fromiter(map(len, categories), np.intp, count)
+            aliases = map(dict.get, chain.from_iterable(categories), repeat("alias"))
+            matched = np.fromiter(
+                map(expanded.__contains__, aliases), np.float64, sizes.sum()
+            )
+            owners = np.repeat(np.arange(count), sizes)
+            overlap = np.bincount(owners, weights=matched, minlength=count)
+            matrix[:, 4] = overlap / np.maximum(sizes, 1)
+
+        # Reservable and open at the requested time
+        slot = _reservation_slot(params)
+        if slot is not None:
+            day, hhmm = slot
+            transactions = _list_column(businesses, "transactions")
+            reservable = np.fromiter(
+                map(contains, transactions, repeat(RESERVATION_TRANSACTION)),
+                np.float64,
+                count,
+            )
+
+            # Search results carry "business_hours", business details "hours";
+            # only the businesses that have them are checked (0 = unknown)
+            open_at = np.zeros(count)
+            for key in ("business_hours", "hours"):
+                hours = _list_column(businesses, key)
+                for index in np.flatnonzero(
+                    np.fromiter(map(len, hours), np.intp, count)
+                ):
+                    if not open_at[index]:
+                        open_at[index] = _open_at(hours[index], day, hhmm)
+
+            matrix[:, 5] = np.where(open_at < 0, -1.0, 0.5 * reservable + 0.5 * open_at)
+
+        return matrix
+
+    def scores(
+        self, businesses: List[Dict[str, Any]], params: RestaurantSearchParams
+    ) -> np.ndarray:
+        """Score every business; higher is better."""
+        return self.features(businesses, params) @ self._weights
+
+    def rank(
+        self, businesses: List[Dict[str, Any]], params: RestaurantSearchParams
+    ) -> List[Dict[str, Any]]:
+        """Return the businesses ordered by score, best first."""
+        if len(businesses) < 2:
+            return list(businesses)
+        order = np.argsort(-self.scores(businesses, params), kind="stable")
+        return [businesses[index] for index in order]
+
+
+# Create a singleton instance
+ranker = Ranker(
+    RankingWeights(
+        rating=settings.RANKING_WEIGHT_RATING,
+        reviews=settings.RANKING_WEIGHT_REVIEWS,
+        distance=settings.RANKING_WEIGHT_DISTANCE,
+        price=settings.RANKING_WEIGHT_PRICE,
+        category=settings.RANKING_WEIGHT_CATEGORY,
+        reservation=settings.RANKING_WEIGHT_RESERVATION,
+    )
+)
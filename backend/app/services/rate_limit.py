@@ -0,0 +1,334 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from app.services.resilience import UpstreamUnavailable
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Scheduling priority of an upstream call; lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class UpstreamRateLimited(UpstreamUnavailable):
+    """Raised when an upstream call is refused because of its rate limit or quota."""
+
+
+class MemoryTokenBucket:
+    """Token bucket held in process memory (one budget per worker)."""
+
+    blocking = False
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one is available.
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def refund(self) -> None:
+        """Give back a token taken for work that was not done."""
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+
+class SqliteTokenBucket:
+    """Token bucket stored in SQLite so every worker draws from one budget."""
+
+    blocking = True
+
+    def __init__(self, path: str, name: str, rate: float, capacity: float):
+        self.path = path
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the buckets table on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, timeout=5, check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+        return self._conn
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if available, atomically across processes.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one is available.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                tokens = self.capacity
+                if row is not None:
+                    tokens = min(self.capacity, row[0] + (now - row[1]) * self.rate)
+
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)",
+                    (self.name, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def refund(self) -> None:
+        """Give back a token taken for work that was not done."""
+        with self._lock:
+            self._connect().execute(
+                "UPDATE buckets SET tokens = MIN(?, tokens + 1) WHERE name = ?",
+                (self.capacity, self.name),
+            )
+
+
+class QuotaTracker:
+    """
+    Tracks the remaining daily quota reported by upstream response headers.
+
+    Yelp reports ``RateLimit-DailyLimit``, ``RateLimit-Remaining`` and
+    ``RateLimit-ResetTime`` on every response. Once the remaining share drops
+    below ``reserve``, only interactive calls are allowed; once it reaches
+    zero, nothing is until the reset time.
+    """
+
+    def __init__(self, reserve: float):
+        self.reserve = reserve
+        self.daily_limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Read the quota headers from an upstream response."""
+        try:
+            if "ratelimit-dailylimit" in headers:
+                self.daily_limit = int(float(headers["ratelimit-dailylimit"]))
+            if "ratelimit-remaining" in headers:
+                self.remaining = int(float(headers["ratelimit-remaining"]))
+            if "ratelimit-resettime" in headers:
+                self.reset_at = datetime.fromisoformat(
+                    headers["ratelimit-resettime"]
+                ).timestamp()
+        except ValueError as e:
+            logger.warning(f"Could not parse rate limit headers: {str(e)}")
+
+    def _expire(self) -> None:
+        """Forget the reported quota once its reset time has passed."""
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            self.remaining = None
+            self.reset_at = None
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the daily quota is used up."""
+        self._expire()
+        return self.remaining is not None and self.remaining <= 0
+
+    @property
+    def low(self) -> bool:
+        """Whether the remaining quota is within the interactive-only reserve."""
+        self._expire()
+        if self.remaining is None or not self.daily_limit:
+            return False
+        return self.remaining < self.daily_limit * self.reserve
+
+    def allows(self, priority: Priority) -> bool:
+        """Whether a call at this priority may spend quota."""
+        if self.exhausted:
+            return False
+        return priority == Priority.INTERACTIVE or not self.low
+
+    def retry_after(self) -> float:
+        """Seconds until the quota resets, or a minute if unknown."""
+        if self.reset_at is None:
+            return 60.0
+        return max(self.reset_at - time.time(), 1.0)
+
+
+class RateLimiter:
+    """
+    Admits upstream calls through a token bucket, highest priority first.
+
+    Waiting calls are kept in a priority queue and a single dispatcher hands
+    out tokens as the bucket refills, so interactive searches overtake
+    queued background work. Interactive calls give up after ``max_wait``,
+    background calls after ``background_max_wait``.
+    """
+
+    def __init__(
+        self,
+        bucket: Any,
+        quota: QuotaTracker,
+        max_wait: float,
+        name: str = "upstream",
+        background_max_wait: float = 30.0,
+    ):
+        self.bucket = bucket
+        self.quota = quota
+        self.max_wait = max_wait
+        self.background_max_wait = background_max_wait
+        self.name = name
+
+        self.admitted = 0
+        self.throttled = 0
+        self.rejected = 0
+
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """
+        Wait for permission to make one upstream call.
+
+        Raises:
+            UpstreamRateLimited: If the quota does not allow the call or it
+                would wait longer than its priority's maximum wait.
+        """
+        if not self.quota.allows(priority):
+            self.rejected += 1
+            raise UpstreamRateLimited(
+                f"{self.name} daily quota is exhausted", self.quota.retry_after()
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        timeout = (
+            self.max_wait
+            if priority == Priority.INTERACTIVE
+            else self.background_max_wait
+        )
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.throttled += 1
+            raise UpstreamRateLimited(
+                f"{self.name} rate limit reached", 1 / self.bucket.rate
+            )
+        self.admitted += 1
+
+    async def _dispatch(self) -> None:
+        """Hand out tokens to waiters in priority order as they become available."""
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+
+            if self.bucket.blocking:
+                wait = await asyncio.to_thread(self.bucket.try_acquire)
+            else:
+                wait = self.bucket.try_acquire()
+
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            # New, higher-priority waiters may have arrived meanwhile, and the
+            # ones seen before may have timed out or been cancelled
+            while self._waiters:
+                _, _, future = heapq.heappop(self._waiters)
+                if not future.done():
+                    future.set_result(None)
+                    break
+            else:
+                if self.bucket.blocking:
+                    await asyncio.to_thread(self.bucket.refund)
+                else:
+                    self.bucket.refund()
+
+    async def close(self) -> None:
+        """Stop the dispatcher and fail pending waiters."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+    def saturated(self) -> bool:
+        """Whether calls are already waiting for tokens, so a new one would queue."""
+        return any(not future.done() for _, _, future in self._waiters)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return admission counters and the last reported quota."""
+        return {
+            "name": self.name,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "queued": len(self._waiters),
+            "daily_limit": self.quota.daily_limit,
+            "remaining": self.quota.remaining,
+        }
+
+
+def build_token_bucket(
+    backend: str, name: str, rate: float, capacity: float, path: str
+) -> Any:
+    """Create the token bucket for a configured backend name."""
+    if backend == "disk":
+        return SqliteTokenBucket(path, name, rate, capacity)
+    if backend == "memory":
+        return MemoryTokenBucket(rate, capacity)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.tracing import span
+from app.models.client_profile import (
+    ClientProfileParams,
+    ClientProfileRestaurantSearchParams,
+)
+from app.models.restaurants import RestaurantSearchParams
+from app.services.geocoding import normalize_location
+from app.services.profile_query import (
+    cached_restaurant_search_params,
+    generate_uncached_restaurant_search_params,
+)
+from app.services.ranking import Ranker, expand_categories, ranker, split_list
+from app.services.yelp import YelpService, search_cache_key, yelp_service
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def filter_businesses(
+    businesses: Iterable[Dict[str, Any]], params: RestaurantSearchParams
+) -> List[Dict[str, Any]]:
+    """
+    Apply a search's category and price filters to already fetched businesses.
+
+    Mirrors Yelp's semantics: a category filter also matches sub-categories,
+    and a price filter excludes businesses without a price.
+    """
+    categories = expand_categories(split_list(params.categories))
+    prices = split_list(params.price)
+    return [
+        business
+        for business in businesses
+        if (
+            not categories
+            or any(
+                c.get("alias") in categories for c in business.get("categories") or []
+            )
+        )
+        and (not prices or str(len(business.get("price") or "")) in prices)
+    ]
+
+
+class RecommendationPipeline:
+    """
+    Client profile to ranked restaurants in one server-side pipeline.
+
+    While the LLM generates the search parameters, a speculative Yelp search
+    for the profile's location is started for one page of candidates. When
+    the generated parameters arrive, the speculative result is reused if it
+    is for the same location and enough of its businesses pass the generated
+    category and price filters; otherwise the exact search is run, over as
+    many pages as the candidate limit needs. The LLM's free-text term only
+    shapes Yelp's relevance order, which the ranking stage replaces.
+    """
+
+    def __init__(
+        self,
+        yelp: YelpService,
+        ranker: Ranker,
+        prefetch: bool = True,
+        candidate_limit: int = 50,
+    ):
+        self.yelp = yelp
+        self.ranker = ranker
+        self.prefetch = prefetch
+        self.candidate_limit = candidate_limit
+
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+        self.prefetch_skipped = 0
+        self.prefetch_errors = 0
+
+    def speculative_search(
+        self, profile: ClientProfileParams
+    ) -> RestaurantSearchParams:
+        """The search started before the LLM has answered."""
+        return RestaurantSearchParams(
+            location=profile.location,
+            limit=min(self.candidate_limit, settings.YELP_PAGE_SIZE),
+        )
+
+    def _reuse(
+        self,
+        speculative: RestaurantSearchParams,
+        data: Dict[str, Any],
+        final: RestaurantSearchParams,
+        limit: int,
+    ) -> Optional[Dict[str, Any]]:
+        """The speculative response narrowed to ``final``, if it can answer it."""
+        if search_cache_key(speculative) == search_cache_key(final):
+            return data
+        if normalize_location(speculative.location) != normalize_location(
+            final.location
+        ):
+            return None
+
+        businesses = filter_businesses(data.get("businesses", []), final)
+        if len(businesses) < limit:
+            return None
+        # Yelp's total for the speculative search: the size of one filtered
+        # page would change with the page size, not with the search
+        return {**data, "businesses": businesses}
+
+    async def recommend(
+        self, profile: ClientProfileParams, limit: int = 20
+    ) -> Tuple[ClientProfileRestaurantSearchParams, Dict[str, Any], str]:
+        """
+        Generate search parameters for a profile and return ranked restaurants.
+
+        Args:
+            profile: The client and meeting details.
+            limit: Number of restaurants to return.
+
+        Returns:
+            The generated parameters, the Yelp response with its businesses
+            ranked and cut to ``limit``, and whether the speculative search
+            was used ("hit", "miss" or "skipped").
+
+        Raises:
+            UpstreamUnavailable: If OpenAI or Yelp cannot be called.
+            Exception: If generating the parameters or searching fails.
+        """
+        # Only speculate when the LLM will actually be called
+        cached = cached_restaurant_search_params(profile)
+        generation: Optional[asyncio.Future] = None
+        speculative: Optional[RestaurantSearchParams] = None
+        prefetch: Optional[asyncio.Future] = None
+        if cached is None:
+            generation = asyncio.ensure_future(
+                generate_uncached_restaurant_search_params(profile)
+            )
+            if self.prefetch:
+                speculative = self.speculative_search(profile)
+                prefetch = asyncio.ensure_future(
+                    self.yelp.search_restaurants(speculative)
+                )
+
+        try:
+            if generation is None:
+                params = cached
+            else:
+                with span("recommend.generate"):
+                    params = await generation
+            final = params.to_search_params(
+                limit=min(self.candidate_limit, settings.YELP_PAGE_SIZE)
+            )
+
+            data: Optional[Dict[str, Any]] = None
+            outcome = "skipped"
+            if prefetch is not None:
+                try:
+                    with span("recommend.prefetch_wait"):
+                        data = self._reuse(speculative, await prefetch, final, limit)
+                except Exception as e:
+                    self.prefetch_errors += 1
+                    logger.warning(f"Speculative search failed: {str(e)}")
+                outcome = "hit" if data is not None else "miss"
+
+            if data is None:
+                data = await self.yelp.search_pool(final, self.candidate_limit)
+        finally:
+            if generation is not None:
+                generation.cancel()
+            if prefetch is not None:
+                prefetch.cancel()
+
+        if outcome == "hit":
+            self.prefetch_hits += 1
+        elif outcome == "miss":
+            self.prefetch_misses += 1
+        else:
+            self.prefetch_skipped += 1
+
+        with span("recommend.rank"):
+            ranked = self.ranker.rank(data.get("businesses", []), final)[:limit]
+        return params, {**data, "businesses": ranked}, outcome
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how often the speculative search answered the request."""
+        return {
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_misses": self.prefetch_misses,
+            "prefetch_skipped": self.prefetch_skipped,
+            "prefetch_errors": self.prefetch_errors,
+        }
+
+
+# Create a singleton instance
+recommendation_pipeline = RecommendationPipeline(
+    yelp_service,
+    ranker,
+    prefetch=settings.RECOMMEND_PREFETCH_ENABLED,
+    candidate_limit=settings.RECOMMEND_CANDIDATE_LIMIT,
+)
@@ -0,0 +1,327 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream cannot be called right now; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+def is_transient_http_error(error: Exception) -> bool:
+    """Whether an httpx error is worth retrying: network faults, timeouts and 5xx."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    rng: Optional[random.Random] = None,
+) -> float:
+    """Exponential backoff with full jitter for a 0-based retry attempt."""
+    return (rng or random).uniform(0, min(max_delay, base_delay * (2**attempt)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast for ``reset_timeout`` seconds. The next call after that
+    is a trial: success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self.rejections = 0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        """Current state of the circuit."""
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may go through.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                trial call already running.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return
+
+        self.rejections += 1
+        retry_after = max(self.reset_timeout - (self.clock() - self.opened_at), 1.0)
+        raise CircuitOpenError(
+            f"{self.name} is unavailable (circuit open)", retry_after
+        )
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"Circuit for {self.name} closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        closed = self.opened_at is None
+        if self._trial_running or (closed and self.failures >= self.failure_threshold):
+            self.trips += 1
+            self.opened_at = self.clock()
+            logger.warning(
+                f"Circuit for {self.name} opened after {self.failures} failures"
+            )
+        self._trial_running = False
+
+    def record_neutral(self) -> None:
+        """Finish a call whose outcome says nothing about upstream health."""
+        self._trial_running = False
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The ``q``-th percentile (0-100) of the window, or None if it is empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(len(ordered) * q / 100), len(ordered) - 1)
+        return ordered[index]
+
+
+async def hedged(
+    fn: Callable[[], Awaitable[T]],
+    delay: float,
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> T:
+    """
+    Run ``fn`` and, if it has not finished after ``delay`` seconds, a second copy.
+
+    Returns the first successful result and cancels the other call. If both
+    fail, the first call's error is raised.
+    """
+    tasks = [asyncio.ensure_future(fn())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            tasks.append(asyncio.ensure_future(fn()))
+            if on_hedge is not None:
+                on_hedge()
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        raise tasks[0].exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class UpstreamGuard:
+    """
+    Latency budget, retries, circuit breaker and optional hedging for one upstream.
+
+    Every call runs within ``budget`` seconds in total. Transient failures of
+    idempotent calls are retried up to ``attempts`` times with jittered
+    exponential backoff, as long as the budget allows. Calls that still fail
+    count towards opening the circuit breaker. With ``hedge`` on, a second
+    copy of a slow idempotent call is started once it runs past the recent p95
+    latency. ``clock`` times the circuit breaker and ``rng`` draws the backoff
+    jitter, so both can be controlled in tests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: float,
+        attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        is_transient: Callable[[Exception], bool] = is_transient_http_error,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        self.name = name
+        self.budget = budget
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.is_transient = is_transient
+        self.rng = rng
+
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout, clock)
+        self.latency = LatencyTracker()
+
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _count_hedge(self) -> None:
+        self.hedges += 1
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(95)
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], idempotent: bool) -> T:
+        delay = self._hedge_delay() if idempotent else None
+        start = time.perf_counter()
+        if delay is None:
+            result = await fn()
+        else:
+            result = await hedged(fn, delay, on_hedge=self._count_hedge)
+        self.latency.record(time.perf_counter() - start)
+        return result
+
+    async def call(self, fn: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        """
+        Call the upstream through the guard.
+
+        Args:
+            fn: Coroutine factory making one upstream call.
+            idempotent: Whether the call may be retried and hedged.
+
+        Returns:
+            The result of the first successful attempt.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            UpstreamUnavailable: If the latency budget ran out.
+            Exception: The last error if every attempt failed.
+        """
+        self.breaker.before_call()
+        self.calls += 1
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.budget
+        attempts = self.attempts if idempotent else 1
+
+        try:
+            async with asyncio.timeout(self.budget):
+                for attempt in range(attempts):
+                    try:
+                        result = await self._attempt(fn, idempotent)
+                    except Exception as e:
+                        if not self.is_transient(e):
+                            self.breaker.record_neutral()
+                            raise
+                        delay = backoff_delay(
+                            attempt, self.base_delay, self.max_delay, self.rng
+                        )
+                        if attempt + 1 >= attempts or loop.time() + delay >= deadline:
+                            raise
+                        self.retries += 1
+                        reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+                        logger.warning(
+                            f"{self.name} call failed ({reason}), retrying in {delay:.2f}s"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+                    self.breaker.record_success()
+                    return result
+        except asyncio.CancelledError:
+            self.breaker.record_neutral()
+            raise
+        except TimeoutError:
+            self.timeouts += 1
+            self.failures += 1
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(
+                f"{self.name} did not respond within {self.budget:g}s", 1.0
+            )
+        except Exception as e:
+            if self.is_transient(e):
+                self.failures += 1
+                self.breaker.record_failure()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call counters, breaker state and recent latency percentiles."""
+        p50 = self.latency.percentile(50)
+        p95 = self.latency.percentile(95)
+        return {
+            "name": self.name,
+            "state": self.breaker.state,
+            "circuit_open": self.breaker.state == CircuitBreaker.OPEN,
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "circuit_trips": self.breaker.trips,
+            "circuit_rejections": self.breaker.rejections,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p95_ms": p95 * 1000 if p95 is not None else None,
+        }
@@ -0,0 +1,416 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.models.restaurants import RestaurantSearchParams, SortBy
+from app.models.yelp_categories import get_category_index
+from app.services.geo import cover_circle, decode_geohash, encode_geohash, haversine_m
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Geohash length stored per restaurant (~5 m cells)
+POINT_PRECISION = 9
+
+# Geohash length of the areas whose freshness is tracked (~1.2 km x 0.6 km)
+AREA_PRECISION = 6
+
+# Search terms that mean "any restaurant" and can be answered locally
+GENERIC_TERMS = {"", "restaurant", "restaurants", "food"}
+
+# Yelp's price levels, as they appear in the price filter
+PRICE_LEVELS = {"1", "2", "3", "4"}
+
+# Parameters the local store cannot evaluate; searches using them go to Yelp
+UNSUPPORTED_FILTERS = (
+    "open_now",
+    "open_at",
+    "attributes",
+    "locale",
+    "reservation_date",
+    "reservation_time",
+    "reservation_covers",
+)
+
+
+class RestaurantStore:
+    """
+    Persistent SQLite store of every restaurant returned by Yelp.
+
+    Restaurants are indexed by geohash (spatial), category alias, price and
+    rating. The store also tracks when each geohash area was last covered by
+    a Yelp search, so radius/category/price searches over recently covered
+    areas can still be answered while Yelp cannot be called.
+
+    It is a fallback, not a cache: an area counts as covered after any Yelp
+    search over it, but a search returns only its top results, so a local
+    answer comes from a sample of the area. Its ``total`` counts the stored
+    matches and its ``best_match`` order is approximate.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float,
+        max_radius: int,
+        default_radius: int,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_radius = max_radius
+        self.default_radius = default_radius
+
+        self.local_hits = 0
+        self.local_misses = 0
+
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._refresher: Optional[asyncio.Task] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS restaurants (
+                    id TEXT PRIMARY KEY,
+                    geohash TEXT NOT NULL,
+                    latitude REAL NOT NULL,
+                    longitude REAL NOT NULL,
+                    price INTEGER,
+                    rating REAL,
+                    review_count INTEGER,
+                    data TEXT NOT NULL,
+                    seen_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS restaurants_geohash ON restaurants (geohash);
+                CREATE INDEX IF NOT EXISTS restaurants_price ON restaurants (price);
+                CREATE INDEX IF NOT EXISTS restaurants_rating ON restaurants (rating);
+
+                CREATE TABLE IF NOT EXISTS restaurant_categories (
+                    alias TEXT NOT NULL,
+                    restaurant_id TEXT NOT NULL,
+                    PRIMARY KEY (alias, restaurant_id)
+                );
+
+                CREATE TABLE IF NOT EXISTS areas (
+                    cell TEXT PRIMARY KEY,
+                    refreshed_at REAL NOT NULL,
+                    queried_at REAL NOT NULL
+                );
+                """
+            )
+
+    # Writes
+
+    def upsert(self, data: Dict[str, Any], params: RestaurantSearchParams) -> None:
+        """Store the businesses from a Yelp response and mark the searched area fresh."""
+        now = time.time()
+        rows = []
+        categories = []
+        for business in data.get("businesses", []):
+            coordinates = business.get("coordinates") or {}
+            latitude = coordinates.get("latitude")
+            longitude = coordinates.get("longitude")
+            if latitude is None or longitude is None:
+                continue
+
+            # Distance is relative to the search, not a property of the business
+            stored = {
+                key: value for key, value in business.items() if key != "distance"
+            }
+            rows.append(
+                (
+                    business["id"],
+                    encode_geohash(latitude, longitude, POINT_PRECISION),
+                    latitude,
+                    longitude,
+                    len(business["price"]) if business.get("price") else None,
+                    business.get("rating"),
+                    business.get("review_count"),
+                    json.dumps(stored, separators=(",", ":")),
+                    now,
+                )
+            )
+            categories.extend(
+                (category["alias"], business["id"])
+                for category in business.get("categories") or []
+            )
+
+        center = self._search_center(data, params)
+        cells = []
+        if center is not None:
+            radius = min(params.radius or self.default_radius, self.max_radius)
+            cells = cover_circle(center[0], center[1], radius, AREA_PRECISION)
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO restaurants VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO restaurant_categories VALUES (?, ?)", categories
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO areas VALUES (?, ?, ?)
+                ON CONFLICT (cell) DO UPDATE SET refreshed_at = excluded.refreshed_at
+                """,
+                [(cell, now, now) for cell in cells],
+            )
+
+    @staticmethod
+    def _search_center(
+        data: Dict[str, Any], params: RestaurantSearchParams
+    ) -> Optional[Tuple[float, float]]:
+        if params.latitude is not None and params.longitude is not None:
+            return params.latitude, params.longitude
+        center = (data.get("region") or {}).get("center")
+        if center:
+            return center["latitude"], center["longitude"]
+        return None
+
+    def record_in_background(
+        self, data: Dict[str, Any], params: RestaurantSearchParams
+    ) -> None:
+        """Upsert a Yelp response off the request path."""
+
+        async def record() -> None:
+            try:
+                await asyncio.to_thread(self.upsert, data, params)
+            except Exception as e:
+                logger.error(f"Failed to record restaurants: {str(e)}")
+
+        task = asyncio.create_task(record())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # Reads
+
+    def supports(self, params: RestaurantSearchParams) -> bool:
+        """Whether a search only uses filters the local store can evaluate."""
+        if any(getattr(params, name) for name in UNSUPPORTED_FILTERS):
+            return False
+        if (params.term or "").strip().lower() not in GENERIC_TERMS:
+            return False
+        return (params.radius or self.default_radius) <= self.max_radius
+
+    def query(
+        self,
+        params: RestaurantSearchParams,
+        center: Optional[Tuple[float, float]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer a search from the local store.
+
+        Args:
+            params: The search parameters.
+            center: Search center; defaults to the params' coordinates.
+
+        Returns:
+            A Yelp-shaped response, or None if the area is not fresh enough or
+            too few stored restaurants match.
+        """
+        if (
+            center is None
+            and params.latitude is not None
+            and params.longitude is not None
+        ):
+            center = (params.latitude, params.longitude)
+        if center is None or not self.supports(params):
+            return None
+
+        radius = params.radius or self.default_radius
+        cells = cover_circle(center[0], center[1], radius, AREA_PRECISION)
+        now = time.time()
+
+        with self._lock:
+            placeholders = ",".join("?" * len(cells))
+            fresh = self._conn.execute(
+                f"SELECT COUNT(*) FROM areas WHERE cell IN ({placeholders}) AND refreshed_at >= ?",
+                (*cells, now - self.max_age),
+            ).fetchone()[0]
+            self._conn.execute(
+                f"UPDATE areas SET queried_at = ? WHERE cell IN ({placeholders})",
+                (now, *cells),
+            )
+            self._conn.commit()
+            if fresh < len(cells):
+                return None
+
+            rows = self._conn.execute(*self._select(params, cells)).fetchall()
+
+        matches = []
+        for latitude, longitude, payload in rows:
+            distance = haversine_m(center[0], center[1], latitude, longitude)
+            if distance <= radius:
+                matches.append((distance, payload))
+
+        offset = params.offset or 0
+        limit = params.limit or 20
+        if len(matches) < offset + limit:
+            return None
+
+        businesses = []
+        for distance, payload in matches:
+            business = json.loads(payload)
+            business["distance"] = distance
+            businesses.append(business)
+        businesses = self._sort(businesses, params.sort_by)
+
+        return {
+            "businesses": businesses[offset : offset + limit],
+            "total": len(businesses),
+            "region": {"center": {"latitude": center[0], "longitude": center[1]}},
+        }
+
+    @staticmethod
+    def _select(
+        params: RestaurantSearchParams, cells: List[str]
+    ) -> Tuple[str, List[Any]]:
+        """Build the indexed SELECT for the covered cells and filters."""
+        clauses = [" OR ".join("(geohash >= ? AND geohash < ?)" for _ in cells)]
+        args: List[Any] = []
+        for cell in cells:
+            # '{' sorts right after 'z', so this is a prefix range scan
+            args.extend([cell, cell + "{"])
+
+        # The filter is free text from clients and the LLM; other levels are ignored
+        levels = [
+            int(level.strip())
+            for level in (params.price or "").split(",")
+            if level.strip() in PRICE_LEVELS
+        ]
+        if levels:
+            clauses.append(f"price IN ({','.join('?' * len(levels))})")
+            args.extend(levels)
+
+        if params.categories:
+            # Yelp's category filter matches sub-categories too
+            aliases = sorted(
+                get_category_index().expand(
+                    alias.strip()
+                    for alias in params.categories.split(",")
+                    if alias.strip()
+                )
+            )
+            clauses.append(
+                "id IN (SELECT restaurant_id FROM restaurant_categories "
+                f"WHERE alias IN ({','.join('?' * len(aliases))}))"
+            )
+            args.extend(aliases)
+
+        where = " AND ".join(f"({clause})" for clause in clauses)
+        return f"SELECT latitude, longitude, data FROM restaurants WHERE {where}", args
+
+    @staticmethod
+    def _sort(
+        businesses: List[Dict[str, Any]], sort_by: Optional[SortBy]
+    ) -> List[Dict[str, Any]]:
+        if sort_by == SortBy.DISTANCE:
+            return sorted(businesses, key=lambda b: b["distance"])
+        if sort_by == SortBy.RATING:
+            return sorted(
+                businesses, key=lambda b: (-b.get("rating", 0), b["distance"])
+            )
+        if sort_by == SortBy.REVIEW_COUNT:
+            return sorted(businesses, key=lambda b: -b.get("review_count", 0))
+        # Approximate best_match: rating weighted by review volume
+        return sorted(
+            businesses,
+            key=lambda b: -b.get("rating", 0) * math.log1p(b.get("review_count", 0)),
+        )
+
+    async def aquery(
+        self,
+        params: RestaurantSearchParams,
+        center: Optional[Tuple[float, float]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Async wrapper for ``query`` that runs off the event loop."""
+        data = await asyncio.to_thread(self.query, params, center)
+        if data is None:
+            self.local_misses += 1
+        else:
+            self.local_hits += 1
+        return data
+
+    # Background refresh
+
+    def stale_areas(self, limit: int) -> List[str]:
+        """Recently queried areas whose data is older than the freshness policy."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT cell FROM areas
+                WHERE refreshed_at < ? AND queried_at >= ?
+                ORDER BY queried_at DESC LIMIT ?
+                """,
+                (
+                    now - self.max_age,
+                    now - settings.RESTAURANT_STORE_ACTIVE_WINDOW,
+                    limit,
+                ),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def start_refresh(
+        self,
+        fetch: Callable[[RestaurantSearchParams], Awaitable[Dict[str, Any]]],
+        interval: float,
+        batch_size: int = 10,
+    ) -> None:
+        """
+        Periodically re-fetch stale, recently queried areas from Yelp.
+
+        Args:
+            fetch: Uncached Yelp search call that records its results here.
+            interval: Seconds between refresh rounds.
+            batch_size: Maximum areas refreshed per round.
+        """
+        if self._refresher is not None:
+            return
+
+        async def run() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                cells = await asyncio.to_thread(self.stale_areas, batch_size)
+                for cell in cells:
+                    latitude, longitude = decode_geohash(cell)
+                    params = RestaurantSearchParams(
+                        latitude=latitude,
+                        longitude=longitude,
+                        radius=self.default_radius,
+                        limit=settings.YELP_PAGE_SIZE,
+                    )
+                    try:
+                        await fetch(params)
+                    except Exception as e:
+                        logger.warning(f"Failed to refresh area {cell}: {str(e)}")
+                if cells:
+                    logger.info(f"Refreshed {len(cells)} stale restaurant areas")
+
+        self._refresher = asyncio.create_task(run())
+
+    async def close(self) -> None:
+        """Stop the refresher and wait for pending writes."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return local hit/miss counters."""
+        return {"local_hits": self.local_hits, "local_misses": self.local_misses}
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one upstream call.
+
+    The first caller for a key starts the call; every caller that arrives
+    while it is in flight awaits the same result (or error). The shared call
+    runs as its own task, so one caller disconnecting does not cancel it for
+    the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.collapsed = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` once per key across all concurrent callers.
+
+        Args:
+            key: Identifies calls that are interchangeable.
+            fn: Coroutine factory for the upstream call.
+
+        Returns:
+            The shared result of the call.
+        """
+        self.calls += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+            logger.debug(f"Collapsed duplicate {self.name} call")
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call and collapse counters."""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "in_flight": self.in_flight,
+        }
@@ -1,43 +1,587 @@
-import requests
-import json
+import asyncio
+import httpx
 import logging
-from typing import Dict, Any
+import orjson
+import time
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Any,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import quote
 from app.core.config import settings
+from app.core.metrics import UPSTREAM_REQUESTS
+from app.core.tracing import get_request_id, span
 from app.models.restaurants import (
     RestaurantSearchParams,
     Restaurant,
+    RestaurantDetails,
     RestaurantResponse,
     Region,
     Coordinates,
+    SortBy,
+)
+from app.services.cache import ResponseCache, build_cache_backend, make_cache_key
+from app.services.capture import ResponseCapture
+from app.services.geo import haversine_m
+from app.services.geocoding import (
+    LocationResolver,
+    ResolvedLocation,
+    normalize_location,
+)
+from app.services.rate_limit import (
+    Priority,
+    QuotaTracker,
+    RateLimiter,
+    UpstreamRateLimited,
+    build_token_bucket,
 )
+from app.services.resilience import UpstreamGuard, UpstreamUnavailable
+from app.services.restaurant_store import RestaurantStore
+from app.services.singleflight import SingleFlight
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+def _normalize_list(value: Optional[str]) -> Optional[str]:
+    """Lowercase, de-duplicate and sort a comma-separated list."""
+    if not value:
+        return None
+    items = sorted({item.strip().lower() for item in value.split(",") if item.strip()})
+    return ",".join(items) or None
+
+
+def _snap_to_grid(value: Optional[float]) -> Optional[float]:
+    """Round a coordinate to the configured cache grid."""
+    if value is None:
+        return None
+    grid = settings.YELP_CACHE_GEO_GRID
+    return round(round(value / grid) * grid, 6)
+
+
+def depends_on_distance(params: RestaurantSearchParams) -> bool:
+    """Whether which results a search returns depends on exactly where it is centered."""
+    return params.sort_by == SortBy.DISTANCE or params.radius is not None
+
+
+def search_cache_key(
+    params: RestaurantSearchParams, region_key: Optional[str] = None
+) -> str:
+    """
+    Build the cache key for a search from a canonical form of its parameters.
+
+    Comma lists are sorted, the term is lowercased and whitespace-collapsed,
+    the location is normalized with ``normalize_location`` and coordinates
+    are snapped to a grid so near-identical searches share an entry. When
+    the location has been resolved and the results do not depend on the
+    exact center (see ``depends_on_distance``), its region key replaces the
+    location so different spellings of a place share an entry.
+    """
+    payload = params.model_dump(mode="json", exclude_none=True)
+    for key in ("categories", "price", "attributes"):
+        payload[key] = _normalize_list(payload.get(key))
+    if payload.get("term"):
+        payload["term"] = " ".join(payload["term"].lower().split())
+    if payload.get("location"):
+        payload["location"] = normalize_location(payload["location"])
+    if region_key is not None and not depends_on_distance(params):
+        payload["location"] = None
+        payload["region"] = region_key
+    payload["latitude"] = _snap_to_grid(params.latitude)
+    payload["longitude"] = _snap_to_grid(params.longitude)
+
+    return make_cache_key(
+        "yelp_search", {k: v for k, v in payload.items() if v is not None}
+    )
+
+
+def with_distances_from(
+    data: Dict[str, Any], resolved: ResolvedLocation
+) -> Dict[str, Any]:
+    """
+    A search response with its distances measured from a resolved location.
+
+    A response cached by region may have been fetched for another spelling
+    of the place, centered elsewhere in the region; the response is returned
+    unchanged if it was centered on ``resolved``.
+    """
+    center = (data.get("region") or {}).get("center") or {}
+    if (center.get("latitude"), center.get("longitude")) == (
+        resolved.latitude,
+        resolved.longitude,
+    ):
+        return data
+
+    businesses = []
+    for business in data.get("businesses", []):
+        coordinates = business.get("coordinates") or {}
+        if coordinates.get("latitude") is None or coordinates.get("longitude") is None:
+            businesses.append(business)
+            continue
+        distance = haversine_m(
+            resolved.latitude,
+            resolved.longitude,
+            coordinates["latitude"],
+            coordinates["longitude"],
+        )
+        businesses.append({**business, "distance": distance})
+    return {
+        **data,
+        "businesses": businesses,
+        "region": {
+            "center": {"latitude": resolved.latitude, "longitude": resolved.longitude}
+        },
+    }
+
+
+def project_business(business: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Project a raw Yelp business onto the fields the frontend uses.
+
+    This is the trusted fast path: the Yelp payload is copied as-is, without
+    building and re-validating the nested ``Restaurant`` models.
+    """
+    location = business.get("location") or {}
+    return {
+        "id": business.get("id"),
+        "alias": business.get("alias"),
+        "name": business.get("name"),
+        "image_url": business.get("image_url"),
+        "is_closed": business.get("is_closed", False),
+        "url": business.get("url"),
+        "review_count": business.get("review_count", 0),
+        "categories": business.get("categories") or [],
+        "rating": business.get("rating"),
+        "coordinates": business.get("coordinates"),
+        "transactions": business.get("transactions") or [],
+        "price": business.get("price"),
+        "location": {
+            "address1": location.get("address1"),
+            "city": location.get("city"),
+            "state": location.get("state"),
+            "zip_code": location.get("zip_code"),
+            "display_address": location.get("display_address") or [],
+        },
+        "phone": business.get("phone"),
+        "display_phone": business.get("display_phone"),
+        "distance": business.get("distance"),
+        "photos": business.get("photos"),
+        "hours": business.get("hours"),
+        "attributes": business.get("attributes"),
+    }
+
+
+def project_review(review: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a raw Yelp review onto the fields the frontend uses."""
+    user = review.get("user") or {}
+    return {
+        "id": review.get("id"),
+        "url": review.get("url"),
+        "text": review.get("text"),
+        "rating": review.get("rating"),
+        "time_created": review.get("time_created"),
+        "user": {
+            "id": user.get("id"),
+            "profile_url": user.get("profile_url"),
+            "image_url": user.get("image_url"),
+            "name": user.get("name"),
+        },
+    }
+
+
+def paginate(
+    params: RestaurantSearchParams, target_count: int
+) -> List[RestaurantSearchParams]:
+    """
+    Split one search into the page requests needed to reach ``target_count`` results.
+
+    Yelp returns at most 50 results per call and 240 in total per search.
+    """
+    start = params.offset or 0
+    end = min(start + target_count, settings.YELP_MAX_RESULTS)
+
+    pages = []
+    for offset in range(start, end, settings.YELP_PAGE_SIZE):
+        limit = min(settings.YELP_PAGE_SIZE, end - offset)
+        pages.append(params.model_copy(update={"offset": offset, "limit": limit}))
+    return pages
+
+
+def _retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Parse a ``Retry-After`` header given in seconds."""
+    try:
+        return max(float(value), 0.0) if value is not None else default
+    except ValueError:
+        return default
+
+
+class BusinessNotFound(Exception):
+    """Yelp has no business with the requested ID."""
+
+
 class YelpService:
     """Service for interacting with the Yelp Fusion API."""
 
-    def __init__(self, api_key: str = settings.YELP_API_KEY):
-        """Initialize the Yelp service with API key."""
+    def __init__(
+        self,
+        api_key: str = settings.YELP_API_KEY,
+        base_url: str = settings.YELP_API_URL,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the Yelp service with API key.
+
+        Args:
+            api_key: The Yelp Fusion API key.
+            base_url: The Yelp API base URL (point this at a local stub for testing).
+            transport: Optional httpx transport, e.g. an ``httpx.MockTransport``.
+        """
         self.api_key = api_key
-        self.base_url = settings.YELP_API_URL
+        self.base_url = base_url
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.singleflight = SingleFlight("yelp_search")
+        self.details_singleflight = SingleFlight("yelp_details")
+        # Bounds concurrent details and reviews calls across all requests
+        self.details_semaphore = asyncio.Semaphore(
+            settings.YELP_DETAILS_MAX_CONCURRENCY
+        )
+        self.capture = ResponseCapture(
+            enabled=settings.YELP_CAPTURE_ENABLED,
+            sample_rate=settings.YELP_CAPTURE_SAMPLE_RATE,
+            directory=settings.YELP_CAPTURE_DIR,
+            max_files=settings.YELP_CAPTURE_MAX_FILES,
+        )
+        self.guard = UpstreamGuard(
+            "Yelp",
+            budget=settings.YELP_LATENCY_BUDGET,
+            attempts=settings.YELP_RETRY_ATTEMPTS,
+            base_delay=settings.YELP_RETRY_BASE_DELAY,
+            max_delay=settings.YELP_RETRY_MAX_DELAY,
+            failure_threshold=settings.YELP_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.YELP_CIRCUIT_RESET_TIMEOUT,
+            hedge=settings.YELP_HEDGE_ENABLED,
+        )
+        self.limiter: Optional[RateLimiter] = None
+        if settings.YELP_RATE_LIMIT_ENABLED:
+            self.limiter = RateLimiter(
+                build_token_bucket(
+                    settings.YELP_RATE_LIMIT_BACKEND,
+                    name="yelp",
+                    rate=settings.YELP_RATE_LIMIT_PER_SECOND,
+                    capacity=settings.YELP_RATE_LIMIT_BURST,
+                    path=settings.YELP_RATE_LIMIT_PATH,
+                ),
+                QuotaTracker(reserve=settings.YELP_QUOTA_RESERVE),
+                max_wait=settings.YELP_RATE_LIMIT_MAX_WAIT,
+                name="Yelp",
+                background_max_wait=settings.YELP_RATE_LIMIT_BACKGROUND_MAX_WAIT,
+            )
+        self.locations: Optional[LocationResolver] = None
+        if settings.GEOCODE_CACHE_ENABLED:
+            self.locations = LocationResolver(
+                path=settings.GEOCODE_CACHE_PATH,
+                region_precision=settings.GEOCODE_REGION_PRECISION,
+            )
+        self.store: Optional[RestaurantStore] = None
+        if settings.RESTAURANT_STORE_ENABLED:
+            self.store = RestaurantStore(
+                path=settings.RESTAURANT_STORE_PATH,
+                max_age=settings.RESTAURANT_STORE_MAX_AGE,
+                max_radius=settings.RESTAURANT_STORE_MAX_RADIUS,
+                default_radius=settings.RESTAURANT_STORE_DEFAULT_RADIUS,
+            )
+        self.cache: Optional[ResponseCache] = None
+        if settings.YELP_CACHE_ENABLED:
+            self.cache = ResponseCache(
+                build_cache_backend(
+                    settings.YELP_CACHE_BACKEND,
+                    namespace="yelp_search",
+                    max_entries=settings.YELP_CACHE_MAX_ENTRIES,
+                    path=settings.YELP_CACHE_PATH,
+                ),
+                ttl=settings.YELP_CACHE_TTL,
+                stale_ttl=settings.YELP_CACHE_STALE_TTL,
+                name="yelp_search",
+                grace_ttl=settings.YELP_CACHE_GRACE_TTL,
+            )
+        self.details_cache: Optional[ResponseCache] = None
+        self.reviews_cache: Optional[ResponseCache] = None
+        if settings.YELP_CACHE_ENABLED:
+            self.details_cache = ResponseCache(
+                build_cache_backend(
+                    settings.YELP_CACHE_BACKEND,
+                    namespace="yelp_details",
+                    max_entries=settings.YELP_DETAILS_CACHE_MAX_ENTRIES,
+                    path=settings.YELP_CACHE_PATH,
+                ),
+                ttl=settings.YELP_DETAILS_CACHE_TTL,
+                stale_ttl=settings.YELP_DETAILS_CACHE_STALE_TTL,
+                name="yelp_details",
+                grace_ttl=settings.YELP_CACHE_GRACE_TTL,
+            )
+            self.reviews_cache = ResponseCache(
+                build_cache_backend(
+                    settings.YELP_CACHE_BACKEND,
+                    namespace="yelp_reviews",
+                    max_entries=settings.YELP_DETAILS_CACHE_MAX_ENTRIES,
+                    path=settings.YELP_CACHE_PATH,
+                ),
+                ttl=settings.YELP_REVIEWS_CACHE_TTL,
+                stale_ttl=settings.YELP_REVIEWS_CACHE_STALE_TTL,
+                name="yelp_reviews",
+                grace_ttl=settings.YELP_CACHE_GRACE_TTL,
+            )
+
+    async def startup(self) -> None:
+        """Open the shared keep-alive connection pool used for all Yelp calls."""
+        await self.capture.start()
+        if self.store is not None:
+            self.store.start_refresh(
+                self._fetch_background, settings.RESTAURANT_STORE_REFRESH_INTERVAL
+            )
+        if self._client is not None:
+            return
 
-    def search_restaurants(self, params: RestaurantSearchParams) -> Dict[str, Any]:
+        http2 = settings.YELP_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(
+                settings.YELP_READ_TIMEOUT,
+                connect=settings.YELP_CONNECT_TIMEOUT,
+                pool=settings.YELP_POOL_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.YELP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.YELP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.YELP_KEEPALIVE_EXPIRY,
+            ),
+            http2=http2,
+            transport=self._transport,
+        )
+        logger.info(
+            f"Yelp connection pool opened (max_connections={settings.YELP_MAX_CONNECTIONS}, http2={http2})"
+        )
+
+    async def shutdown(self) -> None:
+        """Close the shared connection pool and stop background tasks."""
+        for cache in (self.cache, self.details_cache, self.reviews_cache):
+            if cache is not None:
+                await cache.close()
+        if self.store is not None:
+            await self.store.close()
+        if self.locations is not None:
+            await self.locations.close()
+        if self.limiter is not None:
+            await self.limiter.close()
+        await self.capture.stop()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Yelp connection pool closed")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters of the Yelp client and its caches."""
+        stats: Dict[str, Any] = {
+            "upstream": self.guard.stats(),
+            "singleflight": self.singleflight.stats(),
+            "details_singleflight": self.details_singleflight.stats(),
+            "capture": self.capture.stats(),
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.details_cache is not None:
+            stats["details_cache"] = self.details_cache.stats()
+        if self.reviews_cache is not None:
+            stats["reviews_cache"] = self.reviews_cache.stats()
+        if self.limiter is not None:
+            stats["rate_limit"] = self.limiter.stats()
+        if self.locations is not None:
+            stats["locations"] = self.locations.stats()
+        if self.store is not None:
+            stats["store"] = self.store.stats()
+        return stats
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, opening it if the app lifespan has not."""
+        if self._client is None:
+            await self.startup()
+        return self._client
+
+    async def _resolve_location(
+        self, params: RestaurantSearchParams
+    ) -> Optional[ResolvedLocation]:
+        """Look up the learned coordinates of a location-only search."""
+        if self.locations is None or params.latitude is not None:
+            return None
+        return await self.locations.resolve(params.location)
+
+    async def search_restaurants(
+        self, params: RestaurantSearchParams
+    ) -> Dict[str, Any]:
         """
         Search for restaurants using the Yelp API.
 
+        Results are served from the response cache when a fresh (or stale,
+        revalidating) entry exists
+        for the normalized search parameters. Free-text locations that have
+        been geocoded before are keyed by region rather than by spelling,
+        unless the results depend on the exact center (distance order or a
+        radius); distances are then measured from this location.
+
         Args:
             params: The search parameters.
 
         Returns:
             The raw API response as a dictionary.
 
+        When Yelp is rate limited or unavailable, an expired cache entry is
+        served if one is still within the grace period, and otherwise an
+        answer from the local restaurant store if it is enabled and has one.
+
         Raises:
+            UpstreamUnavailable: If Yelp cannot be called (rate limit, open
+                circuit, latency budget) and no cached result is available.
+            Exception: If the API request fails.
+        """
+        resolved = await self._resolve_location(params)
+        key = search_cache_key(params, resolved.region_key if resolved else None)
+
+        # Identical searches that miss the cache at the same time share one call
+        async def fetch() -> Dict[str, Any]:
+            return await self.singleflight.do(key, lambda: self._fetch_search(params))
+
+        async def refresh() -> Dict[str, Any]:
+            return await self.singleflight.do(
+                key, lambda: self._fetch_background(params)
+            )
+
+        try:
+            if self.cache is None:
+                return await fetch()
+            data = await self.cache.get_or_fetch(
+                key, fetch, refresh=refresh, fallback_errors=(UpstreamUnavailable,)
+            )
+        except UpstreamUnavailable:
+            if self.store is None:
+                raise
+            center = (resolved.latitude, resolved.longitude) if resolved else None
+            local = await self.store.aquery(params, center)
+            if local is None:
+                raise
+            logger.info("Yelp unavailable, answered the search from the local store")
+            return local
+        if resolved is not None and not depends_on_distance(params):
+            return with_distances_from(data, resolved)
+        return data
+
+    async def _fetch_background(self, params: RestaurantSearchParams) -> Dict[str, Any]:
+        """Uncached Yelp search at background priority (refreshes, prefetch)."""
+        return await self._fetch_search(params, Priority.BACKGROUND)
+
+    async def warm(self, params: RestaurantSearchParams) -> bool:
+        """
+        Make sure a search is fresh in the response cache, at background priority.
+
+        Args:
+            params: The search to warm.
+
+        Returns:
+            True if Yelp was called, False if the entry was already fresh or
+            there is no cache to warm.
+
+        Raises:
+            UpstreamUnavailable: If the rate limiter or Yelp refuses the call.
+            Exception: If the API request fails.
+        """
+        if self.cache is None:
+            return False
+
+        resolved = await self._resolve_location(params)
+        key = search_cache_key(params, resolved.region_key if resolved else None)
+        entry = await self.cache.get_entry(key)
+        if entry is not None and time.time() - entry.stored_at <= self.cache.ttl:
+            return False
+
+        data = await self.singleflight.do(key, lambda: self._fetch_background(params))
+        await self.cache.set(key, data)
+        return True
+
+    async def _get_json(
+        self,
+        endpoint: str,
+        request_params: Dict[str, Any],
+        priority: Priority,
+    ) -> Dict[str, Any]:
+        """
+        GET a Yelp endpoint through the rate limiter and the upstream guard.
+
+        The token is taken once, before the guard, so waiting for it neither
+        uses the latency budget nor counts towards the circuit breaker, and
+        retries and hedged copies of the call do not queue for more.
+
+        Raises:
+            UpstreamUnavailable: If the rate limiter or Yelp refuses the call,
+                the circuit breaker is open or the latency budget runs out.
+            httpx.HTTPError: If the request fails.
+        """
+        client = await self._get_client()
+        if self.limiter is not None:
+            await self.limiter.acquire(priority)
+
+        async def request() -> httpx.Response:
+            try:
+                response = await client.get(endpoint, params=request_params)
+            except httpx.TransportError:
+                UPSTREAM_REQUESTS.inc(upstream="yelp", status="error")
+                raise
+            UPSTREAM_REQUESTS.inc(upstream="yelp", status=str(response.status_code))
+            if self.limiter is not None:
+                self.limiter.quota.update(response.headers)
+            if response.status_code == 429:
+                raise UpstreamRateLimited(
+                    "Yelp API rate limit reached",
+                    _retry_after(response.headers.get("retry-after")),
+                )
+            response.raise_for_status()
+            return response
+
+        response = await self.guard.call(request)
+        return response.json()
+
+    async def _fetch_search(
+        self,
+        params: RestaurantSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Dict[str, Any]:
+        """
+        Call the Yelp ``businesses/search`` endpoint, bypassing the cache.
+
+        Args:
+            params: The search parameters.
+            priority: Rate limiter priority of the call.
+
+        Raises:
+            UpstreamUnavailable: If the rate limiter or Yelp refuses the call,
+                the circuit breaker is open or the latency budget runs out.
             Exception: If the API request fails.
         """
         # Build the API endpoint
@@ -64,26 +608,300 @@ class YelpService:
         logger.debug(f"Yelp API request: {endpoint} with params: {request_params}")
 
         try:
-            # Make the API request
-            response = requests.get(
-                endpoint, headers=self.headers, params=request_params
-            )
-            response.raise_for_status()
-
-            # Parse the response
-            data = response.json()
+            # Make the API request, retried and bounded by the Yelp latency budget
+            with span("yelp.search", priority=priority.name):
+                data = await self._get_json(endpoint, request_params, priority)
             logger.debug(
                 f"Yelp API response received: {len(data.get('businesses', []))} businesses"
             )
 
-            # For debugging
-            self._save_response_to_file(data, "app/constants/yelp_response.json")
+            if self.store is not None:
+                self.store.record_in_background(data, params)
+
+            # Remember where Yelp placed a free-text location
+            center = (data.get("region") or {}).get("center")
+            if self.locations is not None and center and params.latitude is None:
+                if params.location:
+                    self.locations.learn(params.location, center)
+
+            # Sampled capture for offline replay (off by default)
+            self.capture.submit(
+                "search",
+                {"params": request_params, "response": data},
+                request_id=get_request_id(),
+            )
 
             return data
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
+            logger.error(f"Yelp API request failed: {str(e)}")
+            raise Exception(f"Failed to fetch data from Yelp API: {str(e)}")
+
+    async def search_many(
+        self, searches: List[RestaurantSearchParams], max_concurrency: int
+    ) -> AsyncIterator[Tuple[RestaurantSearchParams, Union[Dict[str, Any], Exception]]]:
+        """
+        Run several searches concurrently and yield their results in input order.
+
+        At most ``max_concurrency`` calls are in flight at once. Each result is
+        yielded as soon as it and every search before it have completed, so
+        the first results arrive without waiting for the slowest call.
+
+        Args:
+            searches: The searches to run.
+            max_concurrency: Maximum number of concurrent Yelp calls.
+
+        Yields:
+            Each search paired with its raw response, or the exception it raised.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(params: RestaurantSearchParams) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.search_restaurants(params)
+
+        tasks = [asyncio.create_task(run(params)) for params in searches]
+        try:
+            for params, task in zip(searches, tasks):
+                try:
+                    yield params, await task
+                except Exception as e:
+                    logger.error(f"Batch search failed: {str(e)}")
+                    yield params, e
+        finally:
+            # Stop outstanding calls if the consumer goes away
+            for task in tasks:
+                task.cancel()
+
+    async def search_pool(
+        self, params: RestaurantSearchParams, size: int
+    ) -> Dict[str, Any]:
+        """
+        Fetch up to ``size`` results for a search, across as many pages as needed.
+
+        Pages are fetched concurrently and merged in page order without
+        duplicate businesses. Pages that fail are skipped unless all do.
+
+        Args:
+            params: The search; its ``offset`` is where the pool starts.
+            size: Number of results to fetch.
+
+        Returns:
+            The first page's response with the merged ``businesses``, or no
+            businesses if the pool starts past the results Yelp can return.
+
+        Raises:
+            Exception: The first page's error if no page succeeded.
+        """
+        pages = paginate(params, size)
+        if not pages:
+            return {"businesses": [], "total": 0}
+        if len(pages) == 1:
+            return await self.search_restaurants(pages[0])
+
+        merged: Optional[Dict[str, Any]] = None
+        first_error: Optional[Exception] = None
+        seen = set()
+        async for _, result in self.search_many(
+            pages, settings.YELP_BATCH_MAX_CONCURRENCY
+        ):
+            if isinstance(result, Exception):
+                first_error = first_error or result
+                continue
+            if merged is None:
+                merged = {**result, "businesses": []}
+            for business in result.get("businesses", []):
+                if business.get("id") not in seen:
+                    seen.add(business.get("id"))
+                    merged["businesses"].append(business)
+
+        if merged is None:
+            raise first_error
+        return merged
+
+    async def _get_cached(
+        self,
+        cache: Optional[ResponseCache],
+        key: str,
+        fetch: Callable[[Priority], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Serve a per-business entry from its cache, fetching it once on a miss."""
+
+        async def interactive() -> Dict[str, Any]:
+            return await self.details_singleflight.do(
+                key, lambda: fetch(Priority.INTERACTIVE)
+            )
+
+        async def refresh() -> Dict[str, Any]:
+            return await self.details_singleflight.do(
+                key, lambda: fetch(Priority.BACKGROUND)
+            )
+
+        if cache is None:
+            return await interactive()
+        return await cache.get_or_fetch(
+            key, interactive, refresh=refresh, fallback_errors=(UpstreamUnavailable,)
+        )
+
+    async def _fetch_business(
+        self,
+        business_id: str,
+        kind: str,
+        request_params: Dict[str, Any],
+        priority: Priority,
+    ) -> Dict[str, Any]:
+        """
+        Call ``businesses/{id}`` ("details") or ``businesses/{id}/reviews``, bypassing the cache.
+
+        Raises:
+            BusinessNotFound: If Yelp does not know the business.
+            UpstreamUnavailable: If Yelp cannot be called.
+            Exception: If the API request fails.
+        """
+        endpoint = f"{self.base_url}/businesses/{quote(business_id, safe='')}"
+        if kind != "details":
+            endpoint += f"/{kind}"
+        try:
+            async with self.details_semaphore:
+                with span(f"yelp.{kind}", priority=priority.name):
+                    data = await self._get_json(endpoint, request_params, priority)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 404):
+                raise BusinessNotFound(f"Business '{business_id}' not found")
             logger.error(f"Yelp API request failed: {str(e)}")
             raise Exception(f"Failed to fetch data from Yelp API: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error(f"Yelp API request failed: {str(e)}")
+            raise Exception(f"Failed to fetch data from Yelp API: {str(e)}")
+
+        self.capture.submit(
+            kind,
+            {"id": business_id, "params": request_params, "response": data},
+            request_id=get_request_id(),
+        )
+        return data
+
+    async def get_business(self, business_id: str) -> Dict[str, Any]:
+        """
+        Fetch a business's full details, including hours and photos.
+
+        Cached per business for ``YELP_DETAILS_CACHE_TTL``, then served stale
+        while it is refreshed in the background.
+
+        Raises:
+            BusinessNotFound: If Yelp does not know the business.
+            UpstreamUnavailable: If Yelp cannot be called and nothing is cached.
+            Exception: If the API request fails.
+        """
+        return await self._get_cached(
+            self.details_cache,
+            make_cache_key("yelp_details", {"id": business_id}),
+            lambda priority: self._fetch_business(business_id, "details", {}, priority),
+        )
+
+    async def get_reviews(self, business_id: str) -> Dict[str, Any]:
+        """
+        Fetch a business's review excerpts, cached per business for ``YELP_REVIEWS_CACHE_TTL``.
+
+        Raises:
+            BusinessNotFound: If Yelp does not know the business.
+            UpstreamUnavailable: If Yelp cannot be called and nothing is cached.
+            Exception: If the API request fails.
+        """
+        request_params = {"limit": settings.YELP_REVIEWS_LIMIT, "sort_by": "yelp_sort"}
+        return await self._get_cached(
+            self.reviews_cache,
+            make_cache_key("yelp_reviews", {"id": business_id, **request_params}),
+            lambda priority: self._fetch_business(
+                business_id, "reviews", request_params, priority
+            ),
+        )
+
+    async def get_details_many(
+        self, business_ids: List[str], reviews: bool = False
+    ) -> List[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """
+        Fetch the details, and optionally the reviews, of several businesses concurrently.
+
+        Every business is cached separately, so only the ones missing from
+        the cache cost a Yelp call; those calls share ``details_semaphore``.
+        The reviews of a business are attached under ``reviews``; if only
+        they fail, the business is returned with ``reviews`` set to None.
+
+        Args:
+            business_ids: The business IDs; duplicates are fetched once.
+            reviews: Whether to fetch review excerpts too.
+
+        Returns:
+            Each unique ID, in input order, with its merged details or the
+            exception that prevented fetching them.
+        """
+        unique_ids = list(dict.fromkeys(business_ids))
+
+        async def fetch(business_id: str) -> Dict[str, Any]:
+            if not reviews:
+                return await self.get_business(business_id)
+            business, review_data = await asyncio.gather(
+                self.get_business(business_id),
+                self.get_reviews(business_id),
+                return_exceptions=True,
+            )
+            if isinstance(business, BaseException):
+                raise business
+            if isinstance(review_data, BaseException):
+                logger.warning(f"Reviews for {business_id} failed: {str(review_data)}")
+                return {**business, "reviews": None}
+            return {**business, "reviews": review_data.get("reviews", [])}
+
+        results = await asyncio.gather(
+            *(fetch(business_id) for business_id in unique_ids), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+        return list(zip(unique_ids, results))
+
+    def serialize_details(self, business: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert raw business details, with any ``reviews``, to their JSON-ready API form."""
+        if settings.YELP_STRICT_VALIDATION:
+            return RestaurantDetails.model_validate(business).model_dump(mode="json")
+        reviews = business.get("reviews")
+        return {
+            **project_business(business),
+            "reviews": None
+            if reviews is None
+            else [project_review(r) for r in reviews],
+        }
+
+    def serialize_business(self, business: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw business to its JSON-ready API form."""
+        if settings.YELP_STRICT_VALIDATION:
+            return Restaurant.model_validate(business).model_dump(mode="json")
+        return project_business(business)
+
+    def format_response_json(
+        self, data: Dict[str, Any], params: RestaurantSearchParams
+    ) -> bytes:
+        """
+        Serialize a search response straight to JSON bytes.
+
+        Same shape as ``format_response`` but skips Pydantic validation of
+        every business; use ``format_response`` when strict validation is on.
+        """
+        center = (data.get("region") or {}).get("center")
+        return orjson.dumps(
+            {
+                "restaurants": [
+                    project_business(business)
+                    for business in data.get("businesses", [])
+                ],
+                "total": data.get("total", 0),
+                "region": {"center": center} if center else None,
+                "offset": params.offset or 0,
+                "limit": params.limit or 20,
+                "location": params.location or f"{params.latitude},{params.longitude}",
+            }
+        )
 
     def format_response(
         self, data: Dict[str, Any], params: RestaurantSearchParams
@@ -110,14 +928,6 @@ class YelpService:
             location=params.location or f"{params.latitude},{params.longitude}",
         )
 
-    def _save_response_to_file(self, data: Dict[str, Any], filename: str) -> None:
-        """Save API response to a file for debugging."""
-        try:
-            with open(filename, "w") as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save response to file: {str(e)}")
-
 
 # Create a singleton instance
 yelp_service = YelpService()
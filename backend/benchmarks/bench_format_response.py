@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: strict Pydantic response path vs. the trusted fast path.
+
+The strict path reproduces what a request costs with ``YELP_STRICT_VALIDATION``:
+``format_response`` builds the nested models, then FastAPI re-validates the
+result against ``response_model`` and serializes it with ``json.dumps``.
+
+    uv run python -m benchmarks.bench_format_response
+"""
+
+import json
+import os
+import timeit
+
+os.environ.setdefault("YELP_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.models.restaurants import RestaurantResponse, RestaurantSearchParams  # noqa: E402
+from app.services.yelp import YelpService  # noqa: E402
+from stubs.yelp_stub import TORONTO_CENTER, _make_business  # noqa: E402
+
+LIMIT = 50
+ROUNDS = 200
+
+service = YelpService()
+params = RestaurantSearchParams(location="Toronto", limit=LIMIT)
+data = {
+    "businesses": [_make_business(index, TORONTO_CENTER) for index in range(LIMIT)],
+    "total": 240,
+    "region": {
+        "center": {"latitude": TORONTO_CENTER[0], "longitude": TORONTO_CENTER[1]}
+    },
+}
+response_adapter = TypeAdapter(RestaurantResponse)
+
+
+def strict_path() -> bytes:
+    response = service.format_response(data, params)
+    validated = response_adapter.validate_python(response)
+    return json.dumps(response_adapter.dump_python(validated, mode="json")).encode()
+
+
+def fast_path() -> bytes:
+    return service.format_response_json(data, params)
+
+
+if __name__ == "__main__":
+    strict_ms = min(timeit.repeat(strict_path, number=ROUNDS, repeat=5)) / ROUNDS * 1000
+    fast_ms = min(timeit.repeat(fast_path, number=ROUNDS, repeat=5)) / ROUNDS * 1000
+
+    print(f"limit={LIMIT}, payload={len(fast_path())} bytes")
+    print(f"strict path: {strict_ms:.3f} ms/request")
+    print(f"fast path:   {fast_ms:.3f} ms/request")
+    print(
+        f"saved:       {strict_ms - fast_ms:.3f} ms/request ({strict_ms / fast_ms:.1f}x)"
+    )
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: bytes and CPU per /api/restaurants response at limit=50.
+
+Times ``ResponseEncoder.respond`` for the identity coding, for gzip and
+brotli (if installed) both cold and from the compressed-body cache, and for
+a conditional request answered with ``304``.
+
+    uv run python -m benchmarks.bench_http_cache
+"""
+
+import os
+import timeit
+
+os.environ.setdefault("YELP_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from starlette.requests import Request  # noqa: E402
+
+from app.core.http_cache import COMPRESSORS, ResponseEncoder, content_etag  # noqa: E402
+from app.models.restaurants import RestaurantSearchParams  # noqa: E402
+from app.services.yelp import YelpService  # noqa: E402
+from stubs.yelp_stub import TORONTO_CENTER, _make_business  # noqa: E402
+
+LIMIT = 50
+ROUNDS = 200
+
+params = RestaurantSearchParams(location="Toronto", limit=LIMIT)
+data = {
+    "businesses": [_make_business(index, TORONTO_CENTER) for index in range(LIMIT)],
+    "total": 240,
+    "region": {
+        "center": {"latitude": TORONTO_CENTER[0], "longitude": TORONTO_CENTER[1]}
+    },
+}
+content = YelpService().format_response_json(data, params)
+
+
+def make_request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/restaurants",
+            "headers": [
+                (k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()
+            ],
+        }
+    )
+
+
+def measure(label: str, request: Request, cached: bool) -> None:
+    encoder = ResponseEncoder(max_entries=256 if cached else 0)
+    response = encoder.respond(request, content)
+    ms = (
+        min(
+            timeit.repeat(
+                lambda: encoder.respond(request, content), number=ROUNDS, repeat=5
+            )
+        )
+        / ROUNDS
+        * 1000
+    )
+    print(f"{label:<22} {len(response.body):>7} bytes  {ms:.3f} ms/response")
+
+
+if __name__ == "__main__":
+    print(f"limit={LIMIT}, payload={len(content)} bytes")
+    measure("identity", make_request(), cached=False)
+    for coding in COMPRESSORS:
+        measure(f"{coding} (cold)", make_request(accept_encoding=coding), cached=False)
+        measure(f"{coding} (cached)", make_request(accept_encoding=coding), cached=True)
+    measure(
+        "304 not modified",
+        make_request(if_none_match=content_etag(content)),
+        cached=True,
+    )
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark: meeting-suitability ranking of over-fetched candidate pools.
+
+Times ``Ranker.rank`` (feature extraction, scoring and ordering) for pools of
+stub businesses of increasing size, against a per-business Python loop
+computing the same score for reference.
+
+    uv run python -m benchmarks.bench_ranking
+"""
+
+import math
+import os
+import timeit
+
+os.environ.setdefault("YELP_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.models.restaurants import RestaurantSearchParams  # noqa: E402
+from app.services.ranking import (  # noqa: E402
+    DEFAULT_MAX_DISTANCE,
+    REVIEW_SCALE,
+    expand_categories,
+    ranker,
+    split_list,
+)
+from stubs.yelp_stub import TORONTO_CENTER, _make_business  # noqa: E402
+
+POOL_SIZES = (50, 240, 1000)
+ROUNDS = 200
+
+params = RestaurantSearchParams(
+    location="Toronto",
+    categories="italian,steak,seafood",
+    price="3,4",
+    reservation_date="2025-03-14",
+    reservation_time="19:30",
+)
+
+
+def python_rank(businesses, params):
+    """The same score computed one business at a time, without NumPy."""
+    weights = ranker.weights
+    categories = expand_categories(split_list(params.categories))
+    levels = [int(p) for p in split_list(params.price)]
+
+    def score(business):
+        price = len(business.get("price") or "")
+        cats = business.get("categories") or []
+        distance = business.get("distance")
+        reservable = "restaurant_reservation" in (business.get("transactions") or ())
+        return (
+            weights.rating * (business["rating"] - 3.0) / 2.0
+            + weights.reviews
+            * min(math.log1p(business["review_count"]) / REVIEW_SCALE, 1.0)
+            + weights.distance
+            * (
+                1.0 - min(distance / DEFAULT_MAX_DISTANCE, 1.0)
+                if distance is not None
+                else 0.0
+            )
+            + weights.price
+            * (
+                1.0 - min(abs(price - level) for level in levels) / 1.5
+                if price
+                else 0.0
+            )
+            + weights.category
+            * (sum(c["alias"] in categories for c in cats) / len(cats) if cats else 0.0)
+            + weights.reservation * 0.5 * reservable
+        )
+
+    return sorted(businesses, key=score, reverse=True)
+
+
+if __name__ == "__main__":
+    for size in POOL_SIZES:
+        businesses = [_make_business(index, TORONTO_CENTER) for index in range(size)]
+        ranker.rank(businesses, params)
+
+        numpy_ms = (
+            min(
+                timeit.repeat(
+                    lambda: ranker.rank(businesses, params), number=ROUNDS, repeat=5
+                )
+            )
+            / ROUNDS
+            * 1000
+        )
+        python_ms = (
+            min(
+                timeit.repeat(
+                    lambda: python_rank(businesses, params), number=ROUNDS, repeat=5
+                )
+            )
+            / ROUNDS
+            * 1000
+        )
+        print(
+            f"pool={size:>5}: ranker {numpy_ms:.3f} ms/request, "
+            f"python loop {python_ms:.3f} ms/request ({python_ms / numpy_ms:.1f}x)"
+        )
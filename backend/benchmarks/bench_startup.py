@@ -0,0 +1,106 @@
+"""
+Startup benchmark: how long a fresh worker takes to import and to serve.
+
+Measures, over several cold processes, the time to ``import main`` and the
+time from launching uvicorn to the first 200 from ``/api/health``. Both are
+what a new worker costs on deploy, scale-out or a crash restart.
+
+    uv run python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.suite import free_port, stop
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def benchmark_env() -> Dict[str, str]:
+    return {
+        **os.environ,
+        "YELP_API_KEY": os.environ.get("YELP_API_KEY", "benchmark"),
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark"),
+    }
+
+
+def time_import() -> float:
+    """Seconds to ``import main`` in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        env=benchmark_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def time_first_response(timeout: float = 60.0) -> float:
+    """Seconds from launching uvicorn to the first 200 from ``/api/health``."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=benchmark_env(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if httpx.get(url, timeout=1.0).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"Server did not answer within {timeout:g}s")
+    finally:
+        stop(process)
+
+
+def summarize(name: str, samples: List[float]) -> str:
+    return (
+        f"{name:<16} median {statistics.median(samples) * 1000:7.0f} ms"
+        f"  min {min(samples) * 1000:7.0f} ms  max {max(samples) * 1000:7.0f} ms"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    imports = [time_import() for _ in range(args.runs)]
+    first_responses = [time_first_response() for _ in range(args.runs)]
+
+    print(f"{args.runs} cold runs")
+    print(summarize("import main", imports))
+    print(summarize("first response", first_responses))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
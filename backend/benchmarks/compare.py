@@ -0,0 +1,116 @@
+"""
+Compare two benchmark runs and flag regressions.
+
+Takes two result files from ``benchmarks.loadgen`` or two output directories
+from ``benchmarks.suite`` and compares scenarios present in both:
+
+    uv run python -m benchmarks.compare results/before results/after --threshold 10
+
+Exits with status 1 if any scenario's p95 or p99 latency grew, or its
+throughput dropped, by more than ``--threshold`` percent, or its error rate
+increased.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def load(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load results keyed by scenario from a result file or suite directory."""
+    if os.path.isdir(path):
+        path = os.path.join(path, "summary.json")
+    with open(path) as f:
+        results = json.load(f)
+    if "scenario" in results:
+        return {results["scenario"]: results}
+    return results
+
+
+def change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    """Relative change in percent, or None if it cannot be computed."""
+    if before is None or after is None or before == 0:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(
+    before: Dict[str, Dict[str, Any]],
+    after: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> Tuple[List[str], List[str]]:
+    """
+    Compare runs scenario by scenario.
+
+    Returns:
+        The report lines and the regressions found.
+    """
+    lines: List[str] = []
+    regressions: List[str] = []
+
+    for scenario in sorted(before.keys() & after.keys()):
+        old, new = before[scenario], after[scenario]
+        lines.append(f"{scenario} ({old.get('git_commit')} -> {new.get('git_commit')})")
+
+        metrics = [
+            (
+                f"latency {q}",
+                old["latency_ms"][q],
+                new["latency_ms"][q],
+                "ms",
+                q != "p50",
+            )
+            for q in ("p50", "p95", "p99")
+        ]
+        metrics.append(
+            ("throughput", old["throughput_rps"], new["throughput_rps"], "req/s", True)
+        )
+        for name, old_value, new_value, unit, checked in metrics:
+            delta = change(old_value, new_value)
+            if delta is None:
+                lines.append(f"  {name:<12} {old_value} -> {new_value}")
+                continue
+            lines.append(
+                f"  {name:<12} {old_value:10.1f} -> {new_value:10.1f} {unit:<5} "
+                f"({delta:+.1f}%)"
+            )
+            if not checked:
+                continue
+            # Lower is better for latency, higher for throughput
+            worse = -delta if name == "throughput" else delta
+            if worse > threshold:
+                regressions.append(f"{scenario}: {name} {delta:+.1f}%")
+
+        old_errors, new_errors = old["error_rate"], new["error_rate"]
+        lines.append(f"  {'error rate':<12} {old_errors:10.2%} -> {new_errors:10.2%}")
+        if new_errors > old_errors:
+            regressions.append(
+                f"{scenario}: error rate {old_errors:.2%} -> {new_errors:.2%}"
+            )
+
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="allowed regression in percent"
+    )
+    args = parser.parse_args(argv)
+
+    lines, regressions = compare(load(args.before), load(args.after), args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print("\nRegressions:")
+        print("\n".join(f"  {regression}" for regression in regressions))
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
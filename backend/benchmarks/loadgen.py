@@ -0,0 +1,379 @@
+"""
+Closed-loop load generator for the API.
+
+Each of ``--concurrency`` workers sends one request at a time until
+``--requests`` have been sent or ``--duration`` seconds have passed. Request
+inputs are drawn from a seeded pool of ``--keys`` distinct searches/profiles,
+so the same arguments replay the same workload and ``--keys`` controls how
+often the caches can answer.
+
+Scenarios:
+    restaurants:    GET /api/restaurants
+    client_profile: POST /api/client_profile
+    flow:           POST /api/client_profile, then GET /api/restaurants with
+                    the generated parameters
+    recommendations: POST /api/recommendations (the same flow server-side)
+    details:        GET /api/restaurants, then GET /api/restaurants/details for
+                    the top DETAILS_TOP_N results
+
+    uv run python -m benchmarks.loadgen restaurants --concurrency 32 --requests 2000 \\
+        --output results/restaurants.json
+
+Results are printed and, with ``--output``, written as JSON for
+``benchmarks.compare``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+SCENARIOS = ("restaurants", "client_profile", "flow", "recommendations", "details")
+
+# Results whose details the "details" scenario warms, as a results page would
+DETAILS_TOP_N = 10
+
+LOCATIONS = [
+    "Toronto, ON",
+    "123 King St W, Toronto",
+    "Yorkville, Toronto",
+    "Liberty Village, Toronto",
+    "Distillery District, Toronto",
+    "North York, ON",
+    "Mississauga, ON",
+    "Markham, ON",
+]
+TERMS = [
+    "restaurant",
+    "sushi",
+    "steakhouse",
+    "italian",
+    "brunch",
+    "wine bar",
+    "seafood",
+]
+PRICES = [None, "2", "2,3", "3,4"]
+DESIGNATIONS = ["CEO", "CFO", "VP Sales", "Director of Engineering", "Procurement Lead"]
+PURPOSES = [
+    "Deal closing",
+    "Relationship building",
+    "Project kickoff",
+    "Quarterly review",
+]
+RELATIONSHIPS = ["New client", "Existing client", "Prospect"]
+DURATIONS = ["1 hour", "1.5 hours", "2 hours"]
+CUISINES = [None, "Japanese", "Italian or French", "Steak", "Mediterranean"]
+DIETS = [None, "Vegetarian", "No shellfish", "Gluten free"]
+
+
+def restaurant_params(rng: random.Random) -> Dict[str, Any]:
+    params: Dict[str, Any] = {
+        "location": rng.choice(LOCATIONS),
+        "term": rng.choice(TERMS),
+        "limit": rng.choice([10, 20, 50]),
+    }
+    price = rng.choice(PRICES)
+    if price:
+        params["price"] = price
+    return params
+
+
+def client_profile(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "clientDesignation": rng.choice(DESIGNATIONS),
+        "meetingPurpose": rng.choice(PURPOSES),
+        "relationshipStatus": rng.choice(RELATIONSHIPS),
+        "location": rng.choice(LOCATIONS),
+        "meetingDuration": rng.choice(DURATIONS),
+        "cuisinePreferences": rng.choice(CUISINES),
+        "dietaryRestrictions": rng.choice(DIETS),
+    }
+
+
+def percentile(ordered: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return None
+    index = min(max(int(round(len(ordered) * q / 100 + 0.5)) - 1, 0), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """Latency percentiles in milliseconds."""
+    ordered = sorted(latencies)
+    summary: Dict[str, Optional[float]] = {
+        f"p{q}": (
+            value * 1000 if (value := percentile(ordered, q)) is not None else None
+        )
+        for q in (50, 95, 99)
+    }
+    summary["mean"] = sum(ordered) / len(ordered) * 1000 if ordered else None
+    summary["max"] = ordered[-1] * 1000 if ordered else None
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class LoadGenerator:
+    """Runs one scenario and collects per-request latency and status."""
+
+    def __init__(self, client: httpx.AsyncClient, scenario: str, keys: int, seed: int):
+        self.client = client
+        self.scenario = scenario
+
+        # A fixed pool of inputs; workers pick from it with their own RNG
+        rng = random.Random(seed)
+        self.searches = [restaurant_params(rng) for _ in range(keys)]
+        self.profiles = [client_profile(rng) for _ in range(keys)]
+        self.seed = seed
+
+        self.latencies: List[float] = []
+        self.step_latencies: Dict[str, List[float]] = {}
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    async def _timed(
+        self, step: str, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await send()
+        except httpx.HTTPError as e:
+            self.statuses[type(e).__name__] += 1
+            return None
+        finally:
+            self.step_latencies.setdefault(step, []).append(time.perf_counter() - start)
+        self.statuses[str(response.status_code)] += 1
+        return response
+
+    async def _search(self, params: Dict[str, Any]) -> Optional[httpx.Response]:
+        return await self._timed(
+            "restaurants", lambda: self.client.get("/api/restaurants", params=params)
+        )
+
+    async def _profile(self, profile: Dict[str, Any]) -> Optional[httpx.Response]:
+        return await self._timed(
+            "client_profile",
+            lambda: self.client.post("/api/client_profile", json=profile),
+        )
+
+    async def one(self, rng: random.Random) -> bool:
+        """Send one scenario iteration; return whether it succeeded."""
+        if self.scenario == "restaurants":
+            response = await self._search(rng.choice(self.searches))
+        elif self.scenario == "client_profile":
+            response = await self._profile(rng.choice(self.profiles))
+        elif self.scenario == "details":
+            response = await self._search(rng.choice(self.searches))
+            if response is not None and response.status_code == 200:
+                ids = [r["id"] for r in response.json()["restaurants"][:DETAILS_TOP_N]]
+                response = await self._timed(
+                    "details",
+                    lambda: self.client.get(
+                        "/api/restaurants/details", params={"ids": ",".join(ids)}
+                    ),
+                )
+        elif self.scenario == "recommendations":
+            response = await self._timed(
+                "recommendations",
+                lambda: self.client.post(
+                    "/api/recommendations", json=rng.choice(self.profiles)
+                ),
+            )
+        else:
+            response = await self._profile(rng.choice(self.profiles))
+            if response is not None and response.status_code == 200:
+                generated = response.json()
+                params = {
+                    "location": generated["location"],
+                    "term": generated["term"],
+                    "limit": 20,
+                }
+                if generated.get("categories"):
+                    params["categories"] = generated["categories"]
+                if generated.get("price"):
+                    params["price"] = generated["price"]
+                response = await self._search(params)
+        return response is not None and response.status_code == 200
+
+    async def run(
+        self, concurrency: int, requests: Optional[int], duration: Optional[float]
+    ) -> Dict[str, Any]:
+        """Drive the scenario and return the summarized results."""
+        remaining = requests
+        deadline = time.perf_counter() + duration if duration else None
+
+        async def worker(index: int) -> None:
+            nonlocal remaining
+            rng = random.Random(f"{self.seed}-{index}")
+            while True:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                start = time.perf_counter()
+                ok = await self.one(rng)
+                self.latencies.append(time.perf_counter() - start)
+                if not ok:
+                    self.errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        completed = len(self.latencies)
+        return {
+            "scenario": self.scenario,
+            "requests": completed,
+            "errors": self.errors,
+            "error_rate": self.errors / completed if completed else 0.0,
+            "elapsed_s": elapsed,
+            "throughput_rps": completed / elapsed if elapsed else 0.0,
+            "latency_ms": summarize(self.latencies),
+            "steps": {
+                step: summarize(latencies)
+                for step, latencies in self.step_latencies.items()
+            },
+            "status_counts": dict(self.statuses),
+        }
+
+
+async def run_scenario(
+    base_url: str,
+    scenario: str,
+    concurrency: int,
+    requests: Optional[int],
+    duration: Optional[float],
+    keys: int,
+    seed: int,
+    timeout: float,
+    warmup: int = 0,
+) -> Dict[str, Any]:
+    """
+    Run one scenario against a running API.
+
+    Args:
+        base_url: Base URL of the API, e.g. ``http://localhost:8000``.
+        scenario: One of ``SCENARIOS``.
+        concurrency: Number of concurrent workers.
+        requests: Number of iterations to send, or None to run for ``duration``.
+        duration: Seconds to run for, or None to stop after ``requests``.
+        keys: Number of distinct inputs in the workload.
+        seed: Seed for the workload.
+        timeout: Per-request timeout in seconds.
+        warmup: Iterations to send (and discard) before measuring.
+
+    Returns:
+        The results, with the configuration and environment they were measured in.
+    """
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+        if warmup:
+            await LoadGenerator(client, scenario, keys, seed).run(
+                concurrency, warmup, None
+            )
+        results = await LoadGenerator(client, scenario, keys, seed).run(
+            concurrency, requests, duration
+        )
+
+    return {
+        **results,
+        "config": {
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "requests": requests,
+            "duration": duration,
+            "keys": keys,
+            "seed": seed,
+            "warmup": warmup,
+            "stub_env": {k: v for k, v in os.environ.items() if k.startswith("STUB_")},
+        },
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+    }
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    latency = results["latency_ms"]
+
+    def ms(value: Optional[float]) -> str:
+        return f"{value:.1f}" if value is not None else "-"
+
+    return (
+        f"{results['scenario']}: {results['requests']} requests in {results['elapsed_s']:.1f}s, "
+        f"{results['throughput_rps']:.1f} req/s, {results['errors']} errors | "
+        f"p50 {ms(latency['p50'])} ms, p95 {ms(latency['p95'])} ms, "
+        f"p99 {ms(latency['p99'])} ms | statuses {results['status_counts']}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("scenario", choices=SCENARIOS)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=None)
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument(
+        "--keys", type=int, default=50, help="distinct inputs in the workload"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.requests is None and args.duration is None:
+        args.requests = 1000
+
+    results = asyncio.run(
+        run_scenario(
+            args.base_url,
+            args.scenario,
+            args.concurrency,
+            args.requests,
+            args.duration,
+            args.keys,
+            args.seed,
+            args.timeout,
+            args.warmup,
+        )
+    )
+    print(format_results(results))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
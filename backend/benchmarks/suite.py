@@ -0,0 +1,181 @@
+"""
+End-to-end benchmark suite against the local stubs.
+
+Starts the Yelp and OpenAI stubs and the API as uvicorn processes, runs
+every load-generator scenario and writes one JSON file per scenario plus a
+``summary.json`` to ``--output-dir``. The API uses a fresh data directory,
+so each run starts with cold caches.
+
+    uv run python -m benchmarks.suite --output-dir results/$(git rev-parse --short HEAD)
+    uv run python -m benchmarks.compare results/<before> results/<after>
+
+Stub latency and errors are configured per upstream with ``--yelp-latency-ms``,
+``--llm-latency-ms`` and ``--error-rate``; ``--replay-dir`` replays Yelp
+captures instead of generating businesses. Any other ``STUB_*`` variable in
+the environment is passed to both stubs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.loadgen import SCENARIOS, format_results, run_scenario
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Start ``app`` with uvicorn on ``port`` in a child process."""
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            app,
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, **env},
+    )
+
+
+def wait_until_ready(
+    url: str, process: subprocess.Popen, timeout: float = 30.0
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"Server for {url} exited with code {process.returncode}"
+            )
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server for {url} did not start within {timeout:g}s")
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--yelp-latency-ms", type=float, default=150)
+    parser.add_argument("--llm-latency-ms", type=float, default=1200)
+    parser.add_argument("--latency-sigma", type=float, default=0.4)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--replay-dir", help="replay Yelp captures from this directory")
+    args = parser.parse_args(argv)
+
+    yelp_port, llm_port, api_port = free_port(), free_port(), free_port()
+    stub_env = {
+        "STUB_LATENCY_SIGMA": str(args.latency_sigma),
+        "STUB_ERROR_RATE": str(args.error_rate),
+    }
+    if args.replay_dir:
+        stub_env["STUB_REPLAY_DIR"] = os.path.abspath(args.replay_dir)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary: Dict[str, Dict] = {}
+
+    with ExitStack() as stack:
+        data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        api_env = {
+            "YELP_API_KEY": "benchmark",
+            "OPENAI_API_KEY": "benchmark",
+            "YELP_API_URL": f"http://127.0.0.1:{yelp_port}/v3",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+            "YELP_CACHE_PATH": os.path.join(data_dir, "cache.sqlite3"),
+            "YELP_RATE_LIMIT_PATH": os.path.join(data_dir, "ratelimit.sqlite3"),
+            "GEOCODE_CACHE_PATH": os.path.join(data_dir, "locations.sqlite3"),
+            "RESTAURANT_STORE_PATH": os.path.join(data_dir, "restaurants.sqlite3"),
+            "YELP_CAPTURE_DIR": os.path.join(data_dir, "captures"),
+            "PREFETCH_STATE_PATH": os.path.join(data_dir, "prefetch.json"),
+            # The load generator is one client; per-client limits would throttle it
+            "ADMISSION_CLIENT_RATE": "0",
+        }
+
+        servers = [
+            (
+                "stubs.yelp_stub:app",
+                yelp_port,
+                {**stub_env, "STUB_LATENCY_MS": str(args.yelp_latency_ms)},
+                f"http://127.0.0.1:{yelp_port}/docs",
+            ),
+            (
+                "stubs.openai_stub:app",
+                llm_port,
+                {**stub_env, "STUB_LATENCY_MS": str(args.llm_latency_ms)},
+                f"http://127.0.0.1:{llm_port}/docs",
+            ),
+            ("main:app", api_port, api_env, f"http://127.0.0.1:{api_port}/api/health"),
+        ]
+        for app, port, env, ready_url in servers:
+            process = start_server(app, port, env)
+            stack.callback(stop, process)
+            wait_until_ready(ready_url, process)
+
+        for scenario in args.scenarios:
+            results = asyncio.run(
+                run_scenario(
+                    f"http://127.0.0.1:{api_port}",
+                    scenario,
+                    args.concurrency,
+                    args.requests,
+                    None,
+                    args.keys,
+                    args.seed,
+                    timeout=120.0,
+                    warmup=args.warmup,
+                )
+            )
+            results["config"]["stub_env"] = {
+                **stub_env,
+                "yelp_latency_ms": args.yelp_latency_ms,
+                "llm_latency_ms": args.llm_latency_ms,
+            }
+            print(format_results(results))
+            with open(os.path.join(args.output_dir, f"{scenario}.json"), "w") as f:
+                json.dump(results, f, indent=2)
+            summary[scenario] = results
+
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
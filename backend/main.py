@@ -1,19 +1,53 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+from app.core.admission import AdmissionMiddleware, admission_controller
 from app.core.config import settings
-from app.api import health, restaurants, client_profile
+from app.core.http_cache import response_encoder
+from app.core.metrics import registry
+from app.core.tracing import RequestContextMiddleware, RequestIdFilter
+from app.api import (
+    categories,
+    client_profile,
+    health,
+    metrics,
+    recommendations,
+    restaurants,
+)
+from app.services.prefetch import prefetch_scheduler
+from app.services.profile_query import profile_query_runner
+from app.services.recommendations import recommendation_pipeline
+from app.services.yelp import yelp_service
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    format="%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s",
 )
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter())
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared upstream clients on startup and close them on shutdown."""
+    settings.check_required()
+    await yelp_service.startup()
+    # LangChain loads in the background so the worker can take traffic sooner
+    profile_query_runner.start_in_background()
+    await prefetch_scheduler.start()
+    try:
+        yield
+    finally:
+        await prefetch_scheduler.shutdown()
+        await profile_query_runner.shutdown()
+        await yelp_service.shutdown()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     # Create FastAPI app
@@ -24,8 +58,13 @@ def create_app() -> FastAPI:
         docs_url="/api/docs",  # Swagger UI location
         redoc_url="/api/redoc",  # ReDoc location
         openapi_url="/api/openapi.json",  # OpenAPI schema
+        lifespan=lifespan,
     )
 
+    # Per-route concurrency limits and per-client rate limits; inside CORS so
+    # that 429 and 503 responses can be read by browsers
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -33,12 +72,27 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Request-ID", "Retry-After"],
     )
 
+    # Request IDs for logs and responses, plus per-route latency histograms
+    app.add_middleware(RequestContextMiddleware)
+
     # Include API routers
     app.include_router(health.router, prefix=settings.API_PREFIX)
     app.include_router(restaurants.router, prefix=settings.API_PREFIX)
     app.include_router(client_profile.router, prefix=settings.API_PREFIX)
+    app.include_router(recommendations.router, prefix=settings.API_PREFIX)
+    app.include_router(categories.router, prefix=settings.API_PREFIX)
+
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router, prefix=settings.API_PREFIX)
+        registry.register_stats("yelp", yelp_service.stats)
+        registry.register_stats("llm", profile_query_runner.stats)
+        registry.register_stats("recommendations", recommendation_pipeline.stats)
+        registry.register_stats("http", response_encoder.stats)
+        registry.register_stats("prefetch", prefetch_scheduler.stats)
+        registry.register_stats("admission", admission_controller.stats)
     return app
 
 
@@ -53,11 +107,15 @@ async def root():
 
 
 if __name__ == "__main__":
-    # Run the application with uvicorn
+    # Run the application with uvicorn; "auto" picks uvloop and httptools when
+    # installed (uvicorn[standard]). The reloader and workers are exclusive.
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        reload=settings.SERVER_RELOAD,
+        workers=None if settings.SERVER_RELOAD else settings.SERVER_WORKERS,
+        loop="auto",
+        http="auto",
         log_level="info",
     )
@@ -0,0 +1,45 @@
+"""
+Latency and error injection shared by the local stubs.
+
+Environment variables (read on every call, so they can be changed between runs):
+    STUB_LATENCY_MS: Median latency added to every response (default: 0).
+    STUB_LATENCY_SIGMA: Spread of a log-normal latency distribution around the
+        median; 0 keeps latency fixed (default: 0).
+    STUB_SLOW_RATE: Fraction of calls delayed by ``STUB_SLOW_MS`` (default: 0).
+    STUB_SLOW_MS: Extra latency of slow calls, e.g. to trip timeouts (default: 5000).
+    STUB_ERROR_RATE: Fraction of calls answered with a 503 (default: 0).
+"""
+
+import asyncio
+import os
+import random
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+
+def sample_latency_ms() -> float:
+    """Draw one response latency from the configured distribution."""
+    latency_ms = float(os.getenv("STUB_LATENCY_MS", "0"))
+    sigma = float(os.getenv("STUB_LATENCY_SIGMA", "0"))
+    if latency_ms and sigma:
+        latency_ms = random.lognormvariate(0, sigma) * latency_ms
+    if random.random() < float(os.getenv("STUB_SLOW_RATE", "0")):
+        latency_ms += float(os.getenv("STUB_SLOW_MS", "5000"))
+    return latency_ms
+
+
+async def inject_faults() -> Optional[JSONResponse]:
+    """
+    Sleep for a sampled latency, then maybe fail.
+
+    Returns:
+        A 503 response to send instead of the real one, or None.
+    """
+    latency_ms = sample_latency_ms()
+    if latency_ms:
+        await asyncio.sleep(latency_ms / 1000)
+
+    if random.random() < float(os.getenv("STUB_ERROR_RATE", "0")):
+        return JSONResponse({"error": {"code": "SERVICE_UNAVAILABLE"}}, status_code=503)
+    return None
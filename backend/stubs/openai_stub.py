@@ -0,0 +1,89 @@
+"""
+Local stub of the OpenAI ``chat/completions`` endpoint with canned structured outputs.
+
+Run it next to the API and point ``OPENAI_BASE_URL`` at it:
+
+    uv run uvicorn stubs.openai_stub:app --port 8002
+    OPENAI_BASE_URL=http://localhost:8002/v1 uv run main.py
+
+Each request gets one of ``CANNED_PARAMS``, picked by hashing the prompt, so
+the same profile always produces the same search parameters. Latency and
+errors are injected as described in ``stubs.faults``; a realistic LLM
+setting is ``STUB_LATENCY_MS=1200 STUB_LATENCY_SIGMA=0.4``.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+
+from stubs.faults import inject_faults
+
+app = FastAPI(title="OpenAI stub")
+
+# Structured outputs in the shape of ``ClientProfileRestaurantSearchParams``
+CANNED_PARAMS: List[Dict[str, Any]] = [
+    {
+        "location": "Toronto, ON",
+        "term": "upscale quiet business dinner",
+        "categories": ["newamerican", "french", "steak"],
+        "price": "3,4",
+    },
+    {
+        "location": "Toronto, ON",
+        "term": "business lunch",
+        "categories": ["italian", "mediterranean", "seafood"],
+        "price": "2,3",
+    },
+    {
+        "location": "Toronto, ON",
+        "term": "client breakfast meeting",
+        "categories": ["breakfast_brunch", "cafes"],
+        "price": "2,3",
+    },
+    {
+        "location": "Toronto, ON",
+        "term": "omakase private dining",
+        "categories": ["japanese", "sushi"],
+        "price": "4",
+    },
+    {
+        "location": "Toronto, ON",
+        "term": "vegetarian friendly restaurant",
+        "categories": ["vegetarian", "vegan", "mediterranean"],
+        "price": "2,3",
+    },
+]
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request) -> Dict[str, Any]:
+    fault = await inject_faults()
+    if fault is not None:
+        return fault
+
+    body = await request.json()
+    prompt = json.dumps(body.get("messages", []), sort_keys=True)
+    digest = int(hashlib.sha1(prompt.encode()).hexdigest()[:8], 16)
+    content = json.dumps(CANNED_PARAMS[digest % len(CANNED_PARAMS)])
+
+    return {
+        "id": f"chatcmpl-stub-{digest:08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        },
+    }
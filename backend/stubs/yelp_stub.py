@@ -0,0 +1,309 @@
+"""
+Local stub of the Yelp Fusion ``businesses/search``, ``businesses/{id}`` and
+``businesses/{id}/reviews`` endpoints.
+
+Run it next to the API and point ``YELP_API_URL`` at it:
+
+    uv run uvicorn stubs.yelp_stub:app --port 8001
+    YELP_API_URL=http://localhost:8001/v3 uv run main.py
+
+Responses are generated deterministically, or replayed from Yelp responses
+recorded with ``YELP_CAPTURE_ENABLED`` when ``STUB_REPLAY_DIR`` is set: a
+search with the same parameters as a recording gets that recording, any
+other search gets a recording picked by hashing its parameters.
+
+Latency and errors are injected as described in ``stubs.faults``. Other
+environment variables:
+    STUB_TOTAL: Total number of businesses the stub pretends to have (default: 240);
+        details and reviews are served for the IDs of these businesses.
+    STUB_REPLAY_DIR: Directory of ``search-*.json.gz`` captures to replay.
+    STUB_DAILY_LIMIT: If set, report Yelp's ``RateLimit-*`` quota headers and
+        answer 429 once this many calls have been made.
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from stubs.faults import inject_faults
+
+app = FastAPI(title="Yelp Fusion stub")
+
+TORONTO_CENTER = (43.6532, -79.3832)
+
+# Calls made so far, for the simulated daily quota
+_calls = 0
+
+CATEGORIES = [
+    ("italian", "Italian"),
+    ("japanese", "Japanese"),
+    ("sushi", "Sushi Bars"),
+    ("steak", "Steakhouses"),
+    ("seafood", "Seafood"),
+    ("french", "French"),
+    ("modern_european", "Modern European"),
+    ("vegetarian", "Vegetarian"),
+    ("mediterranean", "Mediterranean"),
+    ("wine_bars", "Wine Bars"),
+]
+
+
+def _make_business(index: int, center: tuple) -> Dict[str, Any]:
+    """Build a deterministic, Yelp-shaped business payload."""
+    digest = hashlib.sha1(str(index).encode()).hexdigest()
+    alias, title = CATEGORIES[index % len(CATEGORIES)]
+    latitude = center[0] + ((int(digest[:4], 16) / 0xFFFF) - 0.5) * 0.02
+    longitude = center[1] + ((int(digest[4:8], 16) / 0xFFFF) - 0.5) * 0.02
+
+    return {
+        "id": f"stub-{digest[:16]}",
+        "alias": f"stub-restaurant-{index}-toronto",
+        "name": f"Stub Restaurant {index}",
+        "image_url": f"https://example.com/images/{index}.jpg",
+        "is_closed": False,
+        "url": f"https://www.yelp.com/biz/stub-restaurant-{index}-toronto",
+        "review_count": 10 + int(digest[8:11], 16) % 900,
+        "categories": [{"alias": alias, "title": title}],
+        "rating": 3.0 + (int(digest[11:12], 16) % 5) / 2,
+        "coordinates": {"latitude": latitude, "longitude": longitude},
+        "transactions": ["restaurant_reservation"] if index % 3 == 0 else [],
+        "price": "$" * (1 + index % 4),
+        "location": {
+            "address1": f"{100 + index} King St W",
+            "address2": None,
+            "address3": "",
+            "city": "Toronto",
+            "zip_code": "M5H 1A1",
+            "country": "CA",
+            "state": "ON",
+            "display_address": [f"{100 + index} King St W", "Toronto, ON M5H 1A1"],
+        },
+        "phone": "+14165550100",
+        "display_phone": "(416) 555-0100",
+        "distance": float(int(digest[12:15], 16) % 2000),
+    }
+
+
+def _make_details(index: int) -> Dict[str, Any]:
+    """Build the ``businesses/{id}`` payload: the business plus photos and hours."""
+    business = _make_business(index, TORONTO_CENTER)
+    business.pop("distance")
+    opens = 1100 + 100 * (index % 3)
+    return {
+        **business,
+        "photos": [f"https://example.com/images/{index}-{n}.jpg" for n in range(3)],
+        "hours": [
+            {
+                "open": [
+                    {
+                        "is_overnight": False,
+                        "start": f"{opens:04d}",
+                        "end": "2300",
+                        "day": day,
+                    }
+                    for day in range(7)
+                    if day != index % 7
+                ],
+                "hours_type": "REGULAR",
+                "is_open_now": True,
+            }
+        ],
+    }
+
+
+def _make_reviews(index: int, limit: int) -> Dict[str, Any]:
+    """Build the ``businesses/{id}/reviews`` payload."""
+    business = _make_business(index, TORONTO_CENTER)
+    reviews = [
+        {
+            "id": f"review-{index}-{n}",
+            "url": f"{business['url']}?hrid=review-{index}-{n}",
+            "text": f"Review {n} of {business['name']}: quiet enough for a client lunch.",
+            "rating": max(1, min(5, round(business["rating"]) - n % 2)),
+            "time_created": f"2025-0{1 + n % 9}-1{n % 10} 12:00:00",
+            "user": {
+                "id": f"user-{index}-{n}",
+                "profile_url": f"https://www.yelp.com/user_details?userid=user-{index}-{n}",
+                "image_url": None,
+                "name": f"Reviewer {n}.",
+            },
+        }
+        for n in range(min(limit, 3))
+    ]
+    return {
+        "reviews": reviews,
+        "total": business["review_count"],
+        "possible_languages": ["en"],
+    }
+
+
+@lru_cache(maxsize=4)
+def _index_by_id(total: int) -> Dict[str, int]:
+    """Map the IDs of the generated businesses back to their index."""
+    return {
+        _make_business(index, TORONTO_CENTER)["id"]: index for index in range(total)
+    }
+
+
+def _business_index(business_id: str) -> Optional[int]:
+    return _index_by_id(int(os.getenv("STUB_TOTAL", "240"))).get(business_id)
+
+
+def _count_call(response: Response) -> Optional[JSONResponse]:
+    """Count a call against ``STUB_DAILY_LIMIT``; the 429 to return once it is spent."""
+    global _calls
+
+    daily_limit = os.getenv("STUB_DAILY_LIMIT")
+    if not daily_limit:
+        return None
+
+    _calls += 1
+    remaining = max(int(daily_limit) - _calls, 0)
+    reset = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    headers = {
+        "RateLimit-DailyLimit": daily_limit,
+        "RateLimit-Remaining": str(remaining),
+        "RateLimit-ResetTime": reset.isoformat(),
+    }
+    if _calls > int(daily_limit):
+        return JSONResponse(
+            {"error": {"code": "ACCESS_LIMIT_REACHED"}},
+            status_code=429,
+            headers=headers,
+        )
+    response.headers.update(headers)
+    return None
+
+
+def _not_found(business_id: str) -> JSONResponse:
+    return JSONResponse(
+        {
+            "error": {
+                "code": "BUSINESS_NOT_FOUND",
+                "description": f"{business_id} not found",
+            }
+        },
+        status_code=404,
+    )
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    """Canonical form of search parameters for matching recordings."""
+    # Recorded params keep their types; query strings encode booleans in lowercase
+    return json.dumps(
+        {
+            key: str(value).lower() if isinstance(value, bool) else str(value)
+            for key, value in params.items()
+        },
+        sort_keys=True,
+    )
+
+
+@lru_cache(maxsize=4)
+def _load_recordings(
+    directory: str,
+) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """Load captured searches, indexed by their parameters."""
+    by_params: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(glob.glob(os.path.join(directory, "search-*.json.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            capture = json.load(f)
+        by_params[_params_key(capture["params"])] = capture["response"]
+    return by_params, list(by_params.values())
+
+
+def _replay(directory: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the recorded response for a search, if any recordings exist."""
+    by_params, recordings = _load_recordings(directory)
+    if not recordings:
+        return None
+    key = _params_key(params)
+    if key in by_params:
+        return by_params[key]
+    digest = int(hashlib.sha1(key.encode()).hexdigest()[:8], 16)
+    return recordings[digest % len(recordings)]
+
+
+@app.get("/v3/businesses/search")
+async def search(
+    request: Request,
+    response: Response,
+    latitude: Optional[float] = Query(None),
+    longitude: Optional[float] = Query(None),
+    limit: int = Query(20),
+    offset: int = Query(0),
+) -> Dict[str, Any]:
+    fault = await inject_faults()
+    if fault is not None:
+        return fault
+
+    limited = _count_call(response)
+    if limited is not None:
+        return limited
+
+    replay_dir = os.getenv("STUB_REPLAY_DIR")
+    if replay_dir:
+        recorded = _replay(replay_dir, dict(request.query_params))
+        if recorded is not None:
+            return {**recorded, "businesses": recorded.get("businesses", [])[:limit]}
+
+    total = int(os.getenv("STUB_TOTAL", "240"))
+    center = (
+        (latitude, longitude)
+        if latitude is not None and longitude is not None
+        else TORONTO_CENTER
+    )
+    businesses: List[Dict[str, Any]] = [
+        _make_business(index, center)
+        for index in range(offset, min(offset + limit, total))
+    ]
+
+    return {
+        "businesses": businesses,
+        "total": total,
+        "region": {"center": {"latitude": center[0], "longitude": center[1]}},
+    }
+
+
+@app.get("/v3/businesses/{business_id}/reviews")
+async def reviews(
+    business_id: str, response: Response, limit: int = Query(3)
+) -> Dict[str, Any]:
+    fault = await inject_faults()
+    if fault is not None:
+        return fault
+
+    limited = _count_call(response)
+    if limited is not None:
+        return limited
+
+    index = _business_index(business_id)
+    if index is None:
+        return _not_found(business_id)
+    return _make_reviews(index, limit)
+
+
+@app.get("/v3/businesses/{business_id}")
+async def details(business_id: str, response: Response) -> Dict[str, Any]:
+    fault = await inject_faults()
+    if fault is not None:
+        return fault
+
+    limited = _count_call(response)
+    if limited is not None:
+        return limited
+
+    index = _business_index(business_id)
+    if index is None:
+        return _not_found(business_id)
+    return _make_details(index)
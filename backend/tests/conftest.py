@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# Settings are read when the app is imported, so configure them first: no real
+# credentials, and every on-disk store in a throwaway directory
+_data_dir = tempfile.mkdtemp(prefix="backend-tests-")
+
+os.environ.setdefault("YELP_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["YELP_CACHE_BACKEND"] = "memory"
+os.environ["YELP_RATE_LIMIT_BACKEND"] = "memory"
+os.environ["YELP_CAPTURE_ENABLED"] = "false"
+os.environ["GEOCODE_CACHE_PATH"] = os.path.join(_data_dir, "locations.sqlite3")
+os.environ["RESTAURANT_STORE_PATH"] = os.path.join(_data_dir, "restaurants.sqlite3")
+os.environ["YELP_CAPTURE_DIR"] = os.path.join(_data_dir, "captures")
+os.environ["PREFETCH_STATE_PATH"] = os.path.join(_data_dir, "prefetch.json")
@@ -0,0 +1,117 @@
+import asyncio
+import httpx
+from app.core.admission import AdmissionController, AdmissionMiddleware
+
+
+def make_app(controller: AdmissionController, release: asyncio.Event = None):
+    async def app(scope, receive, send):
+        if release is not None and scope["path"] == "/api/slow":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return AdmissionMiddleware(app, controller=controller)
+
+
+def client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://api"
+    )
+
+
+def statuses(controller: AdmissionController, requests) -> list:
+    async def main():
+        async with client(make_app(controller)) as http:
+            return [
+                (await http.get(path, headers=headers)).status_code
+                for path, headers in requests
+            ]
+
+    return asyncio.run(main())
+
+
+def test_client_limits_are_opt_in():
+    controller = AdmissionController(api_keys=("known",))
+
+    assert controller.clients is None
+    assert statuses(controller, [("/api/x", {"X-API-Key": "known"})] * 50) == (
+        [200] * 50
+    )
+
+
+def test_only_known_api_keys_identify_a_client():
+    controller = AdmissionController(
+        client_rate=0.001, client_burst=2, api_keys=("known",)
+    )
+
+    made_up = [("/api/x", {"X-API-Key": f"random-{i}"}) for i in range(10)]
+    assert statuses(controller, made_up) == [200] * 10
+    assert controller.stats()["clients"]["clients"] == 0
+
+    known = [("/api/x", {"X-API-Key": "known"})] * 3
+    assert statuses(controller, known) == [200, 200, 429]
+
+
+def test_unidentified_clients_share_no_bucket():
+    controller = AdmissionController(client_rate=0.001, client_burst=1)
+
+    # Every user behind the frontend proxy arrives from the same socket address
+    assert statuses(controller, [("/api/x", {})] * 5) == [200] * 5
+
+
+def test_trusted_proxy_address_is_the_last_forwarded_one():
+    controller = AdmissionController(
+        client_rate=0.001, client_burst=1, trust_forwarded=True
+    )
+
+    spoofed = [
+        ("/api/x", {"X-Forwarded-For": f"10.0.0.{i}, 203.0.113.7"}) for i in range(3)
+    ]
+    assert statuses(controller, spoofed) == [200, 429, 429]
+    assert statuses(controller, [("/api/x", {"X-Forwarded-For": "198.51.100.1"})]) == [
+        200
+    ]
+
+
+def test_rejected_by_the_route_gives_the_client_token_back():
+    controller = AdmissionController(
+        route_limits=[("/api/slow", 1, 0)],
+        client_rate=0.001,
+        client_burst=2,
+        api_keys=("known",),
+    )
+    headers = {"X-API-Key": "known"}
+
+    async def main():
+        release = asyncio.Event()
+        async with client(make_app(controller, release)) as http:
+            first = asyncio.create_task(http.get("/api/slow", headers=headers))
+            while controller.route_for("/api/slow").in_flight == 0:
+                await asyncio.sleep(0.01)
+            second = await http.get("/api/slow", headers=headers)
+            release.set()
+            first = await first
+            third = await http.get("/api/slow", headers=headers)
+            return first.status_code, second, third.status_code
+
+    first, second, third = asyncio.run(main())
+    assert first == 200
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == "1"
+    assert third == 200
+
+
+def test_queued_requests_are_admitted_in_order():
+    controller = AdmissionController(route_limits=[("/api/slow", 1, 4)])
+
+    async def main():
+        release = asyncio.Event()
+        async with client(make_app(controller, release)) as http:
+            tasks = [asyncio.create_task(http.get("/api/slow")) for _ in range(3)]
+            while controller.route_for("/api/slow").stats()["queue_depth"] < 2:
+                await asyncio.sleep(0.01)
+            release.set()
+            return [(await task).status_code for task in tasks]
+
+    assert asyncio.run(main()) == [200, 200, 200]
+    assert controller.route_for("/api/slow").stats()["in_flight"] == 0
@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+import json
+import httpx
+import pytest
+from app.core.tracing import RequestContextMiddleware, get_request_id
+from app.services.capture import ResponseCapture
+
+
+def test_captures_of_one_request_do_not_overwrite_each_other(tmp_path):
+    capture = ResponseCapture(
+        enabled=True, sample_rate=1.0, directory=str(tmp_path), max_files=10
+    )
+
+    async def main():
+        await capture.start()
+        for page in range(3):
+            assert capture.submit("search", {"page": page}, request_id="req-1")
+        await capture.stop()
+
+    asyncio.run(main())
+
+    files = sorted(tmp_path.glob("search-*-req-1-*.json.gz"))
+    assert len(files) == 3
+    pages = set()
+    for path in files:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            pages.add(json.load(f)["page"])
+    assert pages == {0, 1, 2}
+
+
+def test_oldest_captures_are_rotated_out(tmp_path):
+    capture = ResponseCapture(
+        enabled=True, sample_rate=1.0, directory=str(tmp_path), max_files=2
+    )
+
+    async def main():
+        await capture.start()
+        for page in range(5):
+            capture.submit("search", {"page": page})
+        await capture.stop()
+
+    asyncio.run(main())
+
+    assert len(list(tmp_path.glob("*.json.gz"))) == 2
+    assert capture.stats()["captured"] == 5
+
+
+@pytest.mark.parametrize(
+    "hostile_id", ["../../etc/passwd", "a/b", "id\tforged log", "x" * 65, ""]
+)
+def test_unsafe_request_ids_are_replaced(tmp_path, hostile_id):
+    capture = ResponseCapture(
+        enabled=True, sample_rate=1.0, directory=str(tmp_path), max_files=10
+    )
+
+    async def app(scope, receive, send):
+        capture.submit("search", {"ok": True}, request_id=get_request_id())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def main():
+        await capture.start()
+        transport = httpx.ASGITransport(app=RequestContextMiddleware(app))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            response = await client.get("/", headers={"X-Request-ID": hostile_id})
+        await capture.stop()
+        return response
+
+    response = asyncio.run(main())
+
+    request_id = response.headers["x-request-id"]
+    assert request_id != hostile_id
+    assert len(request_id) == 32 and request_id.isalnum()
+    assert capture.stats()["errors"] == 0
+    assert len(list(tmp_path.glob(f"search-*-{request_id}-*.json.gz"))) == 1
+
+
+def test_safe_request_ids_are_kept():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def main():
+        transport = httpx.ASGITransport(app=RequestContextMiddleware(app))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            return await client.get("/", headers={"X-Request-ID": "req-1.a_B"})
+
+    assert asyncio.run(main()).headers["x-request-id"] == "req-1.a_B"
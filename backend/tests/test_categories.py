@@ -0,0 +1,146 @@
+import asyncio
+import json
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.api import categories
+from app.models.yelp_categories import (
+    CATEGORIES_PATH,
+    DEFAULT_SHORTLIST,
+    PrefixTrie,
+    get_category_index,
+    get_yelp_categories,
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return get_category_index()
+
+
+def test_prefix_trie_finds_every_key_under_a_prefix():
+    trie = PrefixTrie([("ramen", 1), ("raw food", 2), ("italian", 3), ("ramen", 1)])
+
+    assert list(trie.find("ra")) == [1, 2]
+    assert list(trie.find("ram")) == [1]
+    assert list(trie.find("")) == [3, 1, 2]
+    assert list(trie.find("sushi")) == []
+
+
+def test_autocomplete_puts_title_prefixes_first(index):
+    matches = index.autocomplete("food", limit=20)
+
+    # "Food Court" starts with the prefix; "Fast Food" only has a word that does
+    assert matches[:2] == ["food_court", "foodstands"]
+    assert "hotdogs" in matches
+    assert index.autocomplete("food", limit=2) == matches[:2]
+
+
+def test_autocomplete_matches_aliases_and_ignores_case(index):
+    assert index.autocomplete("indp") == ["indpak"]
+    assert index.autocomplete("  ITAL") == ["italian"]
+    assert index.autocomplete("-") == []
+    assert index.autocomplete("zzzz") == []
+
+
+def test_synonyms_and_titles_are_matched_in_free_text(index):
+    matches = index.match("a steakhouse with oysters, no pork, plant-based")
+
+    assert matches == ["steak", "seafood", "halal", "vegan", "vegetarian"]
+
+
+def test_ambiguous_words_do_not_match(index):
+    assert index.match("live music and chips") == []
+
+
+def test_expand_adds_sub_categories_and_keeps_unknown_aliases(index):
+    expanded = index.expand(["japanese", "bogus"])
+
+    assert {"japanese", "ramen", "izakaya", "bogus"} <= expanded
+    assert "italian" not in expanded
+
+
+def test_shortlist_starts_with_mentions_then_children_then_defaults(index):
+    shortlist = index.shortlist("japanese please", size=12)
+
+    assert shortlist[0] == "japanese"
+    children = sorted(index.children("japanese"))
+    assert shortlist[1 : 1 + len(children)] == children
+    assert (
+        shortlist[1 + len(children) :]
+        == list(DEFAULT_SHORTLIST)[: 12 - 1 - len(children)]
+    )
+    assert index.shortlist("", size=3) == list(DEFAULT_SHORTLIST[:3])
+
+
+def test_validate_resolves_titles_and_drops_unknown_and_duplicates(index):
+    assert index.validate(
+        ["Italian", "bogus", "restaurants", "italian", "Sushi Bars"]
+    ) == [
+        "italian",
+        "sushi",
+    ]
+
+
+def test_yelp_categories_are_restaurants_and_its_children_by_title():
+    with open(CATEGORIES_PATH) as f:
+        raw = json.load(f)["categories"]
+    expected = [
+        category["alias"]
+        for category in sorted(
+            (
+                category
+                for category in raw
+                if "restaurants" in category["parent_aliases"]
+                or category["alias"] == "restaurants"
+            ),
+            key=lambda category: category["title"],
+        )
+    ]
+
+    categories = get_yelp_categories()
+
+    # A tuple, so callers share the cached value without being able to change it
+    assert isinstance(categories, tuple)
+    assert list(categories) == expected
+
+
+def get(path: str, **params) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(categories.router)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            return await client.get(path, params=params)
+
+    return asyncio.run(main())
+
+
+def test_category_list_endpoint():
+    response = get("/categories")
+
+    assert response.status_code == 200
+    body = response.json()["categories"]
+    assert [category["alias"] for category in body] == list(get_yelp_categories())
+    assert "etag" in response.headers
+
+
+def test_autocomplete_endpoint():
+    body = get("/categories/autocomplete", q="Ital", limit=5).json()
+
+    assert body["categories"][0] == {
+        "alias": "italian",
+        "title": "Italian",
+        "parents": ["restaurants"],
+    }
+
+
+def test_expand_endpoint_reports_unknown_aliases():
+    body = get("/categories/expand", categories="Japanese, bogus").json()
+
+    assert body["categories"] == ["japanese"]
+    assert "ramen" in body["expanded"]
+    assert body["unknown"] == ["bogus"]
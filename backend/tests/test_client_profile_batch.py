@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from app.api import client_profile
+from app.models.client_profile import (
+    ClientProfileParams,
+    ClientProfileRestaurantSearchParams,
+)
+from app.services.resilience import UpstreamUnavailable
+
+
+def profile(location: str) -> ClientProfileParams:
+    return ClientProfileParams(
+        clientDesignation="CFO",
+        meetingPurpose="Business lunch",
+        relationshipStatus="Existing client",
+        location=location,
+        meetingDuration="1 hour",
+    )
+
+
+async def generate(profile: ClientProfileParams) -> ClientProfileRestaurantSearchParams:
+    if profile.location == "LLM down":
+        raise UpstreamUnavailable("OpenAI circuit is open", 5.0)
+    return ClientProfileRestaurantSearchParams(
+        location=profile.location, term="lunch", categories=[], price=None
+    )
+
+
+async def search(params):
+    if params.location == "Yelp down":
+        raise UpstreamUnavailable("Yelp rate limit reached", 1.0)
+    return {"businesses": [], "total": 0, "region": None}
+
+
+@pytest.fixture(autouse=True)
+def stub_upstreams(monkeypatch):
+    monkeypatch.setattr(client_profile, "generate_restaurant_search_params", generate)
+    monkeypatch.setattr(client_profile.yelp_service, "search_restaurants", search)
+
+
+def collect(events) -> list:
+    async def main():
+        return [event async for event in events]
+
+    return asyncio.run(main())
+
+
+def test_batch_reports_each_profile_and_shares_identical_ones():
+    profiles = [profile("Toronto"), profile("LLM down"), profile("Toronto")]
+
+    events = collect(client_profile._batch_profile_events(profiles, limit=5))
+
+    by_index = {}
+    for event in events[:-1]:
+        by_index.setdefault(event["index"], []).append(event["type"])
+    assert by_index == {0: ["params", "result"], 1: ["error"], 2: ["params", "result"]}
+    assert events[-1] == {"type": "summary", "profiles": 3, "unique": 2, "errors": 1}
+
+
+def test_batch_search_errors_carry_retry_after():
+    events = collect(client_profile._batch_profile_events([profile("Yelp down")], 5))
+
+    assert events[1]["type"] == "error"
+    assert events[1]["stage"] == "searching"
+    assert events[1]["retry_after"] == 1.0
+
+
+def test_batch_reports_params_that_cannot_become_a_search(monkeypatch):
+    def invalid(self, **overrides):
+        raise ValueError("invalid price level")
+
+    monkeypatch.setattr(
+        ClientProfileRestaurantSearchParams, "to_search_params", invalid
+    )
+
+    events = collect(client_profile._batch_profile_events([profile("Toronto")], 5))
+
+    assert [event["type"] for event in events] == ["params", "error", "summary"]
+    assert events[1]["detail"] == "invalid price level"
+    assert events[2]["errors"] == 1
@@ -0,0 +1,24 @@
+import os
+from app.core.config import BASE_DIR, _env_path, settings
+
+
+def test_relative_paths_resolve_against_the_backend_directory(monkeypatch):
+    monkeypatch.delenv("SOME_PATH", raising=False)
+    assert _env_path("SOME_PATH", "data/x.sqlite3") == str(BASE_DIR / "data/x.sqlite3")
+
+    monkeypatch.setenv("SOME_PATH", "other/y.sqlite3")
+    monkeypatch.chdir("/")
+    assert _env_path("SOME_PATH", "data/x.sqlite3") == str(BASE_DIR / "other/y.sqlite3")
+
+
+def test_absolute_and_empty_paths_are_kept(monkeypatch, tmp_path):
+    monkeypatch.setenv("SOME_PATH", str(tmp_path / "z.json"))
+    assert _env_path("SOME_PATH", "data/x.json") == str(tmp_path / "z.json")
+
+    monkeypatch.setenv("SOME_PATH", "")
+    assert _env_path("SOME_PATH", "data/x.json") == ""
+
+
+def test_base_dir_is_the_backend_directory():
+    assert (BASE_DIR / "app" / "core" / "config.py").is_file()
+    assert os.path.isabs(settings.YELP_RATE_LIMIT_PATH)
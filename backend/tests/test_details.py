@@ -0,0 +1,184 @@
+import asyncio
+from typing import List
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.api import restaurants
+from app.services.resilience import UpstreamGuard, UpstreamUnavailable
+from app.services.yelp import BusinessNotFound, YelpService
+from stubs import yelp_stub
+
+KNOWN = {"a": 0, "b": 1, "c": 2}
+
+
+class Yelp:
+    """A mock Yelp that knows businesses ``a``-``c`` and can be made to fail."""
+
+    def __init__(self):
+        self.calls: List[str] = []
+        self.down = False
+        self.failing_reviews = set()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/v3/businesses/")
+        self.calls.append(path)
+        business_id, _, kind = path.partition("/")
+        if self.down or business_id == "broken":
+            return httpx.Response(500)
+        if business_id not in KNOWN:
+            return httpx.Response(404, json={"error": {"code": "BUSINESS_NOT_FOUND"}})
+        index = KNOWN[business_id]
+        if kind == "reviews":
+            if business_id in self.failing_reviews:
+                return httpx.Response(500)
+            return httpx.Response(200, json=yelp_stub._make_reviews(index, 3))
+        return httpx.Response(
+            200, json={**yelp_stub._make_details(index), "id": business_id}
+        )
+
+
+@pytest.fixture
+def upstream() -> Yelp:
+    return Yelp()
+
+
+def make_yelp(upstream: Yelp) -> YelpService:
+    yelp = YelpService(
+        api_key="test",
+        base_url="http://stub/v3",
+        transport=httpx.MockTransport(upstream),
+    )
+    yelp.limiter = None
+    yelp.guard = UpstreamGuard("Yelp", budget=1, attempts=1, failure_threshold=100)
+    return yelp
+
+
+def details_many(yelp: YelpService, batches, reviews: bool = False):
+    async def main():
+        try:
+            return [
+                await yelp.get_details_many(ids, reviews=reviews) for ids in batches
+            ]
+        finally:
+            await yelp.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_only_uncached_businesses_are_fetched(upstream):
+    yelp = make_yelp(upstream)
+
+    _, results = details_many(yelp, [["a"], ["b", "a", "b", "c"]])
+
+    assert [business_id for business_id, _ in results] == ["b", "a", "c"]
+    assert [result["id"] for _, result in results] == ["b", "a", "c"]
+    assert upstream.calls == ["a", "b", "c"]
+
+
+def test_cached_businesses_are_served_while_yelp_fails(upstream):
+    yelp = make_yelp(upstream)
+
+    async def main():
+        try:
+            await yelp.get_details_many(["a"])
+            upstream.down = True
+            return await yelp.get_details_many(["a", "b"])
+        finally:
+            await yelp.shutdown()
+
+    (_, cached), (_, failed) = asyncio.run(main())
+
+    assert cached["id"] == "a"
+    assert isinstance(failed, Exception)
+
+
+def test_each_business_fails_on_its_own(upstream):
+    yelp = make_yelp(upstream)
+    upstream.failing_reviews.add("b")
+
+    [results] = details_many(yelp, [["a", "unknown", "b", "broken"]], reviews=True)
+    by_id = dict(results)
+
+    assert len(by_id["a"]["reviews"]) == 3
+    assert isinstance(by_id["unknown"], BusinessNotFound)
+    # Only the reviews failed: the business is kept without them
+    assert by_id["b"]["id"] == "b" and by_id["b"]["reviews"] is None
+    assert isinstance(by_id["broken"], Exception)
+    assert not isinstance(by_id["broken"], BusinessNotFound)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """The details endpoint with ``get_details_many`` answering from ``results``."""
+    results = {}
+
+    async def get_details_many(business_ids, reviews=False):
+        return [
+            (business_id, results[business_id])
+            for business_id in dict.fromkeys(business_ids)
+        ]
+
+    monkeypatch.setattr(restaurants.yelp_service, "get_details_many", get_details_many)
+    app = FastAPI()
+    app.include_router(restaurants.router)
+
+    def get(ids: str) -> httpx.Response:
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://t"
+            ) as client:
+                return await client.get("/restaurants/details", params={"ids": ids})
+
+        return asyncio.run(main())
+
+    return results, get
+
+
+def test_endpoint_lists_failed_businesses_under_errors(api):
+    results, get = api
+    results.update(
+        {
+            "a": {**yelp_stub._make_details(0), "reviews": None},
+            "unknown": BusinessNotFound("Business 'unknown' not found"),
+            "busy": UpstreamUnavailable("Yelp rate limit reached", 2.0),
+        }
+    )
+
+    response = get("a, unknown,a,busy")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["restaurants"]) == 1
+    assert body["errors"] == [
+        {"id": "unknown", "detail": "Business 'unknown' not found"},
+        {"id": "busy", "detail": "Yelp rate limit reached", "retry_after": 2.0},
+    ]
+    # Partial results are not cached downstream
+    assert response.headers["cache-control"] == "public, no-cache"
+
+
+def test_endpoint_is_unavailable_when_no_business_could_be_fetched(api):
+    results, get = api
+    results["busy"] = UpstreamUnavailable("Yelp rate limit reached", 2.0)
+
+    response = get("busy")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
+
+
+def test_endpoint_reports_unknown_ids_without_a_503(api):
+    results, get = api
+    results["unknown"] = BusinessNotFound("Business 'unknown' not found")
+
+    response = get("unknown")
+
+    assert response.status_code == 200
+    assert response.json()["restaurants"] == []
+
+
+def test_endpoint_requires_ids(api):
+    _, get = api
+
+    assert get(" , ").status_code == 400
@@ -0,0 +1,170 @@
+import gzip
+from typing import Dict
+import pytest
+from starlette.requests import Request
+from app.api.restaurants import search_cache_control
+from app.core import http_cache
+from app.core.http_cache import (
+    ResponseEncoder,
+    cache_control,
+    content_etag,
+    negotiate_encoding,
+)
+from app.models.restaurants import RestaurantSearchParams
+
+BODY = b'{"businesses": [' + b'{"name": "Restaurant"},' * 100 + b"{}]}"
+
+needs_brotli = pytest.mark.skipif(
+    http_cache.brotli is None, reason="brotli is not installed"
+)
+
+
+def request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/restaurants",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+@pytest.fixture
+def encoder() -> ResponseEncoder:
+    return ResponseEncoder(min_size=100)
+
+
+def test_etag_is_weak_and_stable_across_codings(encoder):
+    plain = encoder.respond(request(), BODY)
+    compressed = encoder.respond(request(accept_encoding="gzip"), BODY)
+
+    assert plain.headers["etag"].startswith('W/"')
+    assert plain.headers["etag"] == compressed.headers["etag"] == content_etag(BODY)
+    assert content_etag(BODY + b" ") != content_etag(BODY)
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        content_etag(BODY),
+        content_etag(BODY).removeprefix("W/"),
+        f'"other", {content_etag(BODY)}',
+        "*",
+    ],
+)
+def test_matching_if_none_match_gets_an_empty_304(encoder, if_none_match):
+    response = encoder.respond(
+        request(if_none_match=if_none_match), BODY, cache_control(60)
+    )
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == content_etag(BODY)
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert encoder.stats()["not_modified"] == 1
+
+
+def test_other_etags_get_the_body(encoder):
+    response = encoder.respond(request(if_none_match='W/"other"'), BODY)
+
+    assert response.status_code == 200
+    assert response.body == BODY
+
+
+def test_untagged_responses_ignore_if_none_match(encoder):
+    response = encoder.respond(request(if_none_match="*"), BODY, etag=False)
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+@needs_brotli
+@pytest.mark.parametrize(
+    "accept_encoding, coding",
+    [
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0.1", "gzip"),
+        ("*", "br"),
+        ("*;q=0.2, br;q=0", "gzip"),
+        ("gzip;q=0, br;q=0", None),
+        ("identity", None),
+        ("deflate", None),
+        ("gzip;q=bad, br;q=0", None),
+    ],
+)
+def test_negotiates_the_best_accepted_coding(accept_encoding, coding):
+    assert negotiate_encoding(request(accept_encoding=accept_encoding)) == coding
+
+
+def test_without_brotli_gzip_is_used(monkeypatch):
+    monkeypatch.delitem(http_cache.COMPRESSORS, "br", raising=False)
+
+    assert negotiate_encoding(request(accept_encoding="br, gzip")) == "gzip"
+    assert negotiate_encoding(request(accept_encoding="br")) is None
+    assert negotiate_encoding(request()) is None
+
+
+def headers_for(encoder: ResponseEncoder, **headers: str) -> Dict[str, str]:
+    return dict(encoder.respond(request(**headers), BODY).headers)
+
+
+def test_gzip_bodies_decode_to_the_original(encoder):
+    response = encoder.respond(request(accept_encoding="gzip"), BODY)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.body) == BODY
+
+
+@needs_brotli
+def test_brotli_bodies_decode_to_the_original(encoder):
+    response = encoder.respond(request(accept_encoding="br"), BODY)
+
+    assert response.headers["content-encoding"] == "br"
+    assert http_cache.brotli.decompress(response.body) == BODY
+
+
+def test_identity_and_small_bodies_are_sent_as_is(encoder):
+    assert "content-encoding" not in headers_for(encoder)
+    small = encoder.respond(request(accept_encoding="gzip"), b"{}")
+
+    assert "content-encoding" not in small.headers
+    assert small.body == b"{}"
+    assert small.headers["vary"] == "Accept-Encoding"
+
+
+def test_compressed_bodies_are_reused_per_etag_and_coding(encoder):
+    for _ in range(3):
+        encoder.respond(request(accept_encoding="gzip"), BODY)
+
+    stats = encoder.stats()
+    assert stats["compressed"] == 3
+    assert stats["compression_hits"] == 2
+    assert stats["compression_entries"] == 1
+
+
+def test_compression_can_be_turned_off():
+    encoder = ResponseEncoder(enabled=False, min_size=100)
+
+    assert "content-encoding" not in headers_for(encoder, accept_encoding="gzip")
+
+
+def test_cache_control_values():
+    assert cache_control(0) == "public, no-cache"
+    assert cache_control(60) == "public, max-age=60"
+    assert cache_control(60, 300) == "public, max-age=60, stale-while-revalidate=300"
+
+
+def test_open_now_searches_are_always_revalidated():
+    params = RestaurantSearchParams(location="Toronto")
+
+    assert search_cache_control(params.model_copy(update={"open_now": True})) == (
+        "public, no-cache"
+    )
+    assert search_cache_control(params).startswith("public, max-age=")
@@ -0,0 +1,103 @@
+import asyncio
+import httpx
+from app.models.restaurants import RestaurantSearchParams
+from app.services.prefetch import PrefetchScheduler
+from app.services.rate_limit import (
+    MemoryTokenBucket,
+    Priority,
+    QuotaTracker,
+    RateLimiter,
+)
+from app.services.yelp import YelpService, search_cache_key
+
+
+RESPONSE = {"total": 100}
+
+
+def make_yelp() -> YelpService:
+    yelp = YelpService(
+        api_key="test",
+        base_url="http://stub/v3",
+        transport=httpx.MockTransport(lambda request: httpx.Response(500)),
+    )
+    yelp.limiter = RateLimiter(
+        MemoryTokenBucket(rate=1, capacity=1),
+        QuotaTracker(reserve=0.1),
+        max_wait=1.0,
+        name="Yelp",
+    )
+    return yelp
+
+
+def search(location: str) -> RestaurantSearchParams:
+    return RestaurantSearchParams(location=location, term="lunch")
+
+
+def count(scheduler: PrefetchScheduler, params: RestaurantSearchParams) -> float:
+    return sum(scheduler.hot[search_cache_key(params)].hours)
+
+
+def test_workers_add_their_counts_to_the_saved_state(tmp_path):
+    state_path = str(tmp_path / "prefetch.json")
+    yelp = make_yelp()
+    first = PrefetchScheduler(yelp, state_path=state_path)
+    second = PrefetchScheduler(yelp, state_path=state_path)
+    for _ in range(3):
+        first.observe(search("Toronto"), RESPONSE)
+    second.observe(search("Toronto"), RESPONSE)
+    second.observe(search("Ottawa"), RESPONSE)
+
+    first._save()
+    second._save()
+
+    loaded = PrefetchScheduler(yelp, state_path=state_path)
+    loaded._load()
+    assert round(count(loaded, search("Toronto")), 3) == 4
+    assert round(count(loaded, search("Ottawa")), 3) == 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_saved_counts_are_not_added_twice(tmp_path):
+    state_path = str(tmp_path / "prefetch.json")
+    yelp = make_yelp()
+    scheduler = PrefetchScheduler(yelp, state_path=state_path)
+    scheduler.observe(search("Toronto"), RESPONSE)
+    scheduler._save()
+
+    restarted = PrefetchScheduler(yelp, state_path=state_path)
+    restarted._load()
+    restarted.observe(search("Toronto"), RESPONSE)
+    restarted._save()
+    restarted._save()
+
+    loaded = PrefetchScheduler(yelp, state_path=state_path)
+    loaded._load()
+    assert round(count(loaded, search("Toronto")), 3) == 2
+
+
+def test_follow_ups_are_not_queued_while_calls_wait_for_tokens():
+    async def main():
+        yelp = make_yelp()
+        scheduler = PrefetchScheduler(yelp, next_page=True)
+        scheduler.observe(search("Ottawa"), RESPONSE)
+        queued = scheduler.stats()["queued"]
+        await yelp.limiter.acquire()
+        waiting = asyncio.create_task(yelp.limiter.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        try:
+            saturated = yelp.limiter.saturated()
+            scheduler.observe(search("Toronto"), RESPONSE)
+            return queued, saturated, scheduler.stats()
+        finally:
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            await yelp.shutdown()
+
+    queued, saturated, stats = asyncio.run(main())
+
+    assert queued == 1
+    assert saturated
+    assert stats["observed"] == 2
+    assert stats["skipped"] == 1
+    assert stats["queued"] == queued
+    assert stats["hot_searches"] == 2
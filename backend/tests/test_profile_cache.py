@@ -0,0 +1,92 @@
+from app.models.client_profile import (
+    ClientProfileParams,
+    ClientProfileRestaurantSearchParams,
+)
+from app.services.profile_cache import (
+    ProfileCache,
+    cosine_similarity,
+    embed_text,
+    polarity_clauses,
+)
+
+GENERATED = ClientProfileRestaurantSearchParams(
+    location="Boston, MA", term="business lunch", categories=["sushi"], price="2,3"
+)
+
+
+def profile(notes: str, **overrides) -> ClientProfileParams:
+    fields = {
+        "clientDesignation": "CFO",
+        "meetingPurpose": "Business lunch",
+        "relationshipStatus": "Existing client",
+        "location": "Boston, MA",
+        "meetingDuration": "1 hour",
+        "additionalNotes": notes,
+    }
+    fields.update(overrides)
+    return ClientProfileParams(**fields)
+
+
+def similarity_cache() -> ProfileCache:
+    return ProfileCache(ttl=60, max_entries=16, similarity_enabled=True, threshold=0.9)
+
+
+def test_similarity_tier_is_off_by_default():
+    cache = ProfileCache(ttl=60, max_entries=16)
+    cache.set(profile("Client prefers a quiet place near the office"), GENERATED)
+
+    assert cache.get(profile("Client prefers a quiet place near the office.")) is None
+    assert cache.get(profile("client prefers a  quiet place near the office")) == (
+        GENERATED
+    )
+
+
+def test_reworded_notes_hit_the_similarity_tier():
+    cache = similarity_cache()
+    cache.set(profile("Client prefers a quiet place near the office"), GENERATED)
+
+    assert cache.get(profile("Client prefers a quiet place near the office.")) == (
+        GENERATED
+    )
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_a_negation_is_never_a_similarity_hit():
+    cache = similarity_cache()
+    cache.set(profile("client is vegetarian"), GENERATED)
+
+    assert cache.get(profile("client is not vegetarian")) is None
+    assert cache.get(profile("client isn't vegetarian")) is None
+
+
+def test_swapped_preferences_are_never_a_similarity_hit():
+    cache = similarity_cache()
+    cache.set(profile("loves sushi, avoid steakhouses"), GENERATED)
+
+    assert cache.get(profile("loves steakhouses, avoid sushi")) is None
+
+
+def test_structured_fields_must_match_exactly():
+    cache = similarity_cache()
+    cache.set(profile("quiet place"), GENERATED)
+
+    assert cache.get(profile("quiet place", location="Cambridge, MA")) is None
+
+
+def test_bigrams_separate_reordered_words():
+    same_words = cosine_similarity(
+        embed_text("loves sushi avoid steakhouses"),
+        embed_text("loves steakhouses avoid sushi"),
+    )
+    assert same_words < 0.9
+
+
+def test_polarity_clauses():
+    assert polarity_clauses("Loves sushi, avoid steakhouses.") == (
+        ("avoid", ("steakhouses",)),
+        ("loves", ("sushi",)),
+    )
+    assert polarity_clauses("don't book a steakhouse") == (
+        ("not", ("a", "book", "steakhouse")),
+    )
+    assert polarity_clauses("client is vegetarian") == ()
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.services import profile_query
+from app.services.profile_query import ProfileQueryRunner
+
+
+def test_startup_builds_the_chain_once_for_concurrent_callers(monkeypatch):
+    builds = []
+
+    def build_chain(http_client, model):
+        builds.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(profile_query, "_build_chain", build_chain)
+
+    async def main():
+        runner = ProfileQueryRunner(model="test")
+        await asyncio.gather(*(runner.startup() for _ in range(5)))
+        chain = runner._chain
+        await runner.startup()
+        assert runner._chain is chain
+        await runner.shutdown()
+
+    asyncio.run(main())
+    assert len(builds) == 1
+
+
+def test_failed_startup_is_retried_by_the_next_call(monkeypatch):
+    calls = []
+
+    def build_chain(http_client, model):
+        calls.append(model)
+        if len(calls) == 1:
+            raise RuntimeError("langchain unavailable")
+        return object()
+
+    monkeypatch.setattr(profile_query, "_build_chain", build_chain)
+
+    async def main():
+        runner = ProfileQueryRunner(model="test")
+        with pytest.raises(RuntimeError):
+            await runner.startup()
+        await runner.startup()
+        assert runner._chain is not None
+        await runner.shutdown()
+
+    asyncio.run(main())
+    assert len(calls) == 2
@@ -0,0 +1,142 @@
+import asyncio
+from typing import Any, Dict, List
+import pytest
+from app.api import restaurants
+from app.core.config import settings
+from app.models.restaurants import RestaurantSearchParams
+from app.services.ranking import Ranker, RankingWeights
+
+
+def business(business_id: str, **fields) -> Dict[str, Any]:
+    return {
+        "id": business_id,
+        "rating": 4.0,
+        "review_count": 100,
+        "distance": 1000.0,
+        "price": "$$",
+        "categories": [{"alias": "italian"}],
+    } | fields
+
+
+def ids(businesses: List[Dict[str, Any]]) -> List[str]:
+    return [b["id"] for b in businesses]
+
+
+@pytest.fixture
+def ranker() -> Ranker:
+    return Ranker(RankingWeights())
+
+
+def search(**fields) -> RestaurantSearchParams:
+    return RestaurantSearchParams(location="Toronto", **fields)
+
+
+def test_higher_scores_rank_first(ranker):
+    businesses = [
+        business("low", rating=3.0, review_count=5),
+        business("high", rating=5.0, review_count=900),
+        business("mid", rating=4.0),
+    ]
+
+    assert ids(ranker.rank(businesses, search())) == ["high", "mid", "low"]
+
+
+def test_requested_categories_and_prices_outrank_others(ranker):
+    businesses = [
+        business("steak", categories=[{"alias": "steak"}], price="$$$$"),
+        business("ramen", categories=[{"alias": "ramen"}], price="$$"),
+    ]
+
+    ranked = ranker.rank(businesses, search(categories="japanese", price="2"))
+
+    assert ids(ranked) == ["ramen", "steak"]
+
+
+def test_closer_businesses_win_within_the_radius(ranker):
+    businesses = [business("far", distance=900.0), business("near", distance=100.0)]
+
+    assert ids(ranker.rank(businesses, search(radius=1000))) == ["near", "far"]
+
+
+def test_ties_keep_yelp_order(ranker):
+    businesses = [business(str(index)) for index in range(5)]
+
+    assert ids(ranker.rank(businesses, search())) == ["0", "1", "2", "3", "4"]
+
+
+def test_missing_and_null_fields_are_neutral(ranker):
+    businesses = [
+        business("nulls", rating=None, distance=None, price=None, categories=None),
+        {"id": "empty"},
+        business("full", rating=5.0),
+    ]
+
+    ranked = ranker.rank(businesses, search(price="2", categories="italian"))
+
+    assert ids(ranked)[0] == "full"
+    assert sorted(ids(ranked)) == ["empty", "full", "nulls"]
+
+
+def test_reservable_businesses_open_at_the_time_rank_first(ranker):
+    hours = [{"open": [{"day": 0, "start": "1100", "end": "1500"}]}]
+    businesses = [
+        business(
+            "closed",
+            business_hours=[{"open": [{"day": 0, "start": "1700", "end": "2200"}]}],
+        ),
+        business("open", business_hours=hours, transactions=["restaurant_reservation"]),
+    ]
+
+    # 2026-10-19 is a Monday
+    ranked = ranker.rank(
+        businesses, search(reservation_date="2026-10-19", reservation_time="12:00")
+    )
+
+    assert ids(ranked) == ["open", "closed"]
+
+
+def ranked_search(monkeypatch, params: RestaurantSearchParams, available: int):
+    """Rank ``params`` over a pool of which Yelp has ``available`` results."""
+    pools = []
+
+    async def search_pool(pool_params, size):
+        pools.append((pool_params, size))
+        count = min(size, available)
+        # Yelp's order is the reverse of the ranking: b0 rates lowest
+        return {
+            "businesses": [
+                business(f"b{index}", rating=1.0 + index * 0.01)
+                for index in range(count)
+            ],
+            "total": available,
+        }
+
+    monkeypatch.setattr(restaurants.yelp_service, "search_pool", search_pool)
+    data = asyncio.run(restaurants._ranked_search(params))
+    return data, pools
+
+
+def test_ranked_pages_are_cut_from_the_ranked_pool(monkeypatch):
+    size = settings.RANKING_POOL_SIZE
+    data, pools = ranked_search(monkeypatch, search(offset=10, limit=5), size)
+
+    assert pools[0][0].offset == 0
+    assert pools[0][1] == size
+    assert ids(data["businesses"]) == [f"b{size - 11 - i}" for i in range(5)]
+    assert data["total"] == size
+
+
+def test_offsets_past_the_pool_grow_it(monkeypatch):
+    size = settings.RANKING_POOL_SIZE
+    data, pools = ranked_search(monkeypatch, search(offset=size + 10, limit=5), 240)
+
+    assert pools[0][1] == size + 15
+    # The pool is ranked as a whole, so the page is its last five
+    assert ids(data["businesses"]) == [f"b{4 - i}" for i in range(5)]
+
+
+def test_offsets_past_yelps_results_return_an_empty_page(monkeypatch):
+    data, _ = ranked_search(monkeypatch, search(offset=30, limit=5), 20)
+
+    assert data["businesses"] == []
+    assert data["total"] == 20
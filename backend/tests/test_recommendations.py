@@ -0,0 +1,172 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+import pytest
+from app.models.client_profile import (
+    ClientProfileParams,
+    ClientProfileRestaurantSearchParams,
+)
+from app.models.restaurants import RestaurantSearchParams
+from app.services import recommendations
+from app.services.recommendations import RecommendationPipeline
+
+
+def profile(location: str = "Toronto") -> ClientProfileParams:
+    return ClientProfileParams(
+        clientDesignation="CFO",
+        meetingPurpose="Business lunch",
+        relationshipStatus="Existing client",
+        location=location,
+        meetingDuration="1 hour",
+    )
+
+
+def generated(
+    location: str = "Toronto", **fields
+) -> ClientProfileRestaurantSearchParams:
+    return ClientProfileRestaurantSearchParams(
+        **{"location": location, "term": "lunch", "categories": [], "price": None}
+        | fields
+    )
+
+
+def business(index: int, alias: str) -> Dict[str, Any]:
+    return {
+        "id": f"b{index}",
+        "price": "$$",
+        "categories": [{"alias": alias, "title": alias}],
+    }
+
+
+class FakeYelp:
+    """Answers the speculative search and records which searches were made."""
+
+    def __init__(self, speculative: Optional[Exception] = None):
+        self.speculative = speculative
+        self.searches: List[RestaurantSearchParams] = []
+        self.pools: List[RestaurantSearchParams] = []
+
+    async def search_restaurants(self, params: RestaurantSearchParams):
+        self.searches.append(params)
+        await asyncio.sleep(0)
+        if self.speculative is not None:
+            raise self.speculative
+        return {
+            "businesses": [
+                business(i, "italian" if i % 2 else "sushi") for i in range(10)
+            ],
+            "total": 240,
+            "region": None,
+        }
+
+    async def search_pool(self, params: RestaurantSearchParams, size: int):
+        self.pools.append(params)
+        return {"businesses": [business(100, "steak")], "total": 7, "region": None}
+
+
+class KeepOrder:
+    def rank(self, businesses, params):
+        return list(businesses)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """The profile cache and LLM, answering with ``llm.cached`` or ``llm.params``."""
+
+    class LLM:
+        cached: Optional[ClientProfileRestaurantSearchParams] = None
+        params = generated()
+        calls = 0
+
+    def cached(profile):
+        return LLM.cached
+
+    async def generate(profile):
+        LLM.calls += 1
+        await asyncio.sleep(0.01)
+        return LLM.params
+
+    monkeypatch.setattr(recommendations, "cached_restaurant_search_params", cached)
+    monkeypatch.setattr(
+        recommendations, "generate_uncached_restaurant_search_params", generate
+    )
+    return LLM
+
+
+def recommend(pipeline: RecommendationPipeline, limit: int = 3):
+    return asyncio.run(pipeline.recommend(profile(), limit))
+
+
+def test_cached_profiles_skip_the_speculative_search(llm):
+    llm.cached = generated(categories=["italian"])
+    yelp = FakeYelp()
+    pipeline = RecommendationPipeline(yelp, KeepOrder())
+
+    params, data, outcome = recommend(pipeline)
+
+    assert outcome == "skipped"
+    assert params == llm.cached
+    assert llm.calls == 0
+    assert yelp.searches == []
+    assert len(yelp.pools) == 1
+    assert pipeline.stats()["prefetch_skipped"] == 1
+
+
+def test_speculative_search_answers_when_enough_businesses_match(llm):
+    llm.params = generated(categories=["italian"], price="2")
+    yelp = FakeYelp()
+    pipeline = RecommendationPipeline(yelp, KeepOrder())
+
+    _, data, outcome = recommend(pipeline)
+
+    assert outcome == "hit"
+    assert yelp.pools == []
+    assert [b["id"] for b in data["businesses"]] == ["b1", "b3", "b5"]
+    # Yelp's total, not the size of the filtered page
+    assert data["total"] == 240
+    assert pipeline.stats()["prefetch_hits"] == 1
+
+
+def test_exact_search_runs_when_too_few_businesses_match(llm):
+    llm.params = generated(categories=["italian"])
+    yelp = FakeYelp()
+    pipeline = RecommendationPipeline(yelp, KeepOrder())
+
+    _, data, outcome = recommend(pipeline, limit=6)
+
+    assert outcome == "miss"
+    assert [params.categories for params in yelp.pools] == ["italian"]
+    assert data["total"] == 7
+    assert pipeline.stats()["prefetch_misses"] == 1
+
+
+def test_exact_search_runs_for_another_location(llm):
+    llm.params = generated(location="Ottawa")
+    yelp = FakeYelp()
+    pipeline = RecommendationPipeline(yelp, KeepOrder())
+
+    _, _, outcome = recommend(pipeline)
+
+    assert outcome == "miss"
+    assert [params.location for params in yelp.pools] == ["Ottawa"]
+
+
+def test_failed_speculative_search_falls_back_to_the_exact_search(llm):
+    yelp = FakeYelp(speculative=RuntimeError("Yelp returned 500"))
+    pipeline = RecommendationPipeline(yelp, KeepOrder())
+
+    _, data, outcome = recommend(pipeline)
+
+    assert outcome == "miss"
+    assert data["total"] == 7
+    assert pipeline.stats()["prefetch_errors"] == 1
+
+
+def test_no_speculative_search_when_prefetch_is_disabled(llm):
+    yelp = FakeYelp()
+    pipeline = RecommendationPipeline(yelp, KeepOrder(), prefetch=False)
+
+    _, _, outcome = recommend(pipeline)
+
+    assert outcome == "skipped"
+    assert llm.calls == 1
+    assert yelp.searches == []
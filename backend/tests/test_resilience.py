@@ -0,0 +1,199 @@
+import asyncio
+import random
+from typing import List, Tuple
+import pytest
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamGuard,
+    UpstreamUnavailable,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class MaxJitter(random.Random):
+    """Always waits the longest the jitter allows, and records the ranges."""
+
+    def __init__(self):
+        super().__init__()
+        self.ranges: List[Tuple[float, float]] = []
+
+    def uniform(self, a: float, b: float) -> float:
+        self.ranges.append((a, b))
+        return b
+
+
+class Transient(Exception):
+    pass
+
+
+def make_guard(**options) -> UpstreamGuard:
+    return UpstreamGuard(
+        "Upstream", **{"budget": 1.0, "is_transient": lambda e: True} | options
+    )
+
+
+def failing(calls: List[int]):
+    async def fn():
+        calls.append(1)
+        raise Transient("503")
+
+    return fn
+
+
+async def succeed():
+    return "ok"
+
+
+def test_breaker_opens_goes_half_open_and_closes():
+    clock = Clock()
+    guard = make_guard(attempts=1, failure_threshold=2, reset_timeout=30, clock=clock)
+    calls: List[int] = []
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(Transient):
+                await guard.call(failing(calls))
+        assert guard.breaker.state == CircuitBreaker.OPEN
+
+        # Open: fails fast without calling, saying when to come back
+        clock.now += 10
+        with pytest.raises(CircuitOpenError) as error:
+            await guard.call(failing(calls))
+        assert error.value.retry_after == 20
+        assert len(calls) == 2
+
+        # Half-open: one trial call; failing it opens the circuit again
+        clock.now += 20
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(Transient):
+            await guard.call(failing(calls))
+        assert guard.breaker.state == CircuitBreaker.OPEN
+
+        # A successful trial closes it
+        clock.now += 30
+        assert await guard.call(succeed) == "ok"
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(main())
+
+    stats = guard.stats()
+    assert stats["circuit_trips"] == 2
+    assert stats["circuit_rejections"] == 1
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    clock = Clock()
+    breaker = CircuitBreaker("Upstream", 1, 30, clock)
+    breaker.record_failure()
+    clock.now += 30
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+
+
+def test_retries_use_full_jitter_exponential_backoff():
+    rng = MaxJitter()
+    guard = make_guard(attempts=4, base_delay=0.01, max_delay=0.03, rng=rng)
+    calls: List[int] = []
+
+    with pytest.raises(Transient):
+        asyncio.run(guard.call(failing(calls)))
+
+    assert len(calls) == 4
+    assert rng.ranges == [(0, 0.01), (0, 0.02), (0, 0.03), (0, 0.03)]
+    assert guard.retries == 3
+
+
+def test_retries_stop_when_the_budget_would_run_out():
+    # Backoffs of 0.04s and then 0.08s: the second would end past the budget
+    guard = make_guard(
+        budget=0.1, attempts=5, base_delay=0.04, max_delay=1.0, rng=MaxJitter()
+    )
+    calls: List[int] = []
+
+    with pytest.raises(Transient):
+        asyncio.run(guard.call(failing(calls)))
+
+    assert len(calls) == 2
+    assert guard.retries == 1
+    assert guard.failures == 1
+
+
+def test_calls_past_the_budget_fail_as_unavailable():
+    guard = make_guard(budget=0.05, attempts=1)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(guard.call(hang))
+
+    assert guard.timeouts == 1
+
+
+def test_non_transient_errors_are_not_retried_or_counted():
+    guard = make_guard(attempts=3, is_transient=lambda e: False)
+    calls: List[int] = []
+
+    with pytest.raises(Transient):
+        asyncio.run(guard.call(failing(calls)))
+
+    assert len(calls) == 1
+    assert guard.failures == 0
+    assert guard.breaker.failures == 0
+
+
+def test_slow_calls_are_hedged_and_the_loser_cancelled():
+    guard = make_guard(hedge=True, hedge_min_samples=1)
+    guard.latency.record(0.01)
+    started: List[int] = []
+    cancelled: List[int] = []
+
+    async def fn():
+        index = len(started)
+        started.append(index)
+        try:
+            # The first copy is stuck; the hedge answers at once
+            await asyncio.sleep(10 if index == 0 else 0)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return index
+
+    async def main():
+        result = await guard.call(fn)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == 1
+    assert started == [0, 1]
+    assert cancelled == [0]
+    assert guard.hedges == 1
+
+
+def test_non_idempotent_calls_are_not_hedged_or_retried():
+    guard = make_guard(hedge=True, hedge_min_samples=1, attempts=3)
+    guard.latency.record(0.001)
+    calls: List[int] = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise Transient("503")
+
+    with pytest.raises(Transient):
+        asyncio.run(guard.call(fn, idempotent=False))
+
+    assert len(calls) == 1
+    assert guard.hedges == 0
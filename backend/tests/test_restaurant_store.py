@@ -0,0 +1,113 @@
+import asyncio
+import httpx
+import pytest
+from app.models.restaurants import RestaurantSearchParams
+from app.services.resilience import UpstreamGuard, UpstreamUnavailable
+from app.services.restaurant_store import RestaurantStore
+from app.services.yelp import YelpService
+
+CENTER = (43.6532, -79.3832)
+
+
+def business(index: int, alias: str) -> dict:
+    return {
+        "id": f"b{index}",
+        "name": f"Restaurant {index}",
+        "rating": 4.0,
+        "review_count": 10 + index,
+        "price": "$$",
+        "categories": [{"alias": alias, "title": alias}],
+        "coordinates": {
+            "latitude": CENTER[0] + index * 0.0001,
+            "longitude": CENTER[1],
+        },
+        "distance": index * 11.0,
+    }
+
+
+def yelp_response() -> dict:
+    return {
+        "businesses": [business(i, "ramen" if i % 2 else "italian") for i in range(10)],
+        "total": 10,
+        "region": {"center": {"latitude": CENTER[0], "longitude": CENTER[1]}},
+    }
+
+
+def nearby(**fields) -> RestaurantSearchParams:
+    return RestaurantSearchParams(
+        **{"latitude": CENTER[0], "longitude": CENTER[1], "radius": 200, "limit": 3}
+        | fields
+    )
+
+
+@pytest.fixture
+def store(tmp_path) -> RestaurantStore:
+    store = RestaurantStore(
+        path=str(tmp_path / "restaurants.sqlite3"),
+        max_age=3600,
+        max_radius=5000,
+        default_radius=1000,
+    )
+    store.upsert(yelp_response(), nearby(limit=20))
+    return store
+
+
+def test_category_filters_match_sub_categories(store):
+    data = store.query(nearby(categories="japanese"))
+
+    assert data is not None
+    assert {b["categories"][0]["alias"] for b in data["businesses"]} == {"ramen"}
+
+
+@pytest.mark.parametrize("price", ["$$", "2-3", "two", "²"])
+def test_price_levels_other_than_1_to_4_are_ignored(store, price):
+    data = store.query(nearby(price=price))
+
+    assert data is not None
+    assert data["total"] == 10
+
+
+def test_valid_price_levels_still_filter(store):
+    assert store.query(nearby(price="2, $$"))["total"] == 10
+    assert store.query(nearby(price="1,4")) is None
+
+
+def test_store_answers_only_while_yelp_is_unavailable(store):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) > 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json=yelp_response())
+
+    async def main():
+        yelp = YelpService(
+            api_key="test",
+            base_url="http://stub/v3",
+            transport=httpx.MockTransport(handler),
+        )
+        yelp.cache = None
+        yelp.limiter = None
+        yelp.store = store
+        yelp.guard = UpstreamGuard("Yelp", budget=1, attempts=1, failure_threshold=1)
+        try:
+            # Covered area, but Yelp is up: Yelp answers
+            first = await yelp.search_restaurants(nearby())
+            # Yelp fails and its circuit opens
+            with pytest.raises(Exception, match="503"):
+                await yelp.search_restaurants(nearby())
+            # Yelp cannot be called: the store answers
+            second = await yelp.search_restaurants(nearby(sort_by="distance"))
+            # The store cannot answer a term search
+            with pytest.raises(UpstreamUnavailable):
+                await yelp.search_restaurants(nearby(term="ramen"))
+            return first, second
+        finally:
+            await yelp.shutdown()
+
+    first, second = asyncio.run(main())
+
+    assert first == yelp_response()
+    assert [b["id"] for b in second["businesses"]] == ["b0", "b1", "b2"]
+    assert store.stats()["local_hits"] == 1
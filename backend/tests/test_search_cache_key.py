@@ -0,0 +1,57 @@
+from app.models.restaurants import RestaurantSearchParams, SortBy
+from app.services.geocoding import ResolvedLocation, normalize_location
+from app.services.yelp import search_cache_key, with_distances_from
+
+
+def test_normalize_location_keeps_word_order():
+    assert normalize_location("100 1st Ave") != normalize_location("1 100th Ave")
+    assert normalize_location("Downtown Toronto, Ontario") == "downtown toronto on"
+    assert normalize_location("near the  Main Street") == "main st"
+
+
+def test_location_spellings_share_a_key():
+    assert search_cache_key(
+        RestaurantSearchParams(location="King Street West, Toronto", term="Sushi")
+    ) == search_cache_key(
+        RestaurantSearchParams(location="king st w toronto", term="sushi ")
+    )
+
+
+def test_reordered_addresses_do_not_share_a_key():
+    assert search_cache_key(
+        RestaurantSearchParams(location="100 1st Ave")
+    ) != search_cache_key(RestaurantSearchParams(location="1 100th Ave"))
+
+
+def test_region_key_replaces_the_location_unless_results_depend_on_distance():
+    a = RestaurantSearchParams(location="100 1st Ave")
+    b = RestaurantSearchParams(location="102 1st Ave")
+    assert search_cache_key(a, "dpz83r") == search_cache_key(b, "dpz83r")
+
+    for update in ({"sort_by": SortBy.DISTANCE}, {"radius": 500}):
+        assert search_cache_key(a.model_copy(update=update), "dpz83r") != (
+            search_cache_key(b.model_copy(update=update), "dpz83r")
+        )
+
+
+def test_region_hits_are_measured_from_the_searched_location():
+    data = {
+        "businesses": [
+            {
+                "id": "a",
+                "distance": 10.0,
+                "coordinates": {"latitude": 43.65, "longitude": -79.38},
+            },
+            {"id": "b", "distance": 20.0, "coordinates": None},
+        ],
+        "region": {"center": {"latitude": 43.65, "longitude": -79.38}},
+    }
+
+    same = ResolvedLocation(43.65, -79.38, "dpz83r")
+    assert with_distances_from(data, same) is data
+
+    elsewhere = ResolvedLocation(43.651, -79.38, "dpz83r")
+    moved = with_distances_from(data, elsewhere)
+    assert 100 < moved["businesses"][0]["distance"] < 120
+    assert moved["businesses"][1]["distance"] == 20.0
+    assert data["businesses"][0]["distance"] == 10.0
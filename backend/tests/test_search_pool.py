@@ -0,0 +1,66 @@
+import asyncio
+from typing import List
+import httpx
+import pytest
+from app.core.config import settings
+from app.models.restaurants import RestaurantSearchParams
+from app.services.yelp import YelpService
+
+
+def make_yelp(handler) -> YelpService:
+    yelp = YelpService(
+        api_key="test",
+        base_url="http://stub/v3",
+        transport=httpx.MockTransport(handler),
+    )
+    yelp.cache = None
+    yelp.limiter = None
+    return yelp
+
+
+def pool(yelp: YelpService, params: RestaurantSearchParams, size: int):
+    async def main():
+        try:
+            return await yelp.search_pool(params, size)
+        finally:
+            await yelp.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_pool_past_yelps_results_is_empty_without_calling_yelp():
+    offsets: List[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        offsets.append(request.url.params["offset"])
+        return httpx.Response(500)
+
+    params = RestaurantSearchParams(
+        location="Toronto", offset=settings.YELP_MAX_RESULTS
+    )
+
+    assert pool(make_yelp(handler), params, 20) == {"businesses": [], "total": 0}
+    assert offsets == []
+
+
+def test_pages_are_merged_in_order_without_duplicates():
+    def handler(request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params["offset"])
+        # The second page repeats the last business of the first
+        ids = range(max(offset - 1, 0), offset + int(request.url.params["limit"]))
+        return httpx.Response(
+            200, json={"businesses": [{"id": f"b{i}"} for i in ids], "total": 100}
+        )
+
+    data = pool(make_yelp(handler), RestaurantSearchParams(location="Toronto"), 60)
+
+    assert [b["id"] for b in data["businesses"]] == [f"b{i}" for i in range(60)]
+    assert data["total"] == 100
+
+
+def test_pool_fails_only_when_every_page_does():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, json={"error": {"code": "VALIDATION_ERROR"}})
+
+    with pytest.raises(Exception, match="400"):
+        pool(make_yelp(handler), RestaurantSearchParams(location="Toronto"), 60)
@@ -0,0 +1,169 @@
+import asyncio
+import pytest
+from app.api import client_profile, restaurants
+from app.models.client_profile import (
+    ClientProfileParams,
+    ClientProfileRestaurantSearchParams,
+)
+from app.models.restaurants import RestaurantSearchParams
+from app.services.resilience import UpstreamUnavailable
+
+BUSINESS = {
+    "id": "b1",
+    "name": "Restaurant 1",
+    "rating": 4.5,
+    "review_count": 12,
+    "categories": [],
+    "coordinates": {"latitude": 43.65, "longitude": -79.38},
+    "location": {"display_address": []},
+}
+
+
+def test_search_stream_starts_before_yelp_answers(monkeypatch):
+    async def main():
+        release = asyncio.Event()
+
+        async def search(params):
+            await release.wait()
+            return {"businesses": [BUSINESS], "total": 1, "region": None}
+
+        monkeypatch.setattr(restaurants.yelp_service, "search_restaurants", search)
+        monkeypatch.setattr(restaurants.prefetch_scheduler, "enabled", False)
+
+        events = restaurants._search_events(
+            RestaurantSearchParams(location="Toronto"), rank=False
+        )
+        first = await asyncio.wait_for(events.__anext__(), timeout=1)
+        release.set()
+        return first, [event async for event in events]
+
+    first, rest = asyncio.run(main())
+
+    assert first == {"type": "progress", "stage": "searching"}
+    assert [event["type"] for event in rest] == ["search", "restaurant", "done"]
+    assert rest[1]["restaurant"]["id"] == "b1"
+
+
+def test_search_stream_ends_with_an_error_event(monkeypatch):
+    async def search(params):
+        raise UpstreamUnavailable("Yelp circuit is open", 30.0)
+
+    monkeypatch.setattr(restaurants.yelp_service, "search_restaurants", search)
+
+    async def main():
+        events = restaurants._search_events(
+            RestaurantSearchParams(location="Toronto"), rank=False
+        )
+        return [event async for event in events]
+
+    events = asyncio.run(main())
+
+    assert events[-1] == {
+        "type": "error",
+        "stage": "searching",
+        "detail": "Yelp circuit is open",
+        "retry_after": 30.0,
+    }
+
+
+PROFILE = ClientProfileParams(
+    clientDesignation="CFO",
+    meetingPurpose="Business lunch",
+    relationshipStatus="Existing client",
+    location="Toronto",
+    meetingDuration="1 hour",
+)
+
+
+def profile_events(profile: ClientProfileParams) -> list:
+    async def main():
+        events = client_profile._profile_search_events(profile, limit=5)
+        return [event async for event in events]
+
+    return asyncio.run(main())
+
+
+async def generate(profile):
+    return ClientProfileRestaurantSearchParams(
+        location="Toronto", term="lunch", categories=[], price=None
+    )
+
+
+def test_profile_stream_sends_params_then_restaurants(monkeypatch):
+    async def search(params):
+        return {"businesses": [BUSINESS], "total": 1, "region": None}
+
+    monkeypatch.setattr(client_profile, "generate_restaurant_search_params", generate)
+    monkeypatch.setattr(client_profile.yelp_service, "search_restaurants", search)
+
+    events = profile_events(PROFILE)
+
+    assert [event["type"] for event in events] == [
+        "progress",
+        "params",
+        "progress",
+        "search",
+        "restaurant",
+        "done",
+    ]
+
+
+def test_profile_stream_generation_errors_carry_retry_after(monkeypatch):
+    async def unavailable(profile):
+        raise UpstreamUnavailable("OpenAI circuit is open", 12.0)
+
+    monkeypatch.setattr(
+        client_profile, "generate_restaurant_search_params", unavailable
+    )
+
+    events = profile_events(PROFILE)
+
+    assert events[-1] == {
+        "type": "error",
+        "stage": "generating_params",
+        "detail": "OpenAI circuit is open",
+        "retry_after": 12.0,
+    }
+
+
+@pytest.mark.parametrize(
+    "error, retry_after",
+    [
+        (UpstreamUnavailable("Yelp rate limit reached", 1.0), 1.0),
+        (RuntimeError("boom"), None),
+    ],
+)
+def test_profile_stream_search_errors_match_the_other_streams(
+    monkeypatch, error, retry_after
+):
+    async def search(params):
+        raise error
+
+    monkeypatch.setattr(client_profile, "generate_restaurant_search_params", generate)
+    monkeypatch.setattr(client_profile.yelp_service, "search_restaurants", search)
+
+    events = profile_events(PROFILE)
+
+    assert events[-1] == client_profile._error_event("searching", error)
+    assert events[-1]["stage"] == "searching"
+    assert events[-1].get("retry_after") == retry_after
+
+
+def test_profile_stream_reports_params_that_cannot_become_a_search(monkeypatch):
+    def invalid(self, **overrides):
+        raise ValueError("invalid price level")
+
+    monkeypatch.setattr(client_profile, "generate_restaurant_search_params", generate)
+    monkeypatch.setattr(
+        ClientProfileRestaurantSearchParams, "to_search_params", invalid
+    )
+
+    events = profile_events(PROFILE)
+
+    assert [event["type"] for event in events] == [
+        "progress",
+        "params",
+        "progress",
+        "error",
+    ]
+    assert events[-1]["detail"] == "invalid price level"
@@ -0,0 +1,184 @@
+import asyncio
+import time
+import httpx
+import pytest
+from app.models.restaurants import RestaurantSearchParams
+from app.services.rate_limit import (
+    MemoryTokenBucket,
+    Priority,
+    QuotaTracker,
+    RateLimiter,
+    SqliteTokenBucket,
+    UpstreamRateLimited,
+)
+from app.services.resilience import UpstreamGuard
+from app.services.yelp import YelpService
+from stubs import yelp_stub
+
+
+def make_yelp(
+    transport: httpx.AsyncBaseTransport, background_max_wait: float = 0.1, **guard
+) -> YelpService:
+    yelp = YelpService(api_key="test", base_url="http://stub/v3", transport=transport)
+    yelp.guard = UpstreamGuard(
+        "Yelp", **{"budget": 0.5, "base_delay": 0.01, "max_delay": 0.02, **guard}
+    )
+    yelp.limiter = RateLimiter(
+        MemoryTokenBucket(rate=1, capacity=1),
+        QuotaTracker(reserve=0.1),
+        max_wait=0.05,
+        name="Yelp",
+        background_max_wait=background_max_wait,
+    )
+    return yelp
+
+
+def search(index: int) -> RestaurantSearchParams:
+    return RestaurantSearchParams(location="Toronto", term=f"lunch {index}")
+
+
+def test_background_waits_for_tokens_do_not_open_the_breaker():
+    async def main():
+        # Waiting for a token takes longer than the whole latency budget
+        yelp = make_yelp(
+            httpx.ASGITransport(app=yelp_stub.app),
+            background_max_wait=0.5,
+            budget=0.3,
+            failure_threshold=1,
+        )
+        try:
+            return await asyncio.gather(
+                *(yelp._fetch_background(search(i)) for i in range(3)),
+                return_exceptions=True,
+            ), yelp.guard.stats()
+        finally:
+            await yelp.shutdown()
+
+    results, guard = asyncio.run(main())
+
+    assert isinstance(results[0], dict)
+    assert all(isinstance(result, UpstreamRateLimited) for result in results[1:])
+    assert guard["state"] == "closed"
+    assert guard["failures"] == 0
+    assert guard["timeouts"] == 0
+
+
+def test_retries_share_the_token_of_their_call():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"businesses": [], "total": 0})
+
+    async def main():
+        yelp = make_yelp(httpx.MockTransport(handler), attempts=3, budget=2)
+        try:
+            await yelp._fetch_search(search(0))
+            return yelp.limiter.stats()
+        finally:
+            await yelp.shutdown()
+
+    limiter = asyncio.run(main())
+
+    assert len(calls) == 3
+    assert limiter["admitted"] == 1
+
+
+def test_an_interactive_call_overtakes_queued_background_calls():
+    async def main():
+        limiter = RateLimiter(
+            MemoryTokenBucket(rate=20, capacity=1),
+            QuotaTracker(reserve=0.1),
+            max_wait=1,
+        )
+        order = []
+
+        async def call(name: str, priority: Priority):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        await limiter.acquire()
+        background = [
+            asyncio.create_task(call(f"background {i}", Priority.BACKGROUND))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        await call("interactive", Priority.INTERACTIVE)
+        await asyncio.gather(*background)
+        await limiter.close()
+        return order
+
+    assert asyncio.run(main())[0] == "interactive"
+
+
+def test_background_calls_give_up_after_their_own_wait():
+    async def main():
+        limiter = RateLimiter(
+            MemoryTokenBucket(rate=0.1, capacity=1),
+            QuotaTracker(reserve=0.1),
+            max_wait=5,
+            background_max_wait=0.05,
+        )
+        await limiter.acquire(Priority.BACKGROUND)
+        try:
+            with pytest.raises(UpstreamRateLimited):
+                await limiter.acquire(Priority.BACKGROUND)
+        finally:
+            await limiter.close()
+        return limiter.stats()
+
+    assert asyncio.run(main())["throttled"] == 1
+
+
+class SlowBucket:
+    """A shared bucket whose token arrives only after the caller gave up."""
+
+    blocking = True
+    rate = 1.0
+
+    def __init__(self):
+        self.taken = 0
+        self.refunded = 0
+
+    def try_acquire(self) -> float:
+        time.sleep(0.1)
+        self.taken += 1
+        return 0.0
+
+    def refund(self) -> None:
+        self.refunded += 1
+
+
+def test_tokens_taken_for_callers_that_gave_up_are_refunded():
+    bucket = SlowBucket()
+
+    async def main():
+        limiter = RateLimiter(bucket, QuotaTracker(reserve=0.1), max_wait=0.02)
+        try:
+            with pytest.raises(UpstreamRateLimited):
+                await limiter.acquire()
+            await limiter._dispatcher
+        finally:
+            await limiter.close()
+
+    asyncio.run(main())
+
+    assert bucket.taken == 1
+    assert bucket.refunded == 1
+
+
+def test_refunded_tokens_go_back_to_the_shared_bucket(tmp_path):
+    bucket = SqliteTokenBucket(
+        str(tmp_path / "ratelimit.sqlite3"), "yelp", rate=0.001, capacity=1
+    )
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+    bucket.refund()
+    assert bucket.try_acquire() == 0
+    bucket.refund()
+    bucket.refund()
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
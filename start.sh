@@ -3,7 +3,7 @@
 # Start backend server
 echo "Starting FastAPI backend server..."
 cd backend
-uv run main.py &
+SERVER_RELOAD=true uv run main.py &
 BACKEND_PID=$!
 
 # Start frontend server